@@ -0,0 +1,366 @@
+// Arduino core API stub for host `g++ -fsyntax-only` checks (utils/syntax_gate.py).
+// Declarations only - nothing here is ever linked. Mirrors ESP32 Arduino core 3.x
+// where the APIs differ (ledcSetup/ledcAttachPin are intentionally absent).
+#pragma once
+
+#include <stdint.h>
+#include <stddef.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdio.h>
+#include <stdarg.h>
+#include <math.h>
+#include <algorithm>
+
+using std::min;
+using std::max;
+
+typedef uint8_t byte;
+typedef bool boolean;
+typedef unsigned int word;
+
+#define HIGH 0x1
+#define LOW  0x0
+
+#define INPUT             0x01
+#define OUTPUT            0x03
+#define PULLUP            0x04
+#define INPUT_PULLUP      0x05
+#define PULLDOWN          0x08
+#define INPUT_PULLDOWN    0x09
+#define OPEN_DRAIN        0x10
+#define OUTPUT_OPEN_DRAIN 0x13
+
+#define RISING  0x01
+#define FALLING 0x02
+#define CHANGE  0x03
+#define ONLOW   0x04
+#define ONHIGH  0x05
+
+#define LSBFIRST 0
+#define MSBFIRST 1
+
+#define DEC 10
+#define HEX 16
+#define OCT 8
+#define BIN 2
+
+#define PI         3.1415926535897932384626433832795
+#define HALF_PI    1.5707963267948966192313216916398
+#define TWO_PI     6.283185307179586476925286766559
+#define DEG_TO_RAD 0.017453292519943295769236907684886
+#define RAD_TO_DEG 57.295779513082320876798154814105
+
+#define constrain(amt, low, high) ((amt) < (low) ? (low) : ((amt) > (high) ? (high) : (amt)))
+#define radians(deg) ((deg) * DEG_TO_RAD)
+#define degrees(rad) ((rad) * RAD_TO_DEG)
+#define sq(x) ((x) * (x))
+
+#define lowByte(w)  ((uint8_t)((w) & 0xff))
+#define highByte(w) ((uint8_t)((w) >> 8))
+#define bit(b) (1UL << (b))
+#define bitRead(value, b)  (((value) >> (b)) & 0x01)
+#define bitSet(value, b)   ((value) |= (1UL << (b)))
+#define bitClear(value, b) ((value) &= ~(1UL << (b)))
+#define bitWrite(value, b, bitvalue) ((bitvalue) ? bitSet(value, b) : bitClear(value, b))
+
+#define PROGMEM
+#define F(string_literal) (reinterpret_cast<const __FlashStringHelper *>(string_literal))
+#define digitalPinToInterrupt(p) (p)
+#define interrupts()
+#define noInterrupts()
+
+#define LED_BUILTIN 2
+#define A0 36
+#define A3 39
+#define A4 32
+#define A5 33
+#define A6 34
+#define A7 35
+
+void setup(void);
+void loop(void);
+
+void pinMode(uint8_t pin, uint8_t mode);
+void digitalWrite(uint8_t pin, uint8_t val);
+int digitalRead(uint8_t pin);
+uint16_t analogRead(uint8_t pin);
+void analogWrite(uint8_t pin, int value);
+void analogReadResolution(uint8_t bits);
+uint32_t analogReadMilliVolts(uint8_t pin);
+
+unsigned long millis(void);
+unsigned long micros(void);
+void delay(uint32_t ms);
+void delayMicroseconds(uint32_t us);
+void yield(void);
+
+unsigned long pulseIn(uint8_t pin, uint8_t state, unsigned long timeout = 1000000L);
+void shiftOut(uint8_t dataPin, uint8_t clockPin, uint8_t bitOrder, uint8_t val);
+uint8_t shiftIn(uint8_t dataPin, uint8_t clockPin, uint8_t bitOrder);
+void attachInterrupt(uint8_t pin, void (*handler)(void), int mode);
+void detachInterrupt(uint8_t pin);
+void tone(uint8_t pin, unsigned int frequency, unsigned long duration = 0);
+void noTone(uint8_t pin);
+
+long random(long howbig);
+long random(long howsmall, long howbig);
+void randomSeed(unsigned long seed);
+long map(long x, long in_min, long in_max, long out_min, long out_max);
+
+class __FlashStringHelper;
+
+class String {
+public:
+    String(const char *cstr = "");
+    String(const String &str);
+    String(const __FlashStringHelper *str);
+    explicit String(char c);
+    explicit String(unsigned char value, unsigned char base = 10);
+    explicit String(int value, unsigned char base = 10);
+    explicit String(unsigned int value, unsigned char base = 10);
+    explicit String(long value, unsigned char base = 10);
+    explicit String(unsigned long value, unsigned char base = 10);
+    explicit String(float value, unsigned int decimalPlaces = 2);
+    explicit String(double value, unsigned int decimalPlaces = 2);
+    ~String();
+
+    String &operator=(const String &rhs);
+    String &operator=(const char *cstr);
+    String &operator+=(const String &rhs);
+    String &operator+=(const char *cstr);
+    String &operator+=(char c);
+    String &operator+=(int num);
+    String &operator+=(unsigned int num);
+    String &operator+=(long num);
+    String &operator+=(unsigned long num);
+    String &operator+=(float num);
+    String &operator+=(double num);
+    bool concat(const String &str);
+    bool concat(const char *cstr);
+    bool concat(char c);
+    bool concat(int num);
+    bool concat(float num);
+
+    unsigned int length(void) const;
+    bool isEmpty(void) const;
+    bool reserve(unsigned int size);
+    const char *c_str() const;
+    char charAt(unsigned int index) const;
+    void setCharAt(unsigned int index, char c);
+    char operator[](unsigned int index) const;
+    char &operator[](unsigned int index);
+    void toCharArray(char *buf, unsigned int bufsize, unsigned int index = 0) const;
+
+    int compareTo(const String &s) const;
+    bool equals(const String &s) const;
+    bool equals(const char *cstr) const;
+    bool equalsIgnoreCase(const String &s) const;
+    bool operator==(const String &rhs) const;
+    bool operator==(const char *cstr) const;
+    bool operator!=(const String &rhs) const;
+    bool operator!=(const char *cstr) const;
+    bool operator<(const String &rhs) const;
+    bool operator>(const String &rhs) const;
+    bool startsWith(const String &prefix) const;
+    bool endsWith(const String &suffix) const;
+
+    int indexOf(char ch, unsigned int fromIndex = 0) const;
+    int indexOf(const String &str, unsigned int fromIndex = 0) const;
+    int lastIndexOf(char ch) const;
+    int lastIndexOf(const String &str) const;
+    String substring(unsigned int beginIndex) const;
+    String substring(unsigned int beginIndex, unsigned int endIndex) const;
+
+    void replace(char find, char replace);
+    void replace(const String &find, const String &replace);
+    void remove(unsigned int index);
+    void remove(unsigned int index, unsigned int count);
+    void toLowerCase(void);
+    void toUpperCase(void);
+    void trim(void);
+
+    long toInt(void) const;
+    float toFloat(void) const;
+    double toDouble(void) const;
+};
+
+String operator+(const String &lhs, const String &rhs);
+String operator+(const String &lhs, const char *rhs);
+String operator+(const char *lhs, const String &rhs);
+String operator+(const String &lhs, char rhs);
+String operator+(const String &lhs, int rhs);
+String operator+(const String &lhs, unsigned int rhs);
+String operator+(const String &lhs, long rhs);
+String operator+(const String &lhs, unsigned long rhs);
+String operator+(const String &lhs, float rhs);
+String operator+(const String &lhs, double rhs);
+
+class Print;
+
+class Printable {
+public:
+    virtual size_t printTo(Print &p) const = 0;
+};
+
+class Print {
+public:
+    virtual size_t write(uint8_t c) = 0;
+    virtual size_t write(const uint8_t *buffer, size_t size);
+    size_t write(const char *str);
+    size_t write(const char *buffer, size_t size);
+    virtual void flush();
+
+    size_t printf(const char *format, ...) __attribute__((format(printf, 2, 3)));
+
+    size_t print(const __FlashStringHelper *ifsh);
+    size_t print(const String &s);
+    size_t print(const char str[]);
+    size_t print(char c);
+    size_t print(unsigned char b, int base = DEC);
+    size_t print(int n, int base = DEC);
+    size_t print(unsigned int n, int base = DEC);
+    size_t print(long n, int base = DEC);
+    size_t print(unsigned long n, int base = DEC);
+    size_t print(long long n, int base = DEC);
+    size_t print(unsigned long long n, int base = DEC);
+    size_t print(double n, int digits = 2);
+    size_t print(const Printable &x);
+
+    size_t println(const __FlashStringHelper *ifsh);
+    size_t println(const String &s);
+    size_t println(const char str[]);
+    size_t println(char c);
+    size_t println(unsigned char b, int base = DEC);
+    size_t println(int n, int base = DEC);
+    size_t println(unsigned int n, int base = DEC);
+    size_t println(long n, int base = DEC);
+    size_t println(unsigned long n, int base = DEC);
+    size_t println(long long n, int base = DEC);
+    size_t println(unsigned long long n, int base = DEC);
+    size_t println(double n, int digits = 2);
+    size_t println(const Printable &x);
+    size_t println(void);
+};
+
+class Stream : public Print {
+public:
+    virtual int available() = 0;
+    virtual int read() = 0;
+    virtual int peek() = 0;
+    void setTimeout(unsigned long timeout);
+    bool find(const char *target);
+    long parseInt();
+    float parseFloat();
+    size_t readBytes(char *buffer, size_t length);
+    size_t readBytes(uint8_t *buffer, size_t length);
+    size_t readBytesUntil(char terminator, char *buffer, size_t length);
+    String readString();
+    String readStringUntil(char terminator);
+};
+
+#define SERIAL_8N1 0x800001c
+#define SERIAL_8E1 0x800001e
+#define SERIAL_8O1 0x800001f
+
+class HardwareSerial : public Stream {
+public:
+    void begin(unsigned long baud, uint32_t config = SERIAL_8N1, int8_t rxPin = -1, int8_t txPin = -1,
+               bool invert = false, unsigned long timeout_ms = 20000UL);
+    void end();
+    int available() override;
+    int availableForWrite();
+    int read() override;
+    int peek() override;
+    void flush() override;
+    size_t write(uint8_t c) override;
+    size_t write(const uint8_t *buffer, size_t size) override;
+    using Print::write;
+    operator bool() const;
+};
+
+extern HardwareSerial Serial;
+extern HardwareSerial Serial1;
+extern HardwareSerial Serial2;
+
+class IPAddress : public Printable {
+public:
+    IPAddress();
+    IPAddress(uint8_t first, uint8_t second, uint8_t third, uint8_t fourth);
+    IPAddress(uint32_t address);
+    IPAddress(const char *address);
+    bool fromString(const char *address);
+    uint8_t operator[](int index) const;
+    operator uint32_t() const;
+    bool operator==(const IPAddress &addr) const;
+    String toString() const;
+    size_t printTo(Print &p) const override;
+};
+
+#ifdef ARDUINO_ARCH_ESP32
+// LEDC (ESP32 Arduino core 3.x: pin based, no channels to set up)
+bool ledcAttach(uint8_t pin, uint32_t freq, uint8_t resolution);
+bool ledcAttachChannel(uint8_t pin, uint32_t freq, uint8_t resolution, uint8_t channel);
+bool ledcWrite(uint8_t pin, uint32_t duty);
+uint32_t ledcRead(uint8_t pin);
+uint32_t ledcReadFreq(uint8_t pin);
+uint32_t ledcWriteTone(uint8_t pin, uint32_t freq);
+uint32_t ledcChangeFrequency(uint8_t pin, uint32_t freq, uint8_t resolution);
+bool ledcDetach(uint8_t pin);
+bool ledcFade(uint8_t pin, uint32_t start_duty, uint32_t target_duty, int max_fade_time_ms);
+
+uint16_t touchRead(uint8_t pin);
+float temperatureRead();
+uint32_t getCpuFrequencyMhz();
+bool setCpuFrequencyMhz(uint32_t cpu_freq_mhz);
+
+class EspClass {
+public:
+    void restart();
+    uint32_t getHeapSize();
+    uint32_t getFreeHeap();
+    uint32_t getMinFreeHeap();
+    uint32_t getMaxAllocHeap();
+    const char *getChipModel();
+    uint8_t getChipRevision();
+    uint8_t getChipCores();
+    uint32_t getCpuFreqMHz();
+    uint32_t getFlashChipSize();
+    uint64_t getEfuseMac();
+    const char *getSdkVersion();
+};
+extern EspClass ESP;
+
+// FreeRTOS subset available through Arduino.h on ESP32
+typedef void *TaskHandle_t;
+typedef void *SemaphoreHandle_t;
+typedef void *QueueHandle_t;
+typedef uint32_t TickType_t;
+typedef int BaseType_t;
+typedef unsigned int UBaseType_t;
+typedef void (*TaskFunction_t)(void *);
+
+#define pdFALSE 0
+#define pdTRUE  1
+#define pdPASS  1
+#define pdFAIL  0
+#define portMAX_DELAY 0xffffffffUL
+#define portTICK_PERIOD_MS 1
+#define pdMS_TO_TICKS(ms) ((TickType_t)(ms))
+#define tskIDLE_PRIORITY 0
+
+BaseType_t xTaskCreate(TaskFunction_t task, const char *name, uint32_t stackDepth, void *params,
+                       UBaseType_t priority, TaskHandle_t *handle);
+BaseType_t xTaskCreatePinnedToCore(TaskFunction_t task, const char *name, uint32_t stackDepth, void *params,
+                                   UBaseType_t priority, TaskHandle_t *handle, BaseType_t coreId);
+void vTaskDelay(TickType_t ticks);
+void vTaskDelete(TaskHandle_t task);
+TickType_t xTaskGetTickCount(void);
+SemaphoreHandle_t xSemaphoreCreateMutex(void);
+SemaphoreHandle_t xSemaphoreCreateBinary(void);
+BaseType_t xSemaphoreTake(SemaphoreHandle_t sem, TickType_t ticks);
+BaseType_t xSemaphoreGive(SemaphoreHandle_t sem);
+QueueHandle_t xQueueCreate(UBaseType_t length, UBaseType_t itemSize);
+BaseType_t xQueueSend(QueueHandle_t queue, const void *item, TickType_t ticks);
+BaseType_t xQueueReceive(QueueHandle_t queue, void *buffer, TickType_t ticks);
+#endif
@@ -0,0 +1,20 @@
+// EEPROM (flash emulated on ESP32) stub for host syntax checks - declarations only.
+#pragma once
+
+#include <Arduino.h>
+
+class EEPROMClass {
+public:
+    bool begin(size_t size);
+    uint8_t read(int address);
+    void write(int address, uint8_t val);
+    uint16_t length();
+    bool commit();
+    void end();
+    uint8_t operator[](int address) const;
+
+    template <typename T> T &get(int address, T &t);
+    template <typename T> const T &put(int address, const T &t);
+};
+
+extern EEPROMClass EEPROM;
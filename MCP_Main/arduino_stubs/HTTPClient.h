@@ -0,0 +1,50 @@
+// HTTPClient stub (ESP32 Arduino core) for host syntax checks - declarations only.
+#pragma once
+
+#include <WiFi.h>
+
+#define HTTPC_ERROR_CONNECTION_REFUSED (-1)
+#define HTTPC_ERROR_SEND_HEADER_FAILED (-2)
+#define HTTPC_ERROR_CONNECTION_LOST    (-5)
+#define HTTPC_ERROR_READ_TIMEOUT       (-11)
+
+typedef enum {
+    HTTP_CODE_OK = 200,
+    HTTP_CODE_CREATED = 201,
+    HTTP_CODE_NO_CONTENT = 204,
+    HTTP_CODE_MOVED_PERMANENTLY = 301,
+    HTTP_CODE_FOUND = 302,
+    HTTP_CODE_BAD_REQUEST = 400,
+    HTTP_CODE_UNAUTHORIZED = 401,
+    HTTP_CODE_FORBIDDEN = 403,
+    HTTP_CODE_NOT_FOUND = 404,
+    HTTP_CODE_INTERNAL_SERVER_ERROR = 500
+} t_http_codes;
+
+class HTTPClient {
+public:
+    bool begin(String url);
+    bool begin(WiFiClient &client, String url);
+    bool begin(String host, uint16_t port, String uri = "/");
+    void end(void);
+    bool connected(void);
+    void setTimeout(uint16_t timeout);
+    void setConnectTimeout(int32_t connectTimeout);
+    void setReuse(bool reuse);
+    void setAuthorization(const char *user, const char *password);
+    void addHeader(const String &name, const String &value, bool first = false, bool replace = true);
+
+    int GET();
+    int POST(uint8_t *payload, size_t size);
+    int POST(String payload);
+    int PUT(uint8_t *payload, size_t size);
+    int PUT(String payload);
+    int PATCH(String payload);
+    int sendRequest(const char *type, String payload);
+
+    int getSize(void);
+    String getString(void);
+    WiFiClient &getStream(void);
+    String header(const char *name);
+    static String errorToString(int error);
+};
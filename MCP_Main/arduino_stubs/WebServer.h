@@ -0,0 +1,52 @@
+// WebServer stub (ESP32 Arduino core) for host syntax checks - declarations only.
+#pragma once
+
+#include <functional>
+#include <WiFi.h>
+
+typedef enum {
+    HTTP_ANY,
+    HTTP_GET,
+    HTTP_HEAD,
+    HTTP_POST,
+    HTTP_PUT,
+    HTTP_PATCH,
+    HTTP_DELETE,
+    HTTP_OPTIONS
+} HTTPMethod;
+
+class WebServer {
+public:
+    typedef std::function<void(void)> THandlerFunction;
+
+    WebServer(int port = 80);
+    WebServer(IPAddress addr, int port = 80);
+    void begin();
+    void begin(uint16_t port);
+    void handleClient();
+    void close();
+    void stop();
+
+    WebServer &on(const String &uri, THandlerFunction fn);
+    WebServer &on(const String &uri, HTTPMethod method, THandlerFunction fn);
+    void onNotFound(THandlerFunction fn);
+
+    String uri();
+    HTTPMethod method();
+    WiFiClient client();
+    String arg(String name);
+    String arg(int i);
+    String argName(int i);
+    int args();
+    bool hasArg(String name);
+    String header(String name);
+    bool hasHeader(String name);
+
+    void send(int code, const char *content_type = NULL, const String &content = String(""));
+    void send(int code, char *content_type, const String &content);
+    void send(int code, const String &content_type, const String &content);
+    void send_P(int code, const char *content_type, const char *content);
+    void sendHeader(const String &name, const String &value, bool first = false);
+    void setContentLength(const size_t contentLength);
+    void sendContent(const String &content);
+};
@@ -0,0 +1,121 @@
+// WiFi stub (ESP32 Arduino core) for host syntax checks - declarations only.
+#pragma once
+
+#include <Arduino.h>
+
+typedef enum {
+    WL_NO_SHIELD = 255,
+    WL_IDLE_STATUS = 0,
+    WL_NO_SSID_AVAIL = 1,
+    WL_SCAN_COMPLETED = 2,
+    WL_CONNECTED = 3,
+    WL_CONNECT_FAILED = 4,
+    WL_CONNECTION_LOST = 5,
+    WL_DISCONNECTED = 6
+} wl_status_t;
+
+typedef enum {
+    WIFI_MODE_NULL = 0,
+    WIFI_MODE_STA,
+    WIFI_MODE_AP,
+    WIFI_MODE_APSTA
+} wifi_mode_t;
+
+#define WIFI_OFF   WIFI_MODE_NULL
+#define WIFI_STA   WIFI_MODE_STA
+#define WIFI_AP    WIFI_MODE_AP
+#define WIFI_AP_STA WIFI_MODE_APSTA
+
+class WiFiClient : public Stream {
+public:
+    WiFiClient();
+    int connect(IPAddress ip, uint16_t port);
+    int connect(const char *host, uint16_t port);
+    int connect(const char *host, uint16_t port, int32_t timeout_ms);
+    uint8_t connected();
+    void stop();
+    void setTimeout(uint32_t seconds);
+    int available() override;
+    int read() override;
+    int read(uint8_t *buf, size_t size);
+    int peek() override;
+    void flush() override;
+    size_t write(uint8_t c) override;
+    size_t write(const uint8_t *buf, size_t size) override;
+    using Print::write;
+    IPAddress remoteIP() const;
+    operator bool();
+};
+
+class WiFiServer {
+public:
+    WiFiServer(uint16_t port = 80, uint8_t max_clients = 4);
+    void begin(uint16_t port = 0);
+    WiFiClient available();
+    WiFiClient accept();
+    bool hasClient();
+    void end();
+    void stop();
+};
+
+class WiFiUDP : public Stream {
+public:
+    uint8_t begin(uint16_t port);
+    void stop();
+    int beginPacket(IPAddress ip, uint16_t port);
+    int beginPacket(const char *host, uint16_t port);
+    int endPacket();
+    int parsePacket();
+    int available() override;
+    int read() override;
+    int read(unsigned char *buffer, size_t len);
+    int read(char *buffer, size_t len);
+    int peek() override;
+    size_t write(uint8_t c) override;
+    size_t write(const uint8_t *buffer, size_t size) override;
+    using Print::write;
+    IPAddress remoteIP();
+    uint16_t remotePort();
+};
+
+class WiFiClass {
+public:
+    wl_status_t begin(const char *ssid, const char *passphrase = NULL, int32_t channel = 0,
+                      const uint8_t *bssid = NULL, bool connect = true);
+    wl_status_t status();
+    bool isConnected();
+    bool disconnect(bool wifioff = false, bool eraseap = false);
+    bool reconnect();
+    bool mode(wifi_mode_t mode);
+    wifi_mode_t getMode();
+    bool config(IPAddress local_ip, IPAddress gateway, IPAddress subnet,
+                IPAddress dns1 = IPAddress(), IPAddress dns2 = IPAddress());
+    bool setHostname(const char *hostname);
+    const char *getHostname();
+    void setAutoReconnect(bool autoReconnect);
+    bool setSleep(bool enabled);
+
+    IPAddress localIP();
+    IPAddress gatewayIP();
+    IPAddress subnetMask();
+    IPAddress dnsIP(uint8_t dns_no = 0);
+    String macAddress();
+    String SSID() const;
+    String SSID(uint8_t networkItem);
+    int32_t RSSI();
+    int32_t RSSI(uint8_t networkItem);
+    int32_t channel();
+
+    bool softAP(const char *ssid, const char *passphrase = NULL, int channel = 1, int ssid_hidden = 0,
+                int max_connection = 4);
+    bool softAPConfig(IPAddress local_ip, IPAddress gateway, IPAddress subnet);
+    bool softAPdisconnect(bool wifioff = false);
+    IPAddress softAPIP();
+    uint8_t softAPgetStationNum();
+
+    int16_t scanNetworks(bool async = false, bool show_hidden = false);
+    void scanDelete();
+    int hostByName(const char *aHostname, IPAddress &aResult);
+};
+
+extern WiFiClass WiFi;
@@ -0,0 +1,4 @@
+// Forwarding stub for host syntax checks.
+#pragma once
+
+#include <WiFi.h>
@@ -0,0 +1,36 @@
+// Wire (I2C) stub for host syntax checks - declarations only.
+#pragma once
+
+#include <Arduino.h>
+
+class TwoWire : public Stream {
+public:
+    bool begin();
+    bool begin(int sda, int scl, uint32_t frequency = 0);
+    bool begin(uint8_t address);
+    bool end();
+    bool setClock(uint32_t frequency);
+    void setTimeOut(uint16_t timeOutMillis);
+    void beginTransmission(uint16_t address);
+    void beginTransmission(uint8_t address);
+    void beginTransmission(int address);
+    uint8_t endTransmission(bool sendStop);
+    uint8_t endTransmission(void);
+    uint8_t requestFrom(uint16_t address, uint8_t size, bool sendStop);
+    uint8_t requestFrom(uint8_t address, uint8_t size, uint8_t sendStop);
+    uint8_t requestFrom(uint8_t address, uint8_t size);
+    uint8_t requestFrom(int address, int size, int sendStop);
+    uint8_t requestFrom(int address, int size);
+    size_t write(uint8_t data) override;
+    size_t write(const uint8_t *data, size_t quantity) override;
+    using Print::write;
+    int available() override;
+    int read() override;
+    int peek() override;
+    void flush() override;
+    void onReceive(void (*handler)(int));
+    void onRequest(void (*handler)(void));
+};
+
+extern TwoWire Wire;
+extern TwoWire Wire1;
@@ -9,10 +9,12 @@ import shutil
 import json
 import time
 import configparser
-from typing import Optional, List, Dict
+from contextlib import contextmanager
+import asyncio
+from typing import Any, AsyncIterator, Callable, Optional, List, Dict, Tuple
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -23,15 +25,32 @@ import sys
 from mcp_client import MCPClient
 from mcp_servers.ollama_sampling_server import OllamaSamplingServer
 from mcp_servers.docs_generator_server import DocsGeneratorServer
+from mcp_servers.hardware_database_server import BOARD_DATABASE, GPIO_PURPOSES
 
 # Phase 8: Performance & Error Handling
 from utils.response_cache import ResponseCache
+from utils.disk_cache import DiskCache
+from utils.single_flight import SingleFlight
 from utils.error_handling import (
     CodeGenerationException, OllamaConnectionError, ValidationError,
     validate_description, validate_generated_code, retry_with_backoff, logger
 )
 
-from models import CodeGenerationResponse, CodeGenerationRequest
+from models import CodeGenerationResponse, CodeGenerationRequest, JobSubmitResponse, JobStatusResponse
+
+# Bounded worker pools so blocking stages never run on the event loop
+from utils.executors import run_compile, get_executor_stats, shutdown_executors
+from utils.llm_provider import OllamaProvider, OpenAIProvider, LLMPool, ModelRegistry, LLMConnectionError
+from utils.sketch_cutoff import SketchCutoff, sketch_end
+from utils.template_matcher import TemplateMatcher
+from utils.job_queue import JobQueue, JobQueueFullError
+from utils.task_graph import TaskGraph
+from utils.arduino_backend import create_arduino_backend, build_artifacts
+from utils.arduino_toolchain import CoreRegistry, ToolchainStatus, BuildCache
+from utils.compile_scheduler import CompileScheduler, CompileQueueFullError
+from utils.compile_cache import CompileCache, read_sketch_sources, SOURCE_EXTENSIONS
+from utils.syntax_gate import SyntaxGate
+from utils.diagnostics import DiagnosticCollector, parse_diagnostics, missing_headers, format_diagnostic
 
 # ---- Windows UTF-8 fix (MANDATORY) ----
 if sys.platform.startswith("win"):
@@ -43,7 +62,15 @@ if sys.platform.startswith("win"):
 
 # ---- Ollama Configuration ----
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11435")
+# Comma-separated list of Ollama servers with the same model; requests are
+# balanced across them (defaults to OLLAMA_HOST alone)
+OLLAMA_HOSTS = [h.strip() for h in os.getenv("OLLAMA_HOSTS", OLLAMA_HOST).split(",") if h.strip()]
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
+# How long Ollama keeps a model loaded after each request ("-1" = forever)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Preload models at startup, then re-send a load request every N seconds (0 = only at startup)
+OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "1") == "1"
+OLLAMA_KEEP_WARM_SECONDS = float(os.getenv("OLLAMA_KEEP_WARM_SECONDS", "0"))
 
 # ---- Ensure Arduino CLI is on PATH (Windows) ----
 if sys.platform.startswith("win"):
@@ -75,32 +102,91 @@ if os.path.exists("./static"):
 mcp_client = MCPClient()
 print("✓ MCP Client initialized")
 
+# ---- LLM provider ----
+# One async provider (pooled keep-alive HTTP client, shared timeouts, at most
+# LLM_MAX_CONCURRENCY requests in flight) serves every LLM call site.
+# OpenAI is used when OPENAI_API_KEY is set, Ollama otherwise. Ollama hosts
+# sit behind an LLMPool: least-outstanding routing, a circuit breaker per
+# host and background health probes, so a dead host fails fast and is skipped.
+openai_api_key = os.getenv("OPENAI_API_KEY")
+USING_OPENAI = bool(openai_api_key)
+USING_OLLAMA = not USING_OPENAI
+_llm_settings = {
+    "timeout": float(os.getenv("LLM_TIMEOUT_SECONDS", "300")),
+    "connect_timeout": float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "10")),
+    "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", os.getenv("LLM_POOL_SIZE", "4"))),
+    "max_connections": int(os.getenv("LLM_MAX_CONNECTIONS", "16"))
+}
+# Every component uses the main model unless LLM_DOCS_MODEL / LLM_SAMPLING_MODEL
+# name another one, so the model host normally keeps a single model loaded
+llm_models = ModelRegistry(os.getenv("OPENAI_MODEL", "gpt-4o-mini") if USING_OPENAI else OLLAMA_MODEL,
+                           {"docs": os.getenv("LLM_DOCS_MODEL"), "sampling": os.getenv("LLM_SAMPLING_MODEL")})
+if USING_OPENAI:
+    llm = OpenAIProvider(openai_api_key, model=llm_models.default,
+                         base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"), **_llm_settings)
+else:
+    llm = LLMPool([OllamaProvider(host, llm_models.default, keep_alive=OLLAMA_KEEP_ALIVE or None, **_llm_settings)
+                   for host in OLLAMA_HOSTS],
+                  failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "3")),
+                  reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+                  probe_interval=float(os.getenv("OLLAMA_PROBE_INTERVAL_SECONDS", "15")))
+LLM_MODEL = llm.model
+print(f"✓ LLM provider: {llm.name} ({LLM_MODEL} at {llm.base_url})")
+
+# Streamed generations stop once the sketch's code block closes; one stream in
+# LLM_CUTOFF_MEASURE_EVERY runs to the end to measure what the cutoff saves
+sketch_cutoff = SketchCutoff(enabled=os.getenv("LLM_STREAM_CUTOFF", "1") == "1",
+                             measure_every=int(os.getenv("LLM_CUTOFF_MEASURE_EVERY", "20")))
+
+# Common requests (blink, button, analog read, I2C scan, PWM, serial print) are
+# served from templates, with pins checked against the hardware database; the
+# LLM only sees descriptions the matcher is not confident about
+template_matcher = None
+if os.getenv("TEMPLATE_FAST_PATH", "1") == "1":
+    template_matcher = TemplateMatcher(BOARD_DATABASE, GPIO_PURPOSES,
+                                       min_confidence=float(os.getenv("TEMPLATE_MIN_CONFIDENCE", "0.8")))
+
 # Initialize Ollama Sampling Server (Phase 6)
-ollama_sampler = OllamaSamplingServer()
+ollama_sampler = OllamaSamplingServer(llm, model=llm_models.model_for("sampling"))
 print("✓ Ollama Sampling Server initialized")
 
 # Initialize Documentation Generator (Phase 7)
-docs_generator = DocsGeneratorServer()
+docs_generator = DocsGeneratorServer(model=llm_models.model_for("docs"), llm=llm)
 print("✓ Documentation Generator initialized")
 
 # Initialize Response Cache (Phase 8)
-response_cache = ResponseCache(ttl_minutes=30, max_size=100)
-print("✓ Response Cache initialized (30min TTL, max 100 entries)")
-
-try:
-    import ollama
-    USING_OLLAMA = True
-except ImportError:
-    USING_OLLAMA = False
-
-USING_OPENAI = False
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if openai_api_key:
+# Entries hold full compile logs and documentation, so bound bytes as well as count
+RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "64"))
+# Second tier on disk: shared by all uvicorn workers and survives restarts
+# (set RESPONSE_CACHE_DIR to an empty string to disable)
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", "./response_cache")
+response_disk_cache = None
+if RESPONSE_CACHE_DIR:
     try:
-        from openai import OpenAI
-        USING_OPENAI = True
-    except ImportError:
-        USING_OPENAI = False
+        response_disk_cache = DiskCache(
+            RESPONSE_CACHE_DIR,
+            ttl_minutes=int(os.getenv("RESPONSE_CACHE_DISK_TTL_MINUTES", str(24 * 60))),
+            max_bytes=int(os.getenv("RESPONSE_CACHE_DISK_MB", "256")) * 1024 * 1024
+        )
+        print(f"✓ Response disk cache at {response_disk_cache.path}")
+    except Exception as e:
+        logger.warning(f"Response disk cache unavailable ({e}); using memory tier only")
+response_cache = ResponseCache(ttl_minutes=30, max_size=100, max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+                               disk=response_disk_cache)
+print(f"✓ Response Cache initialized (30min TTL, max 100 entries, {RESPONSE_CACHE_MAX_MB}MB)")
+
+# Coalesce concurrent identical generation requests (keyed by cache key)
+generation_flights = SingleFlight()
+
+# Initialize async job queue (worker count is independent of HTTP concurrency)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+job_queue = JobQueue(
+    handler=lambda request, emit: run_generation_pipeline(request, emit=emit),
+    workers=JOB_WORKERS,
+    max_pending=int(os.getenv("JOB_QUEUE_MAX", "100")),
+    ttl_minutes=int(os.getenv("JOB_RESULT_TTL_MINUTES", "60"))
+)
+print(f"✓ Job Queue initialized ({JOB_WORKERS} workers)")
 
 PLATFORMIO_PROJECT_PATH = os.getenv("PLATFORMIO_PROJECT_PATH", "./esp32_project")
 PLATFORMIO_SRC_PATH = os.path.join(PLATFORMIO_PROJECT_PATH, "src")
@@ -176,30 +262,6 @@ LIBRARY_MAPPING = {
     "driver/ledc.h": "builtin",
 }
 
-if USING_OPENAI:
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not openai_api_key:
-        raise ValueError("OPENAI_API_KEY not found")
-    openai_client = OpenAI(api_key=openai_api_key)
-    LLM_MODEL = "gpt-4o-mini"
-    print(f"✓ OpenAI initialized: {LLM_MODEL}")
-elif USING_OLLAMA:
-    ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11435")
-    try:
-        ollama_client = ollama.Client(host=ollama_host)
-        LLM_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
-        print(f"✓ Ollama initialized: {LLM_MODEL}")
-    except Exception as e:
-        print(f"⚠ Warning: Cannot connect to Ollama at {ollama_host}: {e}")
-        print("⚠ Will attempt reconnection when needed")
-        ollama_client = None
-        LLM_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
-
-# Verify at least one LLM provider is available
-if not USING_OPENAI and not USING_OLLAMA:
-    raise ImportError("Neither OpenAI nor Ollama available")
-
-
 def extract_includes_from_code(code: str) -> List[str]:
     """Extract all #include statements from generated code."""
     includes = []
@@ -356,8 +418,65 @@ def check_arduino_cli() -> str:
     """Return path to arduino-cli or empty string."""
     return shutil.which("arduino-cli") or ""
 
+# All arduino-cli operations go through one backend: a process per command
+# (default) or, with ARDUINO_CLI_BACKEND=daemon, one long-lived gRPC daemon
+arduino_backend = create_arduino_backend(
+    os.getenv("ARDUINO_CLI_BACKEND", "subprocess"),
+    check_arduino_cli,
+    port=int(os.getenv("ARDUINO_DAEMON_PORT", "50051"))
+)
+
+# Installed cores are read once from `core list --format json` and re-read only
+# after CORE_REGISTRY_TTL_MINUTES, an install, or POST /api/admin/toolchain/refresh
+core_registry = CoreRegistry(arduino_backend, ttl_minutes=int(os.getenv("CORE_REGISTRY_TTL_MINUTES", "60")))
+
+# Core builds shared across sketches, one directory per FQBN
+ARDUINO_BUILD_CACHE_PATH = os.getenv("ARDUINO_BUILD_CACHE_PATH", os.path.join(ARDUINO_BUILD_PATH, ".build_cache"))
+build_cache = BuildCache(ARDUINO_BUILD_CACHE_PATH)
+
+# Compile results keyed by sketch source + FQBN + installed core/library versions;
+# binaries are stored once per content hash (set COMPILE_CACHE_DIR="" to disable)
+COMPILE_CACHE_DIR = os.getenv("COMPILE_CACHE_DIR", os.path.join(ARDUINO_BUILD_PATH, ".compile_cache"))
+compile_result_cache = None
+if COMPILE_CACHE_DIR:
+    try:
+        compile_result_cache = CompileCache(
+            COMPILE_CACHE_DIR,
+            DiskCache(COMPILE_CACHE_DIR, ttl_minutes=int(os.getenv("COMPILE_CACHE_TTL_MINUTES", str(7 * 24 * 60))),
+                      max_bytes=64 * 1024 * 1024, filename="compile_cache.sqlite3"),
+            max_blob_bytes=int(os.getenv("COMPILE_CACHE_BLOB_MB", "512")) * 1024 * 1024
+        )
+    except Exception as e:
+        logger.warning(f"Compile cache unavailable ({e}); every compile runs the toolchain")
+
+# Host g++ -fsyntax-only against arduino_stubs/ before the real toolchain
+# (SYNTAX_GATE=0 disables it; without a host compiler it reports "skipped")
+syntax_gate = SyntaxGate() if os.getenv("SYNTAX_GATE", "1") != "0" else None
+
+# The full compile output goes to <sketch dir>/compile.log (GET /api/builds/{id}/log);
+# responses and cache entries keep only its last COMPILE_OUTPUT_TAIL_CHARS
+BUILD_LOG_NAME = "compile.log"
+COMPILE_OUTPUT_TAIL_CHARS = int(os.getenv("COMPILE_OUTPUT_TAIL_CHARS", "4000"))
+
+# At most min(cores, MemAvailable / COMPILE_MEM_PER_JOB_MB) toolchains at once,
+# queued per board; beyond COMPILE_QUEUE_MAX waiting compiles requests get 503
+compile_scheduler = CompileScheduler(
+    max_parallel=int(os.getenv("COMPILE_MAX_PARALLEL", "0")) or None,
+    mem_per_job_mb=int(os.getenv("COMPILE_MEM_PER_JOB_MB", "700")),
+    max_queued=int(os.getenv("COMPILE_QUEUE_MAX", "32"))
+)
+
+# One cached toolchain snapshot read by both /health and preflight_check_arduino
+REQUIRED_ARDUINO_PLATFORMS = {"esp32:esp32": "ESP32", "arduino:avr": "Arduino AVR"}
+toolchain_status = ToolchainStatus(
+    core_registry,
+    REQUIRED_ARDUINO_PLATFORMS,
+    pio_check=lambda: os.system("pio --version > /dev/null 2>&1") == 0,
+    ttl_minutes=int(os.getenv("TOOLCHAIN_STATUS_TTL_MINUTES", "5"))
+)
+
 def ensure_core_installed(fqbn: str) -> dict:
-    """Try to install/update core required by FQBN. Returns dict with output."""
+    """Install the core required by FQBN if missing. Returns dict with output."""
     arduino = check_arduino_cli()
     if not arduino:
         return {"success": False, "output": "arduino-cli not found"}
@@ -367,16 +486,7 @@ def ensure_core_installed(fqbn: str) -> dict:
         return {"success": False, "output": f"Invalid FQBN: {fqbn}"}
 
     platform = ":".join(parts[:2])
-    try:
-        cmd_index = [arduino, "core", "update-index"]
-        idx = subprocess.run(cmd_index, capture_output=True, text=True, timeout=120)
-
-        cmd_install = [arduino, "core", "install", platform]
-        inst = subprocess.run(cmd_install, capture_output=True, text=True, timeout=300)
-
-        return {"success": inst.returncode == 0, "output": idx.stdout + idx.stderr + inst.stdout + inst.stderr, "returncode": inst.returncode}
-    except Exception as e:
-        return {"success": False, "output": str(e)}
+    return core_registry.ensure(platform)
 
 def save_sketch_as_ino(code: str, description: str) -> tuple:
     """Create a sketch folder and save code as <sketch_name>.ino. Returns (sketch_dir, sketch_file)."""
@@ -389,6 +499,33 @@ def save_sketch_as_ino(code: str, description: str) -> tuple:
         f.write(code)
     return sketch_dir, sketch_file
 
+def _output_tail(output: Optional[str], log_url: Optional[str] = None) -> Optional[str]:
+    """Last COMPILE_OUTPUT_TAIL_CHARS of a compile output, cut at a line boundary."""
+    if not output or len(output) <= COMPILE_OUTPUT_TAIL_CHARS:
+        return output
+    tail = output[-COMPILE_OUTPUT_TAIL_CHARS:]
+    newline = tail.find("\n")
+    if 0 <= newline < len(tail) - 1:
+        tail = tail[newline + 1:]
+    note = f"; full log: {log_url}" if log_url else ""
+    return f"... [{len(output) - len(tail)} earlier characters truncated{note}]\n{tail}"
+
+def _write_build_log(sketch_dir: str, output: str) -> Optional[str]:
+    """Write the full compile output next to the sketch. Returns its download URL (None on failure)."""
+    try:
+        with open(os.path.join(sketch_dir, BUILD_LOG_NAME), "w", encoding="utf-8") as f:
+            f.write(output or "")
+    except OSError as e:
+        logger.warning(f"Could not write build log for {sketch_dir}: {e}")
+        return None
+    return f"/api/builds/{os.path.basename(os.path.normpath(sketch_dir))}/log"
+
+def _note_library_install(result: subprocess.CompletedProcess):
+    """Drop the cached `lib list` view when an install actually changed something."""
+    output = ((result.stdout or "") + (result.stderr or "")).lower()
+    if result.returncode == 0 and "already installed" not in output:
+        core_registry.invalidate_libraries()
+
 def install_libraries_arduino(detected_libraries: List[tuple]) -> dict:
     """Install libraries via arduino-cli lib install. Returns aggregated output."""
     arduino = check_arduino_cli()
@@ -399,27 +536,57 @@ def install_libraries_arduino(detected_libraries: List[tuple]) -> dict:
     for header, lib_name in detected_libraries:
         # prefer simple name if given like adafruit/DHT-sensor-library -> DHT-sensor-library
         lib_arg = lib_name.split("/")[-1]
-        cmd = [arduino, "lib", "install", lib_arg]
         try:
-            r = subprocess.run(cmd, capture_output=True, text=True, timeout=180)
-            outputs.append("\n".join([" ".join(cmd), r.stdout, r.stderr]))
+            r = arduino_backend.lib_install(lib_arg, timeout=180)
+            _note_library_install(r)
+            outputs.append("\n".join([" ".join(r.args), r.stdout, r.stderr]))
         except Exception as e:
-            outputs.append(f"Error running {' '.join(cmd)}: {e}")
+            outputs.append(f"Error running lib install {lib_arg}: {e}")
 
     return {"success": True, "output": "\n".join(outputs)}
 
-def arduino_compile_sketch(sketch_dir: str, fqbn: str, detected_libraries: Optional[List[tuple]] = None) -> dict:
-    """Compile a sketch using arduino-cli. Returns dict with detailed diagnostics."""
+def _run_scheduled_compile(cwd: str, fqbn: str, cache_path: str, env: dict,
+                           on_output: Optional[Callable[[str], None]],
+                           diagnostics: DiagnosticCollector, abort_on_missing_header: bool) -> tuple:
+    """Compile job run by the scheduler. Returns (CompletedProcess, build_cache_was_warm).
+
+    Every output line is parsed into `diagnostics` as it arrives; with
+    `abort_on_missing_header` the build is killed on the first missing header.
+    """
+    def on_line(line: str):
+        diagnostics.feed(line)
+        if on_output:
+            on_output(line)
+
+    def abort_on(line: str) -> bool:
+        return abort_on_missing_header and bool(diagnostics.missing_headers)
+
+    with build_cache.use(fqbn) as (_, cache_warm):
+        result = arduino_backend.compile(cwd, fqbn, os.path.join(cwd, "build"), cache_path,
+                                         env=env, timeout=300, on_line=on_line, abort_on=abort_on)
+        if result.returncode == 0 and not cache_warm:
+            build_cache.mark_warm(fqbn)
+    return result, cache_warm
+
+def arduino_compile_sketch(sketch_dir: str, fqbn: str, detected_libraries: Optional[List[tuple]] = None,
+                           on_output: Optional[Callable[[str], None]] = None,
+                           abort_on_missing_header: bool = False) -> dict:
+    """Compile a sketch using arduino-cli. Returns dict with detailed diagnostics.
+
+    Compiler output is read as a stream and parsed line by line into the
+    `diagnostics` list; if `on_output` is given, each line is forwarded to it.
+    With `abort_on_missing_header` the compile stops at the first
+    "No such file or directory" for a header (the result has `aborted` set).
+    """
     arduino = check_arduino_cli()
     if not arduino:
         return {"success": False, "output": "❌ arduino-cli not found in PATH", "returncode": -1, "tool_path": None}
 
-    # Prepare environment and file list
+    # Prepare environment and file list (top-level sources only: build/ can
+    # hold thousands of objects after the first attempt)
     cwd = os.path.abspath(sketch_dir)
-    file_list = []
-    for root, dirs, files in os.walk(cwd):
-        for f in files:
-            file_list.append(os.path.relpath(os.path.join(root, f), cwd))
+    file_list = sorted(entry.name for entry in os.scandir(cwd)
+                       if entry.is_file() and entry.name.endswith(SOURCE_EXTENSIONS))
 
     env = os.environ.copy()
 
@@ -431,12 +598,21 @@ def arduino_compile_sketch(sketch_dir: str, fqbn: str, detected_libraries: Optio
     if detected_libraries:
         libs_info = install_libraries_arduino(detected_libraries)
 
-    cmd = [arduino, "compile", "--fqbn", fqbn, ".", "--build-path", os.path.join(cwd, "build"), "--verbose"]
+    # The core archive is built once per FQBN into the shared cache and reused
+    cache_path = build_cache.path_for(fqbn)
 
     try:
-        result = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True, timeout=300)
+        # Queue behind other compiles; the scheduler caps concurrent toolchains
+        diagnostics = DiagnosticCollector()
+        compile_future = compile_scheduler.submit(fqbn, _run_scheduled_compile, cwd, fqbn, cache_path, env,
+                                                  on_output, diagnostics, abort_on_missing_header)
+        result, cache_warm = compile_future.result()
+        aborted = bool(getattr(result, "aborted", False))
         combined_output = []
-        combined_output.append(f"Command: {' '.join(cmd)}")
+        combined_output.append(f"Command: {' '.join(result.args)}")
+        combined_output.append(f"Backend: {arduino_backend.name}")
+        combined_output.append(f"Build cache: {cache_path} ({'warm' if cache_warm else 'cold'})")
+        combined_output.append(f"Queue wait: {compile_future.wait_seconds:.2f}s")
         combined_output.append(f"Tool Path: {arduino}")
         combined_output.append(f"CWD: {cwd}")
         combined_output.append(f"PATH: {env.get('PATH')}")
@@ -445,18 +621,16 @@ def arduino_compile_sketch(sketch_dir: str, fqbn: str, detected_libraries: Optio
         if libs_info:
             combined_output.append("\n--- LIBS INFO ---\n" + str(libs_info.get('output', '')))
         combined_output.append("\n--- COMPILE OUTPUT ---\n" + result.stdout + result.stderr)
+        if aborted:
+            combined_output.append(f"\n⏹ Compile aborted: missing header {diagnostics.missing_headers[0]}")
 
-        # Attempt to locate compiled binary
-        build_dir = os.path.join(cwd, "build")
-        binary_path = None
-        if os.path.exists(build_dir):
-            for root, dirs, files in os.walk(build_dir):
-                for f in files:
-                    if f.endswith(".bin") or f.endswith(".hex") or f.endswith(".elf"):
-                        binary_path = os.path.join(root, f)
-                        break
-                if binary_path:
-                    break
+        # Artifact paths come straight from the builder result (project name
+        # defaults to the sketch folder name, which is how arduino-cli names it)
+        build = getattr(result, "build", None) or {}
+        artifacts = {}
+        if result.returncode == 0:
+            artifacts = build_artifacts(build.get("build_path") or os.path.join(cwd, "build"),
+                                        build.get("project_name") or os.path.basename(cwd) + ".ino")
 
         return {
             "success": result.returncode == 0,
@@ -465,8 +639,16 @@ def arduino_compile_sketch(sketch_dir: str, fqbn: str, detected_libraries: Optio
             "tool_path": arduino,
             "cwd": cwd,
             "file_list": file_list,
-            "binary_path": binary_path
+            "binary_path": artifacts.get("app") or artifacts.get("elf"),
+            "artifacts": artifacts,
+            "program_size": build.get("program_size"),
+            "ram_usage": build.get("ram_usage"),
+            "diagnostics": diagnostics.records,
+            "missing_headers": list(diagnostics.missing_headers),
+            "aborted": aborted
         }
+    except CompileQueueFullError:
+        raise
     except subprocess.TimeoutExpired:
         return {"success": False, "output": "⏱ Compilation timed out", "returncode": -1, "tool_path": arduino, "cwd": cwd, "file_list": file_list}
     except Exception as e:
@@ -475,7 +657,8 @@ def arduino_compile_sketch(sketch_dir: str, fqbn: str, detected_libraries: Optio
 
 def preflight_check_arduino() -> dict:
     """Check Arduino CLI availability and core installation status. Returns diagnostic info."""
-    arduino = check_arduino_cli()
+    status = toolchain_status.get()
+    arduino = status["arduino_cli_path"]
     result = {
         "arduino_cli_found": bool(arduino),
         "arduino_cli_path": arduino,
@@ -501,18 +684,10 @@ def preflight_check_arduino() -> dict:
 
     result["status_message"] = "✓ arduino-cli found"
 
-    # Check for required cores
-    for platform, desc in [("esp32:esp32", "ESP32"), ("arduino:avr", "Arduino AVR")]:
-        try:
-            cmd = [arduino, "core", "list"]
-            r = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            is_installed = platform in r.stdout
-            result["cores_installed"][platform] = is_installed
-            if not is_installed:
-                result["install_commands"].append(f"arduino-cli core install {platform}")
-        except Exception as e:
-            result["cores_installed"][platform] = False
-            result["install_commands"].append(f"arduino-cli core install {platform} (check failed: {str(e)})")
+    # Required cores come from the cached core registry (no subprocess when warm)
+    result["cores_installed"] = dict(status["cores_installed"])
+    for platform in status["missing_platforms"]:
+        result["install_commands"].append(f"arduino-cli core install {platform}")
 
     if result["install_commands"]:
         result["status_message"] += f"\n⚠️  Some cores need installation:\n" + "\n".join(result["install_commands"])
@@ -520,39 +695,32 @@ def preflight_check_arduino() -> dict:
     return result
 
 
-def parse_compilation_errors(output: str) -> Dict:
-    """Parse compilation errors."""
-    errors_dict = {
-        "syntax_errors": [],
-        "missing_headers": [],
-        "undefined_references": [],
-        "type_errors": [],
-        "ledc_api_errors": [],
-        "other_errors": []
-    }
-    
-    for line in output.split("\n"):
-        if "error:" not in line.lower():
-            continue
-        
-        line_clean = line.strip()
-        if not line_clean:
-            continue
-        
-        # Check for LEDC API errors (old API incompatible with v3.x)
-        if ("ledcAttachPin" in line or "GPIO_NUM_" in line) and "not declared" in line.lower():
-            errors_dict["ledc_api_errors"].append(line_clean)
-        elif "fatal error:" in line.lower() and ".h:" in line:
-            errors_dict["missing_headers"].append(line_clean)
-        elif "undefined reference" in line.lower():
-            errors_dict["undefined_references"].append(line_clean)
-        elif "error:" in line.lower() and ("expected" in line or "undeclared" in line):
-            errors_dict["syntax_errors"].append(line_clean)
-        elif "error:" in line.lower() and ("type" in line or "cannot" in line):
-            errors_dict["type_errors"].append(line_clean)
-        else:
-            errors_dict["other_errors"].append(line_clean)
-    
+# Diagnostic category -> parse_compilation_errors key
+ERROR_CATEGORY_KEYS = {
+    "syntax": "syntax_errors",
+    "missing_header": "missing_headers",
+    "undefined_reference": "undefined_references",
+    "type": "type_errors",
+    "ledc_api": "ledc_api_errors",
+    "other": "other_errors"
+}
+
+def parse_compilation_errors(output: str, diagnostics: Optional[List[Dict]] = None) -> Dict:
+    """Group compiler errors by category.
+
+    Args:
+        output: Compiler output (parsed once if `diagnostics` is not given)
+        diagnostics: Records from utils.diagnostics.parse_diagnostics
+
+    Returns:
+        Dict of category key -> error lines
+    """
+    errors_dict = {key: [] for key in ERROR_CATEGORY_KEYS.values()}
+    if diagnostics is None:
+        diagnostics = parse_diagnostics(output)
+    for record in diagnostics:
+        if record["severity"] == "error":
+            errors_dict[ERROR_CATEGORY_KEYS[record["category"]]].append(format_diagnostic(record))
     return errors_dict
 
 def generate_troubleshooting_suggestions(error_dict: Dict) -> List[str]:
@@ -656,23 +824,9 @@ def _save_lib_cache(cache: dict):
 
 def _arduino_cli_search(lib_query: str) -> list:
     """Search arduino-cli library index and return parsed JSON results (if any)."""
-    arduino = check_arduino_cli()
-    if not arduino:
+    if not check_arduino_cli():
         return []
-    try:
-        cmd = [arduino, "lib", "search", lib_query, "--format", "json"]
-        r = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-        if r.returncode == 0 and r.stdout:
-            try:
-                data = json.loads(r.stdout)
-                if isinstance(data, list):
-                    return data
-            except Exception:
-                # Non-JSON fallback: ignore
-                return []
-    except Exception:
-        pass
-    return []
+    return arduino_backend.lib_search(lib_query, timeout=60)
 
 def install_libraries_with_arduino_cli(detected_libraries: List[tuple]) -> dict:
     """Attempt to install each detected library using arduino-cli. Returns a dependency report."""
@@ -712,8 +866,8 @@ def install_libraries_with_arduino_cli(detected_libraries: List[tuple]) -> dict:
 
         # Attempt install
         try:
-            cmd = [arduino, "lib", "install", chosen]
-            r = subprocess.run(cmd, capture_output=True, text=True, timeout=180)
+            r = arduino_backend.lib_install(chosen, timeout=180)
+            _note_library_install(r)
             out = (r.stdout or "") + (r.stderr or "")
             if r.returncode == 0:
                 report["installed"].append(chosen)
@@ -731,37 +885,86 @@ def install_libraries_with_arduino_cli(detected_libraries: List[tuple]) -> dict:
 
 def _extract_missing_headers_from_output(output: str) -> List[str]:
     """Extract header filenames reported as missing in compile output."""
-    missing = []
-    for line in output.splitlines():
-        if "fatal error:" in line.lower() and ": No such file or directory" in line:
-            m = re.search(r"fatal error:\s*([^:]+\.h)", line, re.IGNORECASE)
-            if m:
-                header = os.path.basename(m.group(1).strip())
-                missing.append(header)
-    # dedupe
-    return list(dict.fromkeys(missing))
-
-def compile_with_retries(sketch_dir: str, fqbn: str, detected_libraries: List[tuple], max_retries: int = 2, initial_dependency_report: dict = None) -> dict:
+    return missing_headers(parse_diagnostics(output))
+
+def _compile_cache_key(sketch_dir: str, fqbn: str) -> Optional[str]:
+    """Content address of a compile: normalized sources, FQBN, installed core and library versions."""
+    if compile_result_cache is None or not check_arduino_cli():
+        return None
+    try:
+        sources = read_sketch_sources(sketch_dir)
+    except OSError:
+        return None
+    platform = ":".join(fqbn.split(":")[:2])
+    return CompileCache.make_key(sources, fqbn, core_registry.installed().get(platform, ""),
+                                 core_registry.libraries())
+
+def _store_compile_result(sketch_dir: str, fqbn: str, result: dict):
+    """Cache successes and genuine compiler errors (not timeouts, tool errors or missing headers)."""
+    if compile_result_cache is None:
+        return
+    output = result.get("output", "") or ""
+    if not result.get("success"):
+        missing = result.get("missing_headers")
+        if missing is None:
+            missing = _extract_missing_headers_from_output(output)
+        if result.get("returncode", -1) <= 0 or missing:
+            return
+    # Key from the final state: libraries installed by the retries are part of it
+    key = _compile_cache_key(sketch_dir, fqbn)
+    if key:
+        compile_result_cache.put(key, {
+            "success": result.get("success", False),
+            "returncode": result.get("returncode"),
+            "output": _output_tail(output),
+            "tool_path": result.get("tool_path"),
+            "binary_path": result.get("binary_path"),
+            "artifacts": result.get("artifacts") or {},
+            "program_size": result.get("program_size"),
+            "ram_usage": result.get("ram_usage"),
+            "diagnostics": result.get("diagnostics") or []
+        })
+
+def compile_with_retries(sketch_dir: str, fqbn: str, detected_libraries: List[tuple], max_retries: int = 2, initial_dependency_report: dict = None,
+                         on_output: Optional[Callable[[str], None]] = None) -> dict:
     """Compile and auto-install missing libraries up to `max_retries` times.
 
+    An identical earlier build (same sources, FQBN, core and library versions)
+    is answered from the compile cache without running the toolchain.
+
     Returns final compile_result and attaches a dependency_report under key 'dependency_report'.
     """
     dependency_report = initial_dependency_report or {"detected_includes": [h for h, _ in detected_libraries], "libraries_attempted": [], "installed": [], "failed": []}
 
+    cache_key = _compile_cache_key(sketch_dir, fqbn)
+    cached = compile_result_cache.get(cache_key) if cache_key else None
+    if cached:
+        print(f"✓ Compile cache hit ({cache_key[:12]}) - reusing build result")
+        if on_output:
+            on_output(f"Compile cache hit ({cache_key[:12]}): identical sketch, board and libraries already built")
+        return {
+            **cached,
+            "output": f"Compile cache: hit {cache_key[:16]}\n" + (cached.get("output") or ""),
+            "cwd": os.path.abspath(sketch_dir),
+            "compile_cache_hit": True,
+            "dependency_report": dependency_report
+        }
+
     attempt = 0
     last_result = None
     while attempt <= max_retries:
-        last_result = arduino_compile_sketch(sketch_dir, fqbn, detected_libraries)
+        # Stop the build at the first missing header: the libraries get installed either way
+        last_result = arduino_compile_sketch(sketch_dir, fqbn, detected_libraries, on_output=on_output,
+                                             abort_on_missing_header=attempt < max_retries)
         if last_result.get("success"):
-            last_result["dependency_report"] = dependency_report
-            return last_result
+            break
 
-        output = last_result.get("output", "") or ""
-        missing = _extract_missing_headers_from_output(output)
+        missing = last_result.get("missing_headers")
+        if missing is None:
+            missing = _extract_missing_headers_from_output(last_result.get("output", "") or "")
         if not missing:
             # No missing header detected - stop retrying
-            last_result["dependency_report"] = dependency_report
-            return last_result
+            break
 
         # Map missing headers to libraries
         to_install = []
@@ -780,14 +983,12 @@ def compile_with_retries(sketch_dir: str, fqbn: str, detected_libraries: List[tu
         attempt += 1
         print(f"  → Retry #{attempt} after installing libraries")
 
+    _store_compile_result(sketch_dir, fqbn, last_result)
     last_result["dependency_report"] = dependency_report
     return last_result
 
 
-def generate_code_with_llm(description: str, context: Optional[str] = None) -> str:
-    """Generate ESP32 code using LLM."""
-    
-    system_prompt = """You are an expert ESP32 firmware developer using ESP32 Arduino core v3.x.
+CODE_SYSTEM_PROMPT = """You are an expert ESP32 firmware developer using ESP32 Arduino core v3.x.
     
 REQUIREMENTS:
 1. Generate ONLY complete Arduino sketches
@@ -803,48 +1004,67 @@ REQUIREMENTS:
 8. Include Serial.begin(115200) if needed
 9. Return ONLY code in ```cpp``` blocks
 10. Keep code simple - prefer digitalWrite over complex PWM setups"""
-    
+
+def _build_code_messages(description: str, context: Optional[str] = None) -> List[Dict]:
+    """Build the chat messages for a code generation request."""
     user_message = f"Generate ESP32 Arduino code for: {description}"
     if context:
         user_message += f"\n\nContext: {context}"
     
+    return [
+        {"role": "system", "content": CODE_SYSTEM_PROMPT},
+        {"role": "user", "content": user_message}
+    ]
+
+async def generate_code_with_llm(description: str, context: Optional[str] = None) -> str:
+    """Generate ESP32 code using LLM."""
+    return await llm.chat(_build_code_messages(description, context), temperature=0.6, max_tokens=2048)
+
+async def stream_code_with_llm(description: str, context: Optional[str] = None) -> AsyncIterator[str]:
+    """Generate ESP32 code using LLM, yielding text chunks as they arrive."""
+    stream = llm.stream_chat(_build_code_messages(description, context), temperature=0.6, max_tokens=2048)
     try:
-        if USING_OPENAI:
-            response = openai_client.chat.completions.create(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.6,
-                max_tokens=2048
-            )
-            return response.choices[0].message.content
-        
-        elif USING_OLLAMA:
-            # Ensure ollama client is connected
-            if ollama_client is None:
-                ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11435")
-                try:
-                    ollama_client = ollama.Client(host=ollama_host)
-                    print(f"✓ Reconnected to Ollama: {LLM_MODEL}")
-                except Exception as e:
-                    raise ConnectionError(f"Cannot connect to Ollama at {ollama_host}: {e}")
-            
-            response = ollama_client.chat(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                stream=False
-            )
-            return response["message"]["content"]
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"LLM error: {str(e)}")
+        async for piece in stream:
+            yield piece
+    finally:
+        # Closing early drops the HTTP stream, which stops generation on the model host
+        await stream.aclose()
 
-def generate_documentation_with_llm(code: str, description: str) -> str:
+async def collect_streamed_code(description: str, context: Optional[str] = None,
+                                on_token: Optional[Callable[[str], None]] = None) -> Tuple[str, Dict[str, Any]]:
+    """Drain stream_code_with_llm, forwarding each chunk to on_token.
+
+    Stops as soon as a fenced block with setup() and loop() has closed; the
+    model's closing explanation would be dropped by clean_code_output anyway.
+
+    Returns:
+        (full text, stream report from sketch_cutoff.record())
+    """
+    stop_at_sketch = sketch_cutoff.should_stop()
+    parts, text, sketch_tokens = [], "", None
+    stream = stream_code_with_llm(description, context)
+    try:
+        async for piece in stream:
+            parts.append(piece)
+            if on_token:
+                on_token(piece)
+            # A fence can only close on a chunk with a backtick in it
+            if sketch_tokens is None and "`" in piece:
+                text = "".join(parts)
+                if sketch_end(text) is not None:
+                    sketch_tokens = len(parts)
+                    if stop_at_sketch:
+                        break
+    finally:
+        await stream.aclose()
+    stopped_early = stop_at_sketch and sketch_tokens is not None
+    report = sketch_cutoff.record(len(parts), sketch_tokens, stopped_early)
+    if stopped_early:
+        print(f"✂️  Stream stopped after the sketch: {report['tokens']} tokens"
+              + (f", ~{report['tokens_saved']} saved" if report["tokens_saved"] is not None else ""))
+    return "".join(parts), report
+
+async def generate_documentation_with_llm(code: str, description: str) -> Optional[str]:
     """Generate markdown documentation."""
     
     doc_prompt = f"""Generate documentation for this ESP32 code.
@@ -865,29 +1085,15 @@ Include:
 Return ONLY documentation, no code blocks."""
     
     try:
-        if USING_OPENAI:
-            response = openai_client.chat.completions.create(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a technical writer."},
-                    {"role": "user", "content": doc_prompt}
-                ],
-                temperature=0.5,
-                max_tokens=2048
-            )
-            return response.choices[0].message.content
-        
-        elif USING_OLLAMA:
-            response = ollama_client.chat(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a technical writer."},
-                    {"role": "user", "content": doc_prompt}
-                ],
-                stream=False
-            )
-            return response["message"]["content"]
-    
+        return await llm.chat(
+            [
+                {"role": "system", "content": "You are a technical writer."},
+                {"role": "user", "content": doc_prompt}
+            ],
+            temperature=0.5,
+            max_tokens=2048,
+            model=llm_models.model_for("docs")
+        )
     except Exception as e:
         print(f"⚠ Documentation error: {str(e)}")
         return None
@@ -931,6 +1137,24 @@ def cleanup_old_files(max_files: int = 3):
     except Exception:
         pass
 
+@app.on_event("startup")
+async def start_job_workers():
+    """Start async job workers (and LLM host probes / model warm-up) on the server's event loop."""
+    await job_queue.start()
+    if isinstance(llm, LLMPool):
+        await llm.start_probes()
+        if OLLAMA_WARMUP:
+            await llm.start_warmup(llm_models.models(), OLLAMA_KEEP_WARM_SECONDS)
+
+@app.on_event("shutdown")
+async def shutdown_pools():
+    """Stop job workers, release executor threads and close LLM connections on shutdown."""
+    await job_queue.stop()
+    shutdown_executors(wait=False)
+    compile_scheduler.shutdown()
+    arduino_backend.close()
+    await llm.aclose()
+
 @app.get("/")
 async def root():
     """Serve web UI."""
@@ -939,38 +1163,53 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint with Phase 8 enhancements."""
-    pio_installed = os.system("pio --version > /dev/null 2>&1") == 0
-    arduino_cli_path = check_arduino_cli()
+    toolchain = await run_compile(toolchain_status.get)
     
     # Get cache statistics
     cache_stats = response_cache.get_stats()
     
     return {
         "status": "healthy",
-        "backend": "Ollama" if USING_OLLAMA else "OpenAI" if USING_OPENAI else "None",
+        "backend": "Ollama" if USING_OLLAMA else "OpenAI",
         "model": LLM_MODEL,
-        "platformio_installed": pio_installed,
-        "arduino_cli_installed": bool(arduino_cli_path),
-        "arduino_cli_path": arduino_cli_path,
+        "llm": llm.get_stats(),
+        "models": llm_models.get_stats(),
+        "stream_cutoff": sketch_cutoff.get_stats(),
+        "templates": template_matcher.get_stats() if template_matcher else None,
+        "platformio_installed": toolchain["platformio_installed"],
+        "arduino_cli_installed": toolchain["arduino_cli_found"],
+        "arduino_cli_path": toolchain["arduino_cli_path"],
         "version": "3.2.0-phase8",
         "cache": cache_stats,
+        "executors": get_executor_stats(),
+        "compile_scheduler": compile_scheduler.get_stats(),
+        "jobs": job_queue.get_stats(),
+        "coalescing": generation_flights.get_stats(),
+        "toolchain": {**toolchain, "registry": core_registry.get_stats(), "build_cache": build_cache.get_stats(),
+                      "compile_cache": compile_result_cache.get_stats() if compile_result_cache else None,
+                      "syntax_gate": syntax_gate.get_stats() if syntax_gate else None,
+                      "backend": arduino_backend.get_stats()},
         "features": {
             "mcp_client": True,
             "ollama_sampling": True,
             "docs_generator": True,
             "response_cache": True,
-            "error_handling": True
+            "error_handling": True,
+            "async_jobs": True
         }
     }
 
+@app.post("/api/admin/toolchain/refresh")
+async def refresh_toolchain():
+    """Re-check the toolchain and re-read installed cores (after out-of-band installs)."""
+    toolchain = await run_compile(toolchain_status.get, True)
+    return {**toolchain, "registry": core_registry.get_stats()}
+
 @app.post("/api/clarifying-questions")
 async def get_clarifying_questions(request: CodeGenerationRequest):
     """Get clarifying questions for better code generation (Phase 6)."""
     try:
-        questions = ollama_sampler.generate_clarifying_questions(
-            request.description,
-            num_questions=3
-        )
+        questions = await ollama_sampler.generate_clarifying_questions(request.description, num_questions=3)
         return {
             "initial_prompt": request.description,
             "clarifying_questions": questions
@@ -992,17 +1231,11 @@ async def refine_and_generate(
         print(f"🔮 Refining requirements for: {initial_prompt}")
         print(f"{'='*70}")
         
-        refined = ollama_sampler.refine_requirements(
-            initial_prompt,
-            questions_answers
-        )
+        refined = await ollama_sampler.refine_requirements(initial_prompt, questions_answers)
         print(f"✓ Requirements refined")
         
         # Generate improved prompt
-        improved_prompt = ollama_sampler.generate_improved_prompt(
-            initial_prompt,
-            refined
-        )
+        improved_prompt = await ollama_sampler.generate_improved_prompt(initial_prompt, refined)
         print(f"✓ Improved prompt generated")
         
         # Use existing code generation with improved context
@@ -1017,83 +1250,32 @@ async def refine_and_generate(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Refinement failed: {str(e)}")
 
-@app.post("/api/generate-code", response_model=CodeGenerationResponse)
-async def generate_code(request: CodeGenerationRequest):
-    """Generate ESP32 firmware code with Phase 8 optimizations."""
-    
-    # Phase 8: Input validation
-    try:
-        validate_description(request.description)
-    except ValidationError as e:
-        logger.warning(f"Invalid input: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
-    
-    # Phase 8: Check cache first
-    cache_key = response_cache.get_cache_key(
-        description=request.description,
-        context=request.context or "",
-        compile=request.compile,
-        generate_docs=request.generate_docs
-    )
-    
-    cached_response = response_cache.get(cache_key)
-    if cached_response:
-        logger.info("Using cached response")
-        print("\n" + "="*70)
-        print("⚡ Cache Hit! Returning cached response")
-        print("="*70)
-        # Return cached response (would need to deserialize)
-        # For now, continue with generation
-    
-    cleanup_old_files(max_files=2)
-    
-    print(f"\n{'='*70}")
-    print(f"📝 Generating: {request.description}")
-    print(f"{'='*70}")
-    
-    # Phase 8: Code generation with error handling
+def _emit(emit: Optional[Callable[[str, Dict], None]], event: str, **data):
+    """Forward a pipeline event to the caller's sink (if any)."""
+    if emit is None:
+        return
     try:
-        logger.info(f"Starting code generation: {request.description[:50]}...")
-        generated = generate_code_with_llm(request.description, request.context)
-        code_only = clean_code_output(generated)
-        
-        # Phase 8: Validate generated code
-        validate_generated_code(code_only)
-        logger.info("Code generation successful")
-        
-    except ValidationError as e:
-        logger.error(f"Generated code validation failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Invalid code generated: {str(e)}")
-    except OllamaConnectionError as e:
-        logger.error(f"Ollama connection error: {e}")
-        raise HTTPException(status_code=503, detail="Code generation service unavailable")
+        emit(event, data)
     except Exception as e:
-        logger.error(f"Code generation error: {e}")
-        raise HTTPException(status_code=500, detail=f"Code generation failed: {str(e)}")
-    
-    filepath = save_code_to_file(code_only, request.description)
-    print(f"✓ Code saved: {filepath}")
-    
-    compilation_status = None
-    compilation_output = None
-    detected_libraries = None
-    error_summary = None
-    troubleshooting_suggestions = []
-    compilation_error_summary = None
-    compiled_binary_path = None
-    documentation = None
-    installation_guide = None
-    dependency_report = None
-    
-    # DETECT LIBRARIES (NO INSTALLATION)
-    print(f"\n>>> Smart library detection...")
-    detected_libraries = detect_required_libraries(code_only)
-    
-    if detected_libraries:
-        installation_guide = generate_installation_guide(detected_libraries)
-        print(f"\n📚 Generated installation guide for {len(detected_libraries)} libraries")
-    
-    # MCP CLIENT ANALYSIS
+        logger.warning(f"Pipeline event sink failed on {event}: {e}")
+
+@contextmanager
+def _stage(emit: Optional[Callable[[str, Dict], None]], name: str):
+    """Emit stage / stage_done events around a block."""
+    _emit(emit, "stage", stage=name)
+    try:
+        yield
+    finally:
+        _emit(emit, "stage_done", stage=name)
+
+async def _detect_stage(code_only: str, emit: Optional[Callable[[str, Dict], None]]) -> List[tuple]:
+    """DETECT LIBRARIES (NO INSTALLATION)"""
+    with _stage(emit, "detect"):
+        print(f"\n>>> Smart library detection...")
+        return await asyncio.to_thread(detect_required_libraries, code_only)
+
+def _run_mcp_analysis(code_only: str) -> tuple:
+    """MCP CLIENT ANALYSIS. Returns (hardware_specs, quality_analysis)."""
     print(f"\n>>> Querying MCP servers for analysis...")
     
     # 1. Hardware specs (WRAPPED with fallback)
@@ -1145,70 +1327,145 @@ async def generate_code(request: CodeGenerationRequest):
             "summary": "Analysis unavailable"
         }
     
-    # COMPILE CODE
-    if request.compile:
-        print(f"\n🔨 Preflight checks...")
-        preflight = preflight_check_arduino()
+    return hardware_specs, quality_analysis
+
+async def _analyze_stage(code_only: str, emit: Optional[Callable[[str, Dict], None]]) -> tuple:
+    """Run the MCP analysis off the event loop."""
+    with _stage(emit, "analyze"):
+        return await asyncio.to_thread(_run_mcp_analysis, code_only)
+
+# "expected initializer before 'isr'" is what an attribute or macro the stubs
+# do not define (ICACHE_RAM_ATTR, ISR(...), PROGMEM, ...) looks like to g++
+_STUB_GAP_SYNTAX_RE = re.compile(r"\bexpected\b.*\bbefore\b")
+
+def _syntax_errors_are_definite(error_dict: Dict) -> bool:
+    """True if the syntax gate found only plain syntax errors.
+
+    Undeclared names, unknown types or "expected ... before ..." errors may
+    just be gaps in the stub headers, so those leave the decision to the
+    real toolchain.
+    """
+    return bool(error_dict["syntax_errors"]) and not any(
+        error_dict[k] for k in ("type_errors", "ledc_api_errors", "other_errors", "missing_headers")) and not any(
+        _STUB_GAP_SYNTAX_RE.search(line) for line in error_dict["syntax_errors"])
+
+async def _compile_stage(request: CodeGenerationRequest, code_only: str, detected_libraries: List[tuple],
+                         emit: Optional[Callable[[str, Dict], None]],
+                         compile_sink: Optional[Callable[[str], None]]) -> dict:
+    """COMPILE CODE: syntax gate, preflight, library install, compile with retries and LEDC repair.
+
+    Returns the compile fields of CodeGenerationResponse plus the final `code`
+    (which differs from code_only when the LEDC auto-repair succeeded).
+    """
+    compilation_status = None
+    compilation_output = None
+    error_summary = None
+    troubleshooting_suggestions = []
+    compilation_error_summary = None
+    compiled_binary_path = None
+    build_artifacts_info = None
+    program_size = None
+    ram_usage = None
+    compiler_diagnostics = None
+    compilation_log_url = None
+    dependency_report = None
+    
+    # Determine target board FQBN from request.board
+    board_key = (request.board or "esp32dev").lower()
+    # Map user-friendly names to full names
+    board_map = {
+        "uno": "uno",
+        "nano": "nano",
+        "esp32": "esp32",
+        "esp32dev": "esp32",
+        "esp32devkit": "esp32",
+        "default": "esp32"
+    }
+    board_key = board_map.get(board_key, "esp32")
+    fqbn = ARDUINO_BOARD_MAP.get(board_key, ARDUINO_BOARD_MAP["default"])
+
+    # Host g++ against stub headers: syntax and LEDC API errors surface in well
+    # under a second, so they are repaired (or the sketch rejected) before any
+    # toolchain time is spent
+    syntax_check = None
+    syntax_blocks = False
+    if syntax_gate is not None:
+        with _stage(emit, "syntax"):
+            syntax_check = await run_compile(syntax_gate.check, code_only, fqbn)
+            gate_errors = parse_compilation_errors(syntax_check["output"]) if syntax_check["status"] == "failed" else None
+            if gate_errors and gate_errors.get("ledc_api_errors"):
+                repaired_code = repair_ledc_api_code(code_only, syntax_check["output"])
+                if repaired_code != code_only:
+                    print("🔧 Syntax check found LEDC API errors - repaired before compiling")
+                    code_only = repaired_code
+                    syntax_check = await run_compile(syntax_gate.check, code_only, fqbn)
+                    gate_errors = parse_compilation_errors(syntax_check["output"]) if syntax_check["status"] == "failed" else None
+            syntax_blocks = bool(gate_errors) and _syntax_errors_are_definite(gate_errors)
+        print(f"✓ Syntax check: {syntax_check['status']} ({syntax_check['duration_ms']} ms)"
+              + (f" - {syntax_check['reason']}" if syntax_check.get("reason") else ""))
+        if syntax_check["status"] == "failed" and not syntax_blocks:
+            print("⚠️  Syntax check errors may be gaps in the stub headers - leaving it to the real compile")
+    
+    print(f"\n🔨 Preflight checks...")
+    preflight = await run_compile(preflight_check_arduino)
+    
+    if not preflight["arduino_cli_found"]:
+        # Arduino CLI not available - skip compilation but show instructions
+        compilation_status = "skipped"
+        compilation_output = preflight["status_message"]
+        compilation_error_summary = "arduino-cli not installed"
+        print(f"⚠️  {compilation_error_summary}")
+    else:
+        print(f"✓ {preflight['status_message']}")
         
-        if not preflight["arduino_cli_found"]:
-            # Arduino CLI not available - skip compilation but show instructions
-            compilation_status = "skipped"
-            compilation_output = preflight["status_message"]
-            compilation_error_summary = "arduino-cli not installed"
-            print(f"⚠️  {compilation_error_summary}")
-        else:
-            print(f"✓ {preflight['status_message']}")
-            
-            if preflight["install_commands"]:
-                print(f"⚠️  Run these commands to install missing cores:")
-                for cmd in preflight["install_commands"]:
-                    print(f"  → {cmd}")
-            
-            # Save as Arduino sketch (.ino)
-            sketch_dir, sketch_file = save_sketch_as_ino(code_only, request.description)
-            print(f"✓ Sketch saved for Arduino CLI: {sketch_file}")
-
-            # Determine target board FQBN from request.board
-            board_key = (request.board or "esp32dev").lower()
-            # Map user-friendly names to full names
-            board_map = {
-                "uno": "uno",
-                "nano": "nano",
-                "esp32": "esp32",
-                "esp32dev": "esp32",
-                "esp32devkit": "esp32",
-                "default": "esp32"
+        if preflight["install_commands"]:
+            print(f"⚠️  Run these commands to install missing cores:")
+            for cmd in preflight["install_commands"]:
+                print(f"  → {cmd}")
+        
+        # Save as Arduino sketch (.ino)
+        sketch_dir, sketch_file = save_sketch_as_ino(code_only, request.description)
+        print(f"✓ Sketch saved for Arduino CLI: {sketch_file}")
+        print(f"  Target board: {board_key} → FQBN: {fqbn}")
+
+        initial_dependency_report = None
+        if syntax_blocks:
+            # Definite syntax errors: the real toolchain would only fail slower
+            print("❌ Syntax check failed - skipping library install and compilation")
+            compile_result = {
+                "success": False,
+                "returncode": 1,
+                "output": "--- SYNTAX CHECK (host g++, stub Arduino headers) ---\n" + syntax_check["output"]
             }
-            board_key = board_map.get(board_key, "esp32")
-            fqbn = ARDUINO_BOARD_MAP.get(board_key, ARDUINO_BOARD_MAP["default"])
-            print(f"  Target board: {board_key} → FQBN: {fqbn}")
-
+        else:
             # Best-effort: attempt to install detected libraries before compiling
-            initial_dependency_report = None
             if detected_libraries:
-                initial_dependency_report = install_libraries_with_arduino_cli(detected_libraries)
+                with _stage(emit, "install"):
+                    initial_dependency_report = await run_compile(install_libraries_with_arduino_cli, detected_libraries)
                 print(f"  → Library install attempt: {len(initial_dependency_report.get('installed', []))} installed, {len(initial_dependency_report.get('failed', []))} failed")
 
             # Compile with retries; compile_with_retries will auto-install missing headers and attach a dependency_report
-            compile_result = compile_with_retries(sketch_dir, fqbn, detected_libraries or [], max_retries=2, initial_dependency_report=initial_dependency_report)
-            compilation_output = compile_result.get("output")
-            dependency_report = compile_result.get("dependency_report", initial_dependency_report)
-
-            if compile_result.get("success"):
-                compilation_status = "success"
-                print("✓ Compilation successful!")
-            else:
-                compilation_status = "failed"
-                print("❌ Compilation failed")
-                # Print full compilation output for debugging
-                if compilation_output:
-                    print("\n=== COMPILATION ERROR DETAILS ===")
-                    print(compilation_output[-2000:])  # Last 2000 chars
-                    print("=== END DETAILS ===")
-                
-                # Check for LEDC API errors and attempt auto-repair
-                error_dict = parse_compilation_errors(compilation_output)
-                if error_dict.get("ledc_api_errors"):
+            with _stage(emit, "compile"):
+                compile_result = await run_compile(compile_with_retries, sketch_dir, fqbn, detected_libraries or [], max_retries=2, initial_dependency_report=initial_dependency_report, on_output=compile_sink)
+        compilation_output = compile_result.get("output")
+        dependency_report = compile_result.get("dependency_report", initial_dependency_report)
+
+        if compile_result.get("success"):
+            compilation_status = "success"
+            print("✓ Compilation successful!")
+        else:
+            compilation_status = "failed"
+            print("❌ Compilation failed")
+            # Print full compilation output for debugging
+            if compilation_output:
+                print("\n=== COMPILATION ERROR DETAILS ===")
+                print(compilation_output[-2000:])  # Last 2000 chars
+                print("=== END DETAILS ===")
+            
+            # Check for LEDC API errors and attempt auto-repair
+            error_dict = parse_compilation_errors(compilation_output, compile_result.get("diagnostics"))
+            if error_dict.get("ledc_api_errors"):
+                with _stage(emit, "repair"):
                     print("\n🔧 Detected LEDC API error - attempting auto-repair...")
                     repaired_code = repair_ledc_api_code(code_only, compilation_output)
                     
@@ -1219,90 +1476,420 @@ async def generate_code(request: CodeGenerationRequest):
                     
                     # Retry compilation with repaired code
                     print("  → Retrying compilation with repaired code...")
-                    compile_result = arduino_compile_sketch(sketch_dir, fqbn, detected_libraries)
-                    compilation_output = compile_result.get("output")
-                    
-                    if compile_result.get("success"):
-                        compilation_status = "success"
-                        print("  ✓ Compilation successful after repair!")
-                        code_only = repaired_code  # Update code_only with repaired version
-                    else:
-                        compilation_status = "failed"
-                        print("  ❌ Compilation still failed after repair")
-
-            # Error summary + troubleshooting
-            if compilation_output:
-                error_dict = parse_compilation_errors(compilation_output)
-                error_counts = {k: len(v) for k, v in error_dict.items()}
-                error_summary = (
-                    f"Syntax: {error_counts['syntax_errors']}, "
-                    f"Missing Headers: {error_counts['missing_headers']}, "
-                    f"Undefined Refs: {error_counts['undefined_references']}, "
-                    f"Type Errors: {error_counts['type_errors']}, "
-                    f"LEDC API: {error_counts.get('ledc_api_errors', 0)}, "
-                    f"Other: {error_counts['other_errors']}"
-                )
-                troubleshooting_suggestions = generate_troubleshooting_suggestions(error_dict)
-
-            # Short human-readable compilation error summary (first error lines)
-            compilation_error_summary = None
-            if compilation_output:
+                    compile_result = await run_compile(arduino_compile_sketch, sketch_dir, fqbn, detected_libraries, on_output=compile_sink)
+                compilation_output = compile_result.get("output")
+                
+                if compile_result.get("success"):
+                    compilation_status = "success"
+                    print("  ✓ Compilation successful after repair!")
+                    code_only = repaired_code  # Update code_only with repaired version
+                else:
+                    compilation_status = "failed"
+                    print("  ❌ Compilation still failed after repair")
+
+        # Error summary + troubleshooting, from one parse of the final output
+        # (streamed compiles already carry their parsed diagnostics)
+        diagnostics = compile_result.get("diagnostics")
+        if diagnostics is None and compilation_output:
+            diagnostics = parse_diagnostics(compilation_output)
+        if compilation_output:
+            error_dict = parse_compilation_errors(compilation_output, diagnostics)
+            error_counts = {k: len(v) for k, v in error_dict.items()}
+            error_summary = (
+                f"Syntax: {error_counts['syntax_errors']}, "
+                f"Missing Headers: {error_counts['missing_headers']}, "
+                f"Undefined Refs: {error_counts['undefined_references']}, "
+                f"Type Errors: {error_counts['type_errors']}, "
+                f"LEDC API: {error_counts.get('ledc_api_errors', 0)}, "
+                f"Other: {error_counts['other_errors']}"
+            )
+            troubleshooting_suggestions = generate_troubleshooting_suggestions(error_dict)
+
+        # Short human-readable compilation error summary (first error lines)
+        compilation_error_summary = None
+        if compilation_output:
+            errs = [format_diagnostic(r) for r in diagnostics if r["severity"] == "error"]
+            if not errs:
+                # Tool-level failures (timeouts, arduino-cli errors) are not compiler diagnostics
                 lines = [l.strip() for l in compilation_output.splitlines() if l.strip()]
                 errs = [l for l in lines if "error" in l.lower() or "fatal" in l.lower()]
-                if errs:
-                    compilation_error_summary = " | ".join(errs[:3])
-                else:
-                    compilation_error_summary = (lines[0][:300] + "...") if lines else None
+            if errs:
+                compilation_error_summary = " | ".join(errs[:3])
+            else:
+                compilation_error_summary = (lines[0][:300] + "...") if lines else None
+
+        compiled_binary_path = compile_result.get("binary_path")
+        build_artifacts_info = compile_result.get("artifacts") or None
+        program_size = compile_result.get("program_size")
+        ram_usage = compile_result.get("ram_usage")
+        compiler_diagnostics = diagnostics
+        compilation_log_url = _write_build_log(sketch_dir, compilation_output)
+        if program_size:
+            print(f"  → Flash: {program_size['used_bytes']} bytes"
+                  + (f" ({program_size['percent']}%)" if program_size.get("percent") is not None else ""))
+    
+    return {
+        "code": code_only,
+        "compilation_status": compilation_status,
+        "compilation_output": _output_tail(compilation_output, compilation_log_url),
+        "compilation_log_url": compilation_log_url,
+        "compilation_error_summary": compilation_error_summary,
+        "compiled_binary_path": compiled_binary_path,
+        "build_artifacts": build_artifacts_info,
+        "program_size": program_size,
+        "ram_usage": ram_usage,
+        "compiler_diagnostics": compiler_diagnostics,
+        "error_summary": error_summary,
+        "troubleshooting_suggestions": troubleshooting_suggestions,
+        "dependency_report": dependency_report,
+        "syntax_check": syntax_check
+    }
+
+def _build_documentation(request: CodeGenerationRequest, code_only: str, detected_libraries: List[tuple],
+                         filepath: str) -> Optional[str]:
+    """GENERATE DOCUMENTATION (Phase 7: Enhanced)"""
+    documentation = None
+    print(f"\n📚 Generating comprehensive documentation (Phase 7)...")
+    try:
+        # Use Phase 7 Documentation Generator
+        doc_content = docs_generator.generate_full_documentation(
+            code=code_only,
+            description=request.description,
+            libraries=[lib for lib, _ in detected_libraries] if detected_libraries else []
+        )
+        
+        if doc_content:
+            doc_path = save_documentation(doc_content, filepath)
+            # Return FULL documentation content for frontend display
+            documentation = doc_content  # Changed: return full content, not truncated
+            print(f"✓ Professional documentation generated ({len(doc_content)} chars)")
+            logger.info(f"Documentation generated: {len(doc_content)} characters")
+    except Exception as e:
+        error_msg = f"Doc generation error: {str(e)}"
+        print(f"⚠ {error_msg}")
+        logger.error(error_msg)
+        # Generate fallback documentation
+        documentation = f"# {request.description}\n\nDocumentation generation encountered an error. Please refer to the generated code."
+    return documentation
+
+async def _docs_stage(request: CodeGenerationRequest, code_only: str, detected_libraries: List[tuple],
+                      filepath: str, emit: Optional[Callable[[str, Dict], None]]) -> Optional[str]:
+    """Generate and save documentation off the event loop."""
+    with _stage(emit, "docs"):
+        return await asyncio.to_thread(_build_documentation, request, code_only, detected_libraries, filepath)
 
-            compiled_binary_path = compile_result.get("binary_path")
+@app.post("/api/generate-code", response_model=CodeGenerationResponse)
+async def generate_code(request: CodeGenerationRequest):
+    """Generate ESP32 firmware code with Phase 8 optimizations."""
+    return await run_generation_pipeline(request)
+
+async def run_generation_pipeline(request: CodeGenerationRequest,
+                                  emit: Optional[Callable[[str, Dict], None]] = None,
+                                  stream: bool = False) -> CodeGenerationResponse:
+    """Run the full generation pipeline, reporting each stage through `emit`.
+
+    `emit(event, data)` receives ("stage", {"stage": name}) when a stage starts
+    and ("stage_done", {"stage": name}) when it ends; once the code exists,
+    analyze, compile and docs run concurrently so several stages can be active.
+    Stages: llm, detect, analyze, syntax, install, compile, repair, docs.
+    With `stream=True` it also receives ("token", {"text"}) for every LLM chunk,
+    ("code", {"code"}) once the sketch is extracted and ("compile", {"line"}) for
+    every compiler output line. Those come from worker threads, so the sink must
+    be thread-safe. A request that joins an identical in-flight run receives
+    that run's events from the moment it joins.
+    """
+    
+    # Phase 8: Input validation
+    try:
+        validate_description(request.description)
+    except ValidationError as e:
+        logger.warning(f"Invalid input: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Phase 8: Check cache first
+    cache_key = response_cache.get_cache_key(
+        description=request.description,
+        context=request.context or "",
+        board=request.board or "esp32dev",
+        compile=request.compile,
+        generate_docs=request.generate_docs
+    )
+    
+    cached_response = None if request.force_regenerate else await response_cache.aget(cache_key)
+    if cached_response:
+        logger.info("Using cached response")
+        print("\n" + "="*70)
+        print("⚡ Cache Hit! Returning cached response")
+        print("="*70)
+        if stream:
+            _emit(emit, "code", code=cached_response["generated_code"])
+        return CodeGenerationResponse(**{**cached_response, "from_cache": True})
     
-    # GENERATE DOCUMENTATION (Phase 7: Enhanced) - ALWAYS GENERATE
+    # Identical requests arriving while this one runs share its LLM call and
+    # compile instead of starting their own. Streaming and plain requests fly
+    # separately: only a streaming leader emits token and compile events.
+    return await generation_flights.do(
+        f"{cache_key}:{'stream' if stream else 'json'}",
+        lambda flight_emit: _generate_uncached(request, cache_key, flight_emit, stream),
+        emit=emit
+    )
+
+async def _generate_uncached(request: CodeGenerationRequest, cache_key: str,
+                             emit: Optional[Callable[[str, Dict], None]],
+                             stream: bool) -> CodeGenerationResponse:
+    """Generate, analyze, compile and document a sketch, then cache the result."""
+    # Reject before spending an LLM call on a sketch we could not compile
+    if request.compile and compile_scheduler.saturated():
+        raise HTTPException(status_code=503, detail="Compile queue full, try again shortly",
+                            headers={"Retry-After": "30"})
+    
+    cleanup_old_files(max_files=2)
+    
+    print(f"\n{'='*70}")
+    print(f"📝 Generating: {request.description}")
+    print(f"{'='*70}")
+    
+    # Template fast path: no LLM call when the description maps to a known sketch
+    # (skipped when extra context is given, since a template cannot honour it)
+    template_match = None
+    if template_matcher and not request.context:
+        template_match = template_matcher.match(request.description, request.board)
+        if template_match["matched"]:
+            print(f"🧩 Template '{template_match['template']}' (confidence {template_match['confidence']}, "
+                  f"{template_match['duration_ms']} ms)")
+        else:
+            template_match = None
+    code_stage = "template" if template_match else "llm"
+    
+    # Phase 8: Code generation with error handling
+    _emit(emit, "stage", stage=code_stage)
+    llm_stream = None
+    try:
+        logger.info(f"Starting code generation: {request.description[:50]}...")
+        if template_match:
+            generated = template_match["code"]
+        elif stream:
+            generated, llm_stream = await collect_streamed_code(request.description, request.context,
+                                                                lambda piece: _emit(emit, "token", text=piece))
+        else:
+            generated = await generate_code_with_llm(request.description, request.context)
+        code_only = clean_code_output(generated)
+        
+        # Phase 8: Validate generated code
+        validate_generated_code(code_only)
+        logger.info("Code generation successful")
+        
+    except ValidationError as e:
+        logger.error(f"Generated code validation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Invalid code generated: {str(e)}")
+    except (OllamaConnectionError, LLMConnectionError) as e:
+        logger.error(f"LLM connection error: {e}")
+        raise HTTPException(status_code=503, detail="Code generation service unavailable")
+    except Exception as e:
+        logger.error(f"Code generation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Code generation failed: {str(e)}")
+    _emit(emit, "stage_done", stage=code_stage)
+    
+    filepath = save_code_to_file(code_only, request.description)
+    print(f"✓ Code saved: {filepath}")
+    if stream:
+        _emit(emit, "code", code=code_only)
+    compile_sink = (lambda line: _emit(emit, "compile", line=line)) if stream else None
+    
+    # Once the code exists only the LEDC repair depends on compile output, so
+    # analysis, docs and compile run concurrently as a small DAG.
+    graph = TaskGraph()
+    graph.add("detect", lambda: _detect_stage(code_only, emit))
+    graph.add("analyze", lambda: _analyze_stage(code_only, emit))
+    if request.compile:
+        graph.add("compile", lambda detect: _compile_stage(request, code_only, detect, emit, compile_sink),
+                  deps=["detect"])
     if request.generate_docs:
-        print(f"\n📚 Generating comprehensive documentation (Phase 7)...")
-        try:
-            # Use Phase 7 Documentation Generator
-            doc_content = docs_generator.generate_full_documentation(
-                code=code_only,
-                description=request.description,
-                libraries=[lib for lib, _ in detected_libraries] if detected_libraries else []
-            )
-            
-            if doc_content:
-                doc_path = save_documentation(doc_content, filepath)
-                # Return FULL documentation content for frontend display
-                documentation = doc_content  # Changed: return full content, not truncated
-                print(f"✓ Professional documentation generated ({len(doc_content)} chars)")
-                logger.info(f"Documentation generated: {len(doc_content)} characters")
-        except Exception as e:
-            error_msg = f"Doc generation error: {str(e)}"
-            print(f"⚠ {error_msg}")
-            logger.error(error_msg)
-            # Generate fallback documentation
-            documentation = f"# {request.description}\n\nDocumentation generation encountered an error. Please refer to the generated code."
+        graph.add("docs", lambda detect: _docs_stage(request, code_only, detect, filepath, emit),
+                  deps=["detect"])
+    try:
+        results = await graph.run()
+    except CompileQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    logger.info(f"Pipeline stage timings (s): {graph.timings}")
+    
+    detected_libraries = results["detect"]
+    hardware_specs, quality_analysis = results["analyze"]
+    compile_info = results.get("compile") or {}
+    documentation = results.get("docs")
+    
+    # A finished build knows the real flash/RAM figures: they replace the
+    # source-length estimate from the analysis stage
+    if compile_info.get("program_size") or compile_info.get("ram_usage"):
+        quality_analysis = mcp_client.apply_build_memory(
+            quality_analysis, compile_info.get("program_size"), compile_info.get("ram_usage"),
+            (request.board or "esp32dev").lower())
+        memory = quality_analysis.get("memory") or {}
+        if memory:
+            print(f"💾 Memory (build): flash {memory.get('flash_percent')}%, RAM {memory.get('ram_percent')}% "
+                  f"({memory.get('memory_status')})")
+    
+    # The LEDC auto-repair changed the sketch: regenerate docs to match
+    if compile_info.get("code", code_only) != code_only:
+        code_only = compile_info["code"]
+        if request.generate_docs:
+            documentation = await _docs_stage(request, code_only, detected_libraries, filepath, emit)
+    
+    installation_guide = None
+    if detected_libraries:
+        installation_guide = generate_installation_guide(detected_libraries)
+        print(f"\n📚 Generated installation guide for {len(detected_libraries)} libraries")
+    
+    compilation_output = compile_info.get("compilation_output")
+    troubleshooting_suggestions = compile_info.get("troubleshooting_suggestions")
     
     print(f"\n{'='*70}\n")
     
-    return CodeGenerationResponse(
+    response = CodeGenerationResponse(
         description=request.description,
         generated_code=code_only,
         file_path=filepath,
-        compilation_status=compilation_status,
+        compilation_status=compile_info.get("compilation_status"),
         compilation_output=compilation_output if compilation_output else None,
-        compilation_error_summary=compilation_error_summary,
-        compiled_binary_path=compiled_binary_path,
+        compilation_log_url=compile_info.get("compilation_log_url"),
+        compilation_error_summary=compile_info.get("compilation_error_summary"),
+        compiled_binary_path=compile_info.get("compiled_binary_path"),
+        syntax_check=compile_info.get("syntax_check"),
+        build_artifacts=compile_info.get("build_artifacts"),
+        program_size=compile_info.get("program_size"),
+        ram_usage=compile_info.get("ram_usage"),
+        compiler_diagnostics=compile_info.get("compiler_diagnostics"),
         detected_libraries=[f"{h} → {l}" for h, l in detected_libraries] if detected_libraries else None,
-        error_summary=error_summary,
+        error_summary=compile_info.get("error_summary"),
         troubleshooting_suggestions=troubleshooting_suggestions if troubleshooting_suggestions else None,
         documentation=documentation,
         installation_guide=installation_guide,
-        dependency_report=dependency_report,
+        dependency_report=compile_info.get("dependency_report"),
         # NEW: MCP Analysis Results
         hardware_info=hardware_specs,
         code_quality_score=quality_analysis['quality_score'],
         memory_usage=quality_analysis.get('estimated_ram_usage_percent'),
         quality_issues=quality_analysis.get('issues', []),  # Now structured!
-        quality_warnings=quality_analysis.get('warnings', []) 
+        quality_warnings=quality_analysis.get('warnings', []),
+        llm_stream=llm_stream,
+        template={k: template_match[k] for k in ("template", "confidence", "params", "duration_ms")}
+        if template_match else None
     )
+    
+    # Only cache runs worth replaying: a failed or skipped compile may well
+    # succeed on the next attempt.
+    if response.compilation_status in (None, "success"):
+        await response_cache.aset(cache_key, response.model_dump())
+    
+    return response
+
+def _format_sse(event: str, data: Dict) -> str:
+    """Format one Server-Sent Event frame (data is JSON on a single line)."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/api/generate-code/stream")
+async def generate_code_stream(request: CodeGenerationRequest):
+    """Stream generation as Server-Sent Events.
+
+    Events: stage, token (LLM text chunks), code (extracted sketch), compile
+    (one compiler output line), summary (final CodeGenerationResponse), error.
+    """
+    try:
+        validate_description(request.description)
+    except ValidationError as e:
+        logger.warning(f"Invalid input: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def sink(event: str, data: Dict):
+        # Called from the event loop and from executor threads alike
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+    
+    async def run():
+        try:
+            response = await run_generation_pipeline(request, emit=sink, stream=True)
+            sink("summary", response.model_dump())
+        except HTTPException as e:
+            sink("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.error(f"Streaming generation failed: {e}")
+            sink("error", {"status_code": 500, "detail": str(e)})
+        finally:
+            sink("end", {})
+    
+    async def event_stream():
+        task = asyncio.create_task(run())
+        try:
+            # Flush headers and a first frame right away
+            yield ": stream opened\n\n"
+            while True:
+                event, data = await events.get()
+                if event == "end":
+                    break
+                yield _format_sse(event, data)
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(request: CodeGenerationRequest):
+    """Queue a generation job and return its id immediately."""
+    try:
+        validate_description(request.description)
+    except ValidationError as e:
+        logger.warning(f"Invalid input: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        job = job_queue.submit(request)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    
+    logger.info(f"Job {job.job_id} queued: {request.description[:50]}...")
+    return JobSubmitResponse(
+        job_id=job.job_id,
+        status=job.status,
+        status_url=f"/api/jobs/{job.job_id}",
+        queue_position=job_queue.queue_position(job)
+    )
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """Report job status, current stage and (once done) the full response."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return JobStatusResponse(**job.to_dict(), queue_position=job_queue.queue_position(job))
+
+@app.get("/api/jobs/{job_id}/result", response_model=CodeGenerationResponse)
+async def get_job_result(job_id: str):
+    """Return the final CodeGenerationResponse of a finished job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=job.error_status_code or 500, detail=job.error)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is {job.status} (stage: {job.stage})")
+    return job.result
+
+@app.get("/api/builds/{build_id}/log")
+async def get_build_log(build_id: str):
+    """Download the full compile log of a build (build_id is the sketch folder name)."""
+    if not re.fullmatch(r"\w[\w.-]*", build_id):
+        raise HTTPException(status_code=400, detail="Invalid build id")
+    path = os.path.join(ARDUINO_BUILD_PATH, build_id, BUILD_LOG_NAME)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"No compile log for build '{build_id}'")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=f"{build_id}.log")
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
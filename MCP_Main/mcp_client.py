@@ -203,25 +203,29 @@ class MCPClient:
     # CODE QUALITY METHODS - REFACTORED (Delegation to Server)
     # ============================================================================
     
-    def analyze_code_quality(self, code: str, board: str = "esp32dev") -> Dict:
+    def analyze_code_quality(self, code: str, board: str = "esp32dev", program_size: Optional[Dict] = None,
+                             ram_usage: Optional[Dict] = None) -> Dict:
         """
         Analyze code quality - DELEGATES to code_quality_server.py
         
         This is now a thin wrapper that delegates ALL analysis logic
-        to the specialized code quality server.
+        to the specialized code quality server. Build sizes, when given,
+        replace the memory estimate.
         """
         
         if HAS_QUALITY_SERVER and self.quality_analyzer:
             # Delegate to the specialized server
-            return self.quality_analyzer.analyze(code, board)
+            return self.apply_build_memory(self.quality_analyzer.analyze(code, board), program_size, ram_usage, board)
         else:
             # Fallback mode when server unavailable
-            return self._fallback_quality_analysis(code, board)
+            return self._fallback_quality_analysis(code, board, program_size, ram_usage)
     
-    def _fallback_quality_analysis(self, code: str, board: str) -> Dict:
+    def _fallback_quality_analysis(self, code: str, board: str, program_size: Optional[Dict] = None,
+                                   ram_usage: Optional[Dict] = None) -> Dict:
         """
         Minimal fallback analysis when code quality server unavailable.
-        Returns simplified structure compatible with main.py API.
+        Returns simplified structure compatible with main.py API; memory
+        comes from the build sizes if given, else from the text length.
         """
         
         issues = []
@@ -247,7 +251,7 @@ class MCPClient:
         ram_kb = board_specs.get("ram_kb", 520)
         usage_percent = (code_size_kb / ram_kb) * 100
         
-        return {
+        analysis = {
             "quality_score": max(0, score),
             "issues": issues,
             "warnings": warnings,
@@ -255,9 +259,58 @@ class MCPClient:
             "code_size_kb": round(code_size_kb, 2),
             "estimated_ram_usage_percent": round(usage_percent, 1),
             "memory_status": "critical" if usage_percent > 80 else "warning" if usage_percent > 50 else "good",
+            "memory_source": "estimate",
             "severity": "critical" if score < 50 else "high" if score < 75 else "medium" if score < 90 else "excellent",
             "summary": f"Fallback analysis: {len(issues)} issues, {len(warnings)} warnings (score: {score}/100)"
         }
+        return self._fallback_build_memory(analysis, program_size, ram_usage, board)
+    
+    def _fallback_build_memory(self, analysis: Dict, program_size: Optional[Dict], ram_usage: Optional[Dict],
+                               board: str) -> Dict:
+        """
+        Memory figures from the arduino-cli size output when the code quality
+        server is unavailable (limits are the maximums arduino-cli reports).
+        """
+        if not program_size and not ram_usage:
+            return analysis
+        
+        def percent(usage: Optional[Dict]) -> Optional[float]:
+            if not usage or usage.get("used_bytes") is None or not usage.get("max_bytes"):
+                return None
+            return round(usage["used_bytes"] / usage["max_bytes"] * 100, 1)
+        
+        flash_percent, ram_percent = percent(program_size), percent(ram_usage)
+        worst = max(flash_percent or 0, ram_percent or 0)
+        status = ("critical" if (flash_percent or 0) > 90 or (ram_percent or 0) > 85
+                  else "warning" if (flash_percent or 0) > 75 or (ram_percent or 0) > 70 else "good")
+        return {
+            **analysis,
+            "estimated_ram_usage_percent": ram_percent,
+            "memory_status": status,
+            "memory_source": "build",
+            "memory": {
+                "source": "build",
+                "board": board,
+                "flash_used_bytes": (program_size or {}).get("used_bytes"),
+                "flash_max_bytes": (program_size or {}).get("max_bytes"),
+                "flash_percent": flash_percent,
+                "ram_used_bytes": (ram_usage or {}).get("used_bytes"),
+                "ram_max_bytes": (ram_usage or {}).get("max_bytes"),
+                "ram_percent": ram_percent,
+                "memory_status": status,
+                "usage_percent": worst
+            }
+        }
+    
+    def apply_build_memory(self, analysis: Dict, program_size: Optional[Dict], ram_usage: Optional[Dict],
+                           board: str = "esp32dev") -> Dict:
+        """
+        Swap the text-length memory estimate for real build figures - DELEGATES
+        to code_quality_server.py (arduino-cli figures only without it).
+        """
+        if HAS_QUALITY_SERVER:
+            return CodeQualityAnalyzer().apply_build_memory(analysis, program_size, ram_usage, board)
+        return self._fallback_build_memory(analysis, program_size, ram_usage, board)
     
     # ============================================================================
     # COMBINED ANALYSIS (Updated to use refactored quality)
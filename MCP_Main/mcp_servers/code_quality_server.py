@@ -6,7 +6,7 @@ Analyzes generated code for structure, safety, and best practices
 
 import re
 import json
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 
 # Try importing MCP SDK
 try:
@@ -27,6 +27,17 @@ BOARD_SPECS = {
     "esp32c3": {"total_ram": 400, "system_reserve": 80}
 }
 
+# Flash/RAM limits for real build figures (upload.max_size / upload.max_ram)
+try:
+    from hardware_database_server import BOARD_DATABASE
+except ImportError:
+    BOARD_DATABASE = {}
+
+# Board ids the API accepts (CodeGenerationRequest.board) that name a
+# BOARD_DATABASE entry differently; uno/nano have no entry and use the
+# limits arduino-cli reports
+BOARD_ALIASES = {"esp32": "esp32dev", "esp32devkit": "esp32dev", "default": "esp32dev"}
+
 # ============================================================================
 # CODE QUALITY ANALYZER
 # ============================================================================
@@ -45,6 +56,7 @@ class CodeQualityAnalyzer:
         self.board = board  # Store board for memory estimation
         self.issues = []
         self.warnings = []
+        self.memory_messages = []
         self.quality_score = 100
         
         # Run all checks
@@ -69,7 +81,40 @@ class CodeQualityAnalyzer:
             "warnings_count": len(self.warnings),
             "severity": self._get_severity(),
             "summary": self._get_summary(),
-            "estimated_ram_usage_percent": self._estimate_ram_usage(board)
+            "estimated_ram_usage_percent": self._estimate_ram_usage(board),
+            "memory_source": "estimate",
+            "memory_messages": list(self.memory_messages)
+        }
+    
+    def apply_build_memory(self, analysis: Dict, program_size: Optional[Dict], ram_usage: Optional[Dict],
+                           board: str = "esp32dev") -> Dict:
+        """Replace the source-length memory estimate in an analysis with real build figures.
+        
+        Estimate-based issues/warnings are dropped, findings from the build
+        are added and the score, severity and summary are recomputed.
+        """
+        report = build_memory_report(program_size, ram_usage, board)
+        if report is None:
+            return analysis
+        
+        estimated = set(analysis.get("memory_messages", []))
+        self.issues = [i for i in analysis.get("issues", []) if i not in estimated] + report["issues"]
+        self.warnings = [w for w in analysis.get("warnings", []) if w not in estimated] + report["warnings"]
+        self.quality_score = max(0, 100 - (len(self.issues) * 15 + len(self.warnings) * 5))
+        
+        return {
+            **analysis,
+            "quality_score": self.quality_score,
+            "issues": self.issues,
+            "warnings": self.warnings,
+            "issues_count": len(self.issues),
+            "warnings_count": len(self.warnings),
+            "severity": self._get_severity(),
+            "summary": self._get_summary(),
+            "estimated_ram_usage_percent": report["ram_percent"],
+            "memory": report,
+            "memory_source": "build",
+            "memory_messages": report["issues"] + report["warnings"]
         }
     
     def _check_setup_loop(self):
@@ -169,9 +214,11 @@ class CodeQualityAnalyzer:
         usage_percent = (code_size_kb / ram_kb) * 100
         
         if usage_percent > 80:
-            self.issues.append(f"Code size ({code_size_kb:.1f}KB) is very large for {board}")
+            self.memory_messages.append(f"Code size ({code_size_kb:.1f}KB) is very large for {board}")
+            self.issues.append(self.memory_messages[-1])
         elif usage_percent > 50:
-            self.warnings.append(f"Code size ({code_size_kb:.1f}KB) uses >50% of available RAM")
+            self.memory_messages.append(f"Code size ({code_size_kb:.1f}KB) uses >50% of available RAM")
+            self.warnings.append(self.memory_messages[-1])
     
     def _estimate_ram_usage(self, board: str) -> float:
         """Return RAM usage percentage."""
@@ -214,8 +261,76 @@ class CodeQualityAnalyzer:
 # MEMORY ESTIMATION
 # ============================================================================
 
-def estimate_heap_usage(code: str, board: str) -> Dict:
-    """Estimate heap memory usage."""
+def board_memory_limits(board: str) -> Tuple[Optional[int], Optional[int]]:
+    """Flash and RAM limits in bytes from the hardware database (None if unknown)."""
+    upload = BOARD_DATABASE.get(BOARD_ALIASES.get(board, board), {}).get("upload", {})
+    return upload.get("max_size"), upload.get("max_ram")
+
+def build_memory_report(program_size: Optional[Dict], ram_usage: Optional[Dict], board: str) -> Optional[Dict]:
+    """
+    Memory report from a finished build (arduino-cli text/data section sizes).
+    
+    Usage is compared against the board's limits in BOARD_DATABASE; boards
+    not in the database use the maximum arduino-cli reported.
+    
+    Args:
+        program_size: {"used_bytes", "max_bytes"} for flash, or None
+        ram_usage: {"used_bytes", "max_bytes"} for static RAM (data + bss), or None
+        board: Board id, e.g. "esp32dev"
+    
+    Returns:
+        Report dict, or None if the build reported no sizes
+    """
+    if not program_size and not ram_usage:
+        return None
+    
+    max_flash, max_ram = board_memory_limits(board)
+    flash_used = (program_size or {}).get("used_bytes")
+    ram_used = (ram_usage or {}).get("used_bytes")
+    max_flash = max_flash or (program_size or {}).get("max_bytes")
+    max_ram = max_ram or (ram_usage or {}).get("max_bytes")
+    flash_percent = round(flash_used / max_flash * 100, 1) if flash_used is not None and max_flash else None
+    ram_percent = round(ram_used / max_ram * 100, 1) if ram_used is not None and max_ram else None
+    
+    issues = []
+    warnings = []
+    if flash_percent is not None:
+        if flash_percent > 90:
+            issues.append(f"Program uses {flash_used} bytes ({flash_percent}%) of flash on {board} - little room to grow")
+        elif flash_percent > 75:
+            warnings.append(f"Program uses {flash_used} bytes ({flash_percent}%) of flash on {board}")
+    if ram_percent is not None:
+        if ram_percent > 85:
+            issues.append(f"Global variables use {ram_used} bytes ({ram_percent}%) of RAM - "
+                          f"only {max_ram - ram_used} bytes left for stack and heap")
+        elif ram_percent > 70:
+            warnings.append(f"Global variables use {ram_used} bytes ({ram_percent}%) of RAM - stability problems may occur")
+    
+    worst = max(flash_percent or 0, ram_percent or 0)
+    return {
+        "source": "build",
+        "board": board,
+        "flash_used_bytes": flash_used,
+        "flash_max_bytes": max_flash,
+        "flash_percent": flash_percent,
+        "ram_used_bytes": ram_used,
+        "ram_max_bytes": max_ram,
+        "ram_percent": ram_percent,
+        "ram_free_bytes": max_ram - ram_used if ram_used is not None and max_ram else None,
+        "memory_status": "critical" if issues else "warning" if warnings else "good",
+        "usage_percent": worst,
+        "issues": issues,
+        "warnings": warnings
+    }
+
+def estimate_heap_usage(code: str, board: str, program_size: Optional[Dict] = None,
+                        ram_usage: Optional[Dict] = None) -> Dict:
+    """Estimate heap memory usage (real figures when build sizes are given)."""
+    report = build_memory_report(program_size, ram_usage, board)
+    if report is not None:
+        return report
+    
+    # No build: rough estimate from the source text
     
     # Count various memory allocations
     global_vars = len(re.findall(r'^\s*(int|float|double|char|bool|uint\d+_t)\s+\w+', code, re.MULTILINE))
@@ -235,7 +350,8 @@ def estimate_heap_usage(code: str, board: str) -> Dict:
         "system_reserved_kb": specs["system_reserve"],
         "estimated_free_ram_kb": max(0, available),
         "usage_percent": min(100, ((len(code) / 1024) / specs["total_ram"]) * 100),
-        "safety_margin": "good" if available > 50 else "warning" if available > 10 else "critical"
+        "safety_margin": "good" if available > 50 else "warning" if available > 10 else "critical",
+        "source": "estimate"
     }
 
 # ============================================================================
@@ -273,12 +389,14 @@ if HAS_MCP:
             ),
             Tool(
                 name="check_memory_usage",
-                description="Estimate memory usage for target board",
+                description="Memory usage for target board (from build sizes when given, else estimated)",
                 inputSchema={
                     "type": "object",
                     "properties": {
                         "code": {"type": "string"},
-                        "board": {"type": "string"}
+                        "board": {"type": "string"},
+                        "program_size": {"type": "object", "description": "Flash used_bytes/max_bytes from a build"},
+                        "ram_usage": {"type": "object", "description": "Static RAM used_bytes/max_bytes from a build"}
                     },
                     "required": ["code", "board"]
                 }
@@ -308,7 +426,7 @@ if HAS_MCP:
             result = analyzer.analyze(code, board)
         
         elif name == "check_memory_usage":
-            result = estimate_heap_usage(code, board)
+            result = estimate_heap_usage(code, board, arguments.get("program_size"), arguments.get("ram_usage"))
         
         elif name == "get_code_metrics":
             lines = code.split('\n')
@@ -418,4 +536,11 @@ void loop() {
         memory = estimate_heap_usage(sample_code, "esp32dev")
         print(json.dumps(memory, indent=2))
         
+        print("\n📊 Test 3: Memory From Build Sizes")
+        print("-" * 70)
+        build = analyzer.apply_build_memory(analysis, {"used_bytes": 1240000, "max_bytes": 1310720},
+                                            {"used_bytes": 43000, "max_bytes": 327680}, "esp32dev")
+        print(json.dumps(build["memory"], indent=2))
+        print(f"Score: {analysis['quality_score']} (estimate) -> {build['quality_score']} (build)")
+        
         print("\n✓ All tests completed!")
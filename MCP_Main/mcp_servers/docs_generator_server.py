@@ -13,17 +13,11 @@ from datetime import datetime
 class DocsGeneratorServer:
     """Generate professional documentation for embedded code."""
     
-    def __init__(self, host: str = None, model: str = None):
+    def __init__(self, host: str = None, model: str = None, llm=None):
         self.host = host or os.getenv("OLLAMA_HOST", "http://localhost:11435")
-        self.model = model or os.getenv("OLLAMA_MODEL", "codellama")
-        # Ollama client is optional - only needed for advanced features
-        try:
-            import ollama
-            self.client = ollama.Client(host=self.host)
-            self.has_ollama = True
-        except ImportError:
-            self.client = None
-            self.has_ollama = False
+        self.model = model or os.getenv("OLLAMA_MODEL", "llama3.2")
+        # Shared LLM provider (utils.llm_provider) - optional, docs are template-based
+        self.llm = llm
     
     def extract_hardware_info(self, code: str) -> Dict:
         """Extract hardware information from code."""
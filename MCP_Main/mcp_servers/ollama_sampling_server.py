@@ -5,9 +5,7 @@ Phase 6: Optional enhancement
 """
 
 import json
-import os
 from typing import Dict, List, Optional
-import ollama
 from pydantic import BaseModel
 
 class ConversationMessage(BaseModel):
@@ -27,13 +25,17 @@ class SamplingResponse(BaseModel):
 class OllamaSamplingServer:
     """Generate clarifying questions for better code generation."""
     
-    def __init__(self, host: str = None, model: str = None):
-        self.host = host or os.getenv("OLLAMA_HOST", "http://localhost:11435")
-        self.model = model or os.getenv("OLLAMA_MODEL", "llama3.2")
-        self.client = ollama.Client(host=self.host)
+    def __init__(self, llm, model: Optional[str] = None):
+        """
+        Args:
+            llm: Async LLM provider (utils.llm_provider), shared with the rest of the app
+            model: Model for sampling prompts (the provider's default if None)
+        """
+        self.llm = llm
+        self.model = model or llm.model
         self.conversation_history: List[Dict] = []
         
-    def generate_clarifying_questions(self, description: str, num_questions: int = 3) -> List[str]:
+    async def generate_clarifying_questions(self, description: str, num_questions: int = 3) -> List[str]:
         """Generate clarifying questions about the requirements."""
         
         prompt = f"""You are an embedded systems expert helping developers.
@@ -51,17 +53,13 @@ Questions should be about:
 Format: Return ONLY the questions, one per line, numbered 1-{num_questions}.
 No explanations, just questions."""
         
-        response = self.client.generate(
-            model=self.model,
-            prompt=prompt,
-            stream=False
-        )
+        response = await self.llm.generate(prompt, model=self.model)
         
-        questions_text = response['response']
+        questions_text = response
         questions = [q.strip() for q in questions_text.split('\n') if q.strip()]
         return questions[:num_questions]
     
-    def refine_requirements(self, initial_prompt: str, questions_and_answers: Dict[str, str]) -> str:
+    async def refine_requirements(self, initial_prompt: str, questions_and_answers: Dict[str, str]) -> str:
         """Refine requirements based on Q&A."""
         
         qa_text = "\n".join([f"Q: {q}\nA: {a}" for q, a in questions_and_answers.items()])
@@ -77,15 +75,11 @@ Write a detailed, specific requirement for generating embedded system code.
 Include all constraints, sensor types, protocols, and specifications.
 Be precise and technical."""
         
-        response = self.client.generate(
-            model=self.model,
-            prompt=prompt,
-            stream=False
-        )
+        response = await self.llm.generate(prompt, model=self.model)
         
-        return response['response']
+        return response
     
-    def suggest_algorithm(self, refined_requirements: str) -> Dict:
+    async def suggest_algorithm(self, refined_requirements: str) -> Dict:
         """Suggest algorithm/approach for the code."""
         
         prompt = f"""Given these embedded system requirements:
@@ -101,18 +95,14 @@ Suggest:
 
 Format as structured JSON."""
         
-        response = self.client.generate(
-            model=self.model,
-            prompt=prompt,
-            stream=False
-        )
+        response = await self.llm.generate(prompt, model=self.model)
         
         try:
-            return json.loads(response['response'])
+            return json.loads(response)
         except:
-            return {"suggestion": response['response']}
+            return {"suggestion": response}
     
-    def generate_improved_prompt(self, 
+    async def generate_improved_prompt(self, 
                                 initial_prompt: str,
                                 refined_requirements: str) -> str:
         """Generate improved prompt for code generation."""
@@ -133,24 +123,15 @@ The prompt should be specific, include:
 
 Make it detailed enough that any code generator would produce good code."""
         
-        response = self.client.generate(
-            model=self.model,
-            prompt=prompt,
-            stream=False
-        )
+        response = await self.llm.generate(prompt, model=self.model)
         
-        return response['response']
+        return response
 
 # ============================================================================
 # TEST MODE
 # ============================================================================
 
-if __name__ == "__main__":
-    print("\n" + "="*70)
-    print("Ollama Sampling Server - Multi-Turn Refinement Test")
-    print("="*70 + "\n")
-    
-    server = OllamaSamplingServer()
+async def _refinement_demo(server: "OllamaSamplingServer"):
     
     # Example: User wants WiFi temperature sensor
     initial_request = "WiFi temperature sensor with data logging"
@@ -159,7 +140,7 @@ if __name__ == "__main__":
     
     # Step 1: Generate clarifying questions
     print("❓ Generating clarifying questions...")
-    questions = server.generate_clarifying_questions(initial_request, num_questions=3)
+    questions = await server.generate_clarifying_questions(initial_request, num_questions=3)
     
     print("\nClarifying Questions:")
     for i, q in enumerate(questions, 1):
@@ -179,13 +160,29 @@ if __name__ == "__main__":
     
     # Step 3: Refine requirements
     print("🔧 Refining requirements...")
-    refined = server.refine_requirements(initial_request, answers)
+    refined = await server.refine_requirements(initial_request, answers)
     print(f"\nRefined Requirements:\n{refined[:500]}...\n")
     
     # Step 4: Generate improved prompt
     print("✨ Generating improved code generation prompt...")
-    improved_prompt = server.generate_improved_prompt(initial_request, refined)
+    improved_prompt = await server.generate_improved_prompt(initial_request, refined)
     print(f"\nImproved Prompt:\n{improved_prompt[:500]}...\n")
     
     print("\n✓ Refinement complete!")
     print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import asyncio
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.llm_provider import OllamaProvider
+
+    print("\n" + "="*70)
+    print("Ollama Sampling Server - Multi-Turn Refinement Test")
+    print("="*70 + "\n")
+    
+    provider = OllamaProvider(os.getenv("OLLAMA_HOST", "http://localhost:11435"),
+                              os.getenv("OLLAMA_MODEL", "llama3.2"))
+    asyncio.run(_refinement_demo(OllamaSamplingServer(provider)))
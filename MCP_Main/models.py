@@ -7,13 +7,15 @@ class CodeGenerationRequest(BaseModel):
     compile: bool = True
     generate_docs: bool = True
     board: Optional[str] = "esp32dev"  # uno, nano, esp32dev, default esp32dev
+    force_regenerate: bool = False  # bypass the response cache (result still refreshes it)
 
 class CodeGenerationResponse(BaseModel):
     description: str
     generated_code: str
     file_path: Optional[str] = None
     compilation_status: Optional[str] = None
-    compilation_output: Optional[str] = None
+    compilation_output: Optional[str] = None  # last COMPILE_OUTPUT_TAIL_CHARS; full text at compilation_log_url
+    compilation_log_url: Optional[str] = None  # GET /api/builds/{build_id}/log
     detected_libraries: Optional[List[str]] = None
     error_summary: Optional[str] = None
     troubleshooting_suggestions: Optional[List[str]] = None
@@ -21,6 +23,11 @@ class CodeGenerationResponse(BaseModel):
     installation_guide: Optional[str] = None
     compilation_error_summary: Optional[str] = None
     compiled_binary_path: Optional[str] = None
+    syntax_check: Optional[Dict[str, Any]] = None  # host g++ gate: status, duration_ms, reason, output
+    build_artifacts: Optional[Dict[str, str]] = None  # app, elf, bootloader, partitions, merged -> path
+    program_size: Optional[Dict[str, Any]] = None  # flash: used_bytes, max_bytes, percent
+    ram_usage: Optional[Dict[str, Any]] = None  # static RAM (globals): used_bytes, max_bytes, percent
+    compiler_diagnostics: Optional[List[Dict[str, Any]]] = None  # file, line, column, severity, message, header
     dependency_report: Optional[Dict] = None
 
     hardware_info: Optional[Dict] = None
@@ -28,7 +35,31 @@ class CodeGenerationResponse(BaseModel):
     memory_usage: Optional[float] = None
     quality_issues: Optional[List[Any]] = None
     quality_warnings: Optional[List[Any]] = None
+    llm_stream: Optional[Dict[str, Any]] = None  # streamed runs: tokens, stopped_early, trailing_tokens, tokens_saved
+    template: Optional[Dict[str, Any]] = None  # served without the LLM: template, confidence, params, duration_ms
+
+    from_cache: bool = False
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    queue_position: Optional[int] = None
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str  # queued, running, done, failed
+    stage: Optional[str] = None  # llm (or template), detect, analyze, syntax, install, compile, repair, docs
+    stages_completed: List[str] = []
+    active_stages: List[str] = []  # stages running right now (analyze/compile/docs overlap)
+    queue_position: Optional[int] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[CodeGenerationResponse] = None
 
 
 # 🔥 REQUIRED for Pydantic v2
-CodeGenerationResponse.model_rebuild()
\ No newline at end of file
+CodeGenerationResponse.model_rebuild()
+JobStatusResponse.model_rebuild()
\ No newline at end of file
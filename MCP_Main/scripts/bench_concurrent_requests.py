@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Concurrency Benchmark - N simultaneous /api/generate-code requests on one worker.
+
+The LLM and compile stages are replaced by sleeps of a fixed duration so the
+benchmark measures scheduling only. With async LLM calls and the compile
+stage on a bounded executor, N requests should finish in roughly
+(llm + compile) seconds instead of N * (llm + compile), and /health should
+stay responsive while they run.
+Documentation (--docs) runs concurrently with the compile once the code
+exists, so it should not add to the per-request time unless it is the
+longer of the two.
+
+Usage:
+  python scripts/bench_concurrent_requests.py
+  python scripts/bench_concurrent_requests.py --requests 8 --llm 1.0 --compile 2.0
+  python scripts/bench_concurrent_requests.py --requests 1 --compile 2.0 --docs 1.5
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+MAIN_DIR = Path(__file__).resolve().parent.parent
+
+FAKE_SKETCH = """```cpp
+void setup() {
+  Serial.begin(115200);
+  pinMode(2, OUTPUT);
+}
+
+void loop() {
+  digitalWrite(2, HIGH);
+  delay(500);
+  digitalWrite(2, LOW);
+  delay(500);
+}
+```"""
+
+
+def print_header(text):
+    """Print formatted header."""
+    print("\n" + "="*70)
+    print(f"  {text}")
+    print("="*70)
+
+
+def load_main(workdir: str, pool_size: int):
+    """Import main.py inside a scratch directory with patched stages."""
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", str(pool_size))
+    os.environ.setdefault("COMPILE_POOL_SIZE", str(pool_size))
+    # The descriptions are blink requests; keep them on the (simulated) LLM path
+    os.environ.setdefault("TEMPLATE_FAST_PATH", "0")
+    os.environ["PLATFORMIO_PROJECT_PATH"] = os.path.join(workdir, "esp32_project")
+    os.environ["ARDUINO_BUILD_PATH"] = os.path.join(workdir, "arduino_builds")
+    os.chdir(workdir)
+    sys.path.insert(0, str(MAIN_DIR))
+    import main
+    return main
+
+
+def patch_stages(main, llm_seconds: float, compile_seconds: float, docs_seconds: float = 0.0):
+    """Replace the blocking stages with sleeps of known duration."""
+
+    async def fake_llm(description, context=None):
+        await asyncio.sleep(llm_seconds)
+        return FAKE_SKETCH
+
+    def fake_preflight():
+        return {"arduino_cli_found": True, "arduino_cli_path": "arduino-cli",
+                "cores_installed": {}, "install_commands": [], "status_message": "✓ arduino-cli found"}
+
+    def fake_compile(sketch_dir, fqbn, detected_libraries, max_retries=2, initial_dependency_report=None,
+                     on_output=None):
+        time.sleep(compile_seconds)
+        if on_output:
+            on_output("Sketch uses 1234 bytes")
+        return {"success": True, "output": "Sketch uses 1234 bytes", "returncode": 0,
+                "binary_path": None, "dependency_report": initial_dependency_report}
+
+    if docs_seconds:
+        real_docs = main.docs_generator.generate_full_documentation
+
+        def slow_docs(*args, **kwargs):
+            time.sleep(docs_seconds)
+            return real_docs(*args, **kwargs)
+
+        main.docs_generator.generate_full_documentation = slow_docs
+
+    main.generate_code_with_llm = fake_llm
+    main.preflight_check_arduino = fake_preflight
+    main.compile_with_retries = fake_compile
+
+
+async def run_benchmark(main, n_requests: int):
+    """Fire n_requests concurrently and probe /health while they run."""
+    from models import CodeGenerationRequest
+
+    async def one(i):
+        req = CodeGenerationRequest(description=f"blink LED on GPIO 2 variant {i}", generate_docs=True)
+        return await main.generate_code(req)
+
+    async def probe_health():
+        await asyncio.sleep(0.1)
+        start = time.perf_counter()
+        await main.health_check()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(probe_health(), *(one(i) for i in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    return elapsed, results[0], results[1:]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Concurrent generate-code benchmark")
+    parser.add_argument("--requests", type=int, default=8, help="Concurrent requests (default: 8)")
+    parser.add_argument("--llm", type=float, default=1.0, help="Simulated LLM seconds (default: 1.0)")
+    parser.add_argument("--compile", type=float, default=2.0, help="Simulated compile seconds (default: 2.0)")
+    parser.add_argument("--docs", type=float, default=0.0, help="Simulated docs seconds (default: 0.0)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        main = load_main(workdir, args.requests)
+        patch_stages(main, args.llm, args.compile, args.docs)
+
+        print_header(f"Concurrent generate-code benchmark ({args.requests} requests)")
+        elapsed, health_latency, responses = asyncio.run(run_benchmark(main, args.requests))
+
+        per_request = args.llm + max(args.compile, args.docs)
+        serial = (args.llm + args.compile + args.docs) * args.requests
+        ok = sum(1 for r in responses if r.compilation_status == "success")
+
+        print(f"  Successful responses : {ok}/{args.requests}")
+        print(f"  Per-request stages   : {per_request:.2f}s (llm {args.llm:.2f}s + max(compile {args.compile:.2f}s, docs {args.docs:.2f}s))")
+        print(f"  Serial (sum) time    : {serial:.2f}s")
+        print(f"  Measured wall time   : {elapsed:.2f}s")
+        print(f"  Speedup vs serial    : {serial / elapsed:.1f}x")
+        print(f"  /health under load   : {health_latency * 1000:.1f}ms")
+        print(f"  Executors            : {main.get_executor_stats()}")
+
+        main.shutdown_executors(wait=True)
+        main.mcp_client.cleanup()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Compiler Diagnostics Benchmark - keyword heuristics vs. the single-pass parser.
+
+Builds large verbose compile logs from the builds under arduino_builds/
+(any saved *.log files, plus the real command lines recorded in each
+build's compile_commands.json), sprinkles in GCC diagnostics, and times
+what the compile stage does with a failed build's output:
+
+  legacy:  parse_compilation_errors (keyword checks, several lower() per line)
+           + _extract_missing_headers_from_output + the error summary scan
+  parser:  one utils.diagnostics.parse_diagnostics pass feeding all three
+
+Usage:
+  python scripts/bench_diagnostics.py
+  python scripts/bench_diagnostics.py --sizes-mb 1 5 20 --runs 5
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.diagnostics import parse_diagnostics, missing_headers, format_diagnostic
+
+BUILDS_DIR = Path(__file__).resolve().parent.parent / "arduino_builds"
+
+DIAGNOSTICS = [
+    "{sketch}:3:10: fatal error: DHT.h: No such file or directory",
+    "{sketch}:14:3: error: expected ';' before '}}' token",
+    "{sketch}:21:5: error: 'ledcAttachPin' was not declared in this scope",
+    "{sketch}:30:12: error: cannot convert 'String' to 'const char*'",
+    "{sketch}:41:1: warning: unused variable 'counter' [-Wunused-variable]",
+    "{sketch}:45:7: note: in expansion of macro 'LED_PIN'",
+    "/usr/bin/ld: sketch.ino.cpp.o: in function `loop': {sketch}:52: undefined reference to `readSensor()'",
+]
+
+
+def print_header(text):
+    """Print formatted header."""
+    print("\n" + "="*70)
+    print(f"  {text}")
+    print("="*70)
+
+
+def load_build_lines() -> list:
+    """Verbose output lines recovered from the builds in arduino_builds/."""
+    lines = []
+    for path in sorted(glob.glob(str(BUILDS_DIR / "**" / "*.log"), recursive=True)):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            lines.extend(f.read().splitlines())
+    for path in sorted(glob.glob(str(BUILDS_DIR / "*" / "build" / "compile_commands.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for entry in json.load(f):
+                lines.append(" ".join(entry.get("arguments") or [entry.get("command", "")]))
+    if not lines:
+        lines = ["xtensa-esp32-elf-g++ -c -Os -w -std=gnu++2a -MMD -I/tmp/core sketch.ino.cpp -o sketch.ino.cpp.o"]
+    return lines
+
+
+def build_log(target_bytes: int, build_lines: list, every: int = 200) -> str:
+    """A verbose log of about target_bytes with a diagnostic every `every` lines."""
+    sketch = "/tmp/arduino_builds/bench_1700000000/bench_1700000000.ino"
+    out, size, i = [], 0, 0
+    while size < target_bytes:
+        line = build_lines[i % len(build_lines)]
+        if i % every == every - 1:
+            line = DIAGNOSTICS[(i // every) % len(DIAGNOSTICS)].format(sketch=sketch)
+        out.append(line)
+        size += len(line) + 1
+        i += 1
+    return "\n".join(out)
+
+
+# --- Previous implementation, kept here for comparison ---
+
+def legacy_parse_compilation_errors(output: str) -> dict:
+    errors_dict = {"syntax_errors": [], "missing_headers": [], "undefined_references": [],
+                   "type_errors": [], "ledc_api_errors": [], "other_errors": []}
+    for line in output.split("\n"):
+        if "error:" not in line.lower():
+            continue
+        line_clean = line.strip()
+        if not line_clean:
+            continue
+        if ("ledcAttachPin" in line or "GPIO_NUM_" in line) and "not declared" in line.lower():
+            errors_dict["ledc_api_errors"].append(line_clean)
+        elif "fatal error:" in line.lower() and ".h:" in line:
+            errors_dict["missing_headers"].append(line_clean)
+        elif "undefined reference" in line.lower():
+            errors_dict["undefined_references"].append(line_clean)
+        elif "error:" in line.lower() and ("expected" in line or "undeclared" in line):
+            errors_dict["syntax_errors"].append(line_clean)
+        elif "error:" in line.lower() and ("type" in line or "cannot" in line):
+            errors_dict["type_errors"].append(line_clean)
+        else:
+            errors_dict["other_errors"].append(line_clean)
+    return errors_dict
+
+
+def legacy_missing_headers(output: str) -> list:
+    missing = []
+    for line in output.splitlines():
+        if "fatal error:" in line.lower() and ": No such file or directory" in line:
+            m = re.search(r"fatal error:\s*([^:]+\.h)", line, re.IGNORECASE)
+            if m:
+                missing.append(os.path.basename(m.group(1).strip()))
+    return list(dict.fromkeys(missing))
+
+
+def legacy_summary(output: str) -> list:
+    lines = [l.strip() for l in output.splitlines() if l.strip()]
+    return [l for l in lines if "error" in l.lower() or "fatal" in l.lower()][:3]
+
+
+def run_legacy(output: str) -> tuple:
+    return legacy_parse_compilation_errors(output), legacy_missing_headers(output), legacy_summary(output)
+
+
+def run_parser(output: str) -> tuple:
+    records = parse_diagnostics(output)
+    errors = [r for r in records if r["severity"] == "error"]
+    return records, missing_headers(records), [format_diagnostic(r) for r in errors[:3]]
+
+
+def best_of(func, output: str, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(output)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Compiler diagnostics parsing benchmark")
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 5, 20],
+                        help="Log sizes to test in MB (default: 1 5 20)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement, best is reported (default: 3)")
+    parser.add_argument("--every", type=int, default=200, help="One diagnostic per N log lines (default: 200)")
+    args = parser.parse_args()
+
+    build_lines = load_build_lines()
+    print_header("Compiler diagnostics: legacy keyword scans vs single-pass parser")
+    print(f"  {len(build_lines)} verbose lines recovered from {BUILDS_DIR}")
+    print(f"\n  {'log MB':>7} {'lines':>9} {'legacy ms':>10} {'parser ms':>10} {'speedup':>8} {'records':>8}")
+    for size_mb in args.sizes_mb:
+        output = build_log(int(size_mb * 1024 * 1024), build_lines, args.every)
+        legacy_s = best_of(run_legacy, output, args.runs)
+        parser_s = best_of(run_parser, output, args.runs)
+        records, headers, _ = run_parser(output)
+        assert headers == legacy_missing_headers(output), "missing headers disagree"
+        print(f"  {size_mb:>7g} {output.count(chr(10)) + 1:>9} {legacy_s * 1000:>10.1f} "
+              f"{parser_s * 1000:>10.1f} {legacy_s / parser_s:>7.1f}x {len(records):>8}")
+
+    sample = build_log(1024 * 1024, build_lines, args.every)
+    categories = {}
+    for record in parse_diagnostics(sample):
+        categories[record["category"]] = categories.get(record["category"], 0) + 1
+    print(f"\n  Categories in a 1 MB sample: {categories}")
+
+
+if __name__ == "__main__":
+    main_cli()
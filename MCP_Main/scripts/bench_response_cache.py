@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Response Cache Micro-benchmark - get/set/evict cost as the cache grows.
+
+Fills a ResponseCache to capacity, then measures steady-state inserts (each
+one evicting the least recently used entry) and lookups. With the
+OrderedDict LRU both should stay flat from 10k to 100k entries; the old
+min()-over-all-timestamps eviction grew linearly with cache size.
+
+Usage:
+  python scripts/bench_response_cache.py
+  python scripts/bench_response_cache.py --sizes 10000 50000 100000 --ops 20000
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.response_cache import ResponseCache
+
+
+def print_header(text):
+    """Print formatted header."""
+    print("\n" + "="*70)
+    print(f"  {text}")
+    print("="*70)
+
+
+def bench_size(size: int, ops: int, value_bytes: int, use_byte_bound: bool) -> dict:
+    """Measure per-operation cost for one cache size."""
+    value = "x" * value_bytes
+    max_bytes = size * value_bytes if use_byte_bound else None
+    cache = ResponseCache(ttl_minutes=60, max_size=size if not use_byte_bound else size * 10,
+                          max_bytes=max_bytes)
+
+    start = time.perf_counter()
+    for i in range(size):
+        cache.set(f"key-{i}", value)
+    fill_s = time.perf_counter() - start
+
+    # Steady state: every insert evicts one entry
+    start = time.perf_counter()
+    for i in range(size, size + ops):
+        cache.set(f"key-{i}", value)
+    set_s = time.perf_counter() - start
+
+    live = list(cache.cache.keys())
+    lookups = [random.choice(live) for _ in range(ops)]
+    start = time.perf_counter()
+    for key in lookups:
+        cache.get(key)
+    get_s = time.perf_counter() - start
+
+    return {
+        "size": size,
+        "fill_us": fill_s / size * 1e6,
+        "set_evict_us": set_s / ops * 1e6,
+        "get_us": get_s / ops * 1e6,
+        "evictions": cache.evictions
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="ResponseCache micro-benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 25000, 50000, 100000],
+                        help="Cache capacities to test (default: 10k 25k 50k 100k)")
+    parser.add_argument("--ops", type=int, default=20000, help="Operations per measurement (default: 20000)")
+    parser.add_argument("--value-bytes", type=int, default=256, help="Size of each cached value (default: 256)")
+    parser.add_argument("--byte-bound", action="store_true",
+                        help="Bound the cache by max_bytes instead of max_size")
+    args = parser.parse_args()
+
+    bound = "max_bytes" if args.byte_bound else "max_size"
+    print_header(f"ResponseCache LRU benchmark (bounded by {bound})")
+    print(f"  {'entries':>10} {'fill µs/op':>12} {'set+evict µs/op':>16} {'get µs/op':>10}")
+    for size in args.sizes:
+        r = bench_size(size, args.ops, args.value_bytes, args.byte_bound)
+        print(f"  {r['size']:>10} {r['fill_us']:>12.2f} {r['set_evict_us']:>16.2f} {r['get_us']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main_cli()
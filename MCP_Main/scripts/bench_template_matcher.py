@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Template Fast Path Benchmark - how many requests skip the LLM, and how fast.
+
+Descriptions come from the sketch names saved in Working_Files/ (the file
+name is the slugged request) plus a fixed set of common prompts. For each
+one the matcher either renders a template or hands the request to the LLM.
+Every rendered sketch is syntax-checked with the host g++ gate against the
+stub Arduino headers, so a template that stops compiling shows up here.
+
+Usage:
+  python scripts/bench_template_matcher.py
+  python scripts/bench_template_matcher.py --runs 2000 --show-misses
+"""
+
+import re
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+MAIN_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MAIN_DIR))
+sys.path.insert(0, str(MAIN_DIR / "mcp_servers"))
+
+from hardware_database_server import BOARD_DATABASE, GPIO_PURPOSES
+from utils.template_matcher import TemplateMatcher
+from utils.syntax_gate import SyntaxGate
+
+COMMON_PROMPTS = [
+    "blink LED on GPIO 2",
+    "blink LED on GPIO 2 every 500ms",
+    "blink LED on GPIO 2 with 1 sec delay",
+    "led blink on gpio 2",
+    "when button on GPIO 4 is pressed turn on LED on GPIO 2",
+    "read analog value on GPIO 34 and print it",
+    "read potentiometer on pin 35 every 200 ms",
+    "scan I2C bus on ESP32 using SDA 21 SCL 22",
+    "print 'hello world' to serial",
+    "print a message Hello ESP32 to serial monitor every 2 seconds",
+    "control LED brightness on GPIO 13 with PWM",
+    "generate a 1kHz PWM signal with 50% duty on GPIO 5",
+    "WiFi temperature and humidity monitor with DHT22",
+    "DHT22 with WiFi",
+    "ESP32 web server that toggles an LED",
+    "blink LED on GPIO 2 three times then stop",
+]
+
+# Timing or wording no template honours: these must go to the LLM
+MUST_FALL_BACK = [
+    "blink LED on GPIO 2 at 2 Hz",
+    "blink LED on GPIO 2 twice per second",
+    "blink LED on GPIO 2 with 200ms on and 800ms off",
+    "blink LED on GPIO 2 for 10 seconds",
+    "blink LED on gpio 2 every 100us",
+    "blink the LED on GPIO 2 fast",
+    "do not blink LED on GPIO 2",
+]
+
+
+def print_header(text):
+    """Print formatted header."""
+    print("\n" + "="*70)
+    print(f"  {text}")
+    print("="*70)
+
+
+def working_file_prompts() -> list:
+    """Descriptions recovered from Working_Files/<slug>_<timestamp>.cpp names."""
+    prompts = []
+    for path in sorted((MAIN_DIR / "Working_Files").glob("*.cpp")):
+        slug = re.sub(r"_\d{9,}$", "", path.stem)
+        if slug.startswith("firmware"):
+            continue
+        prompts.append(slug.replace("_", " "))
+    return prompts
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Template fast path benchmark")
+    parser.add_argument("--runs", type=int, default=500, help="Timed match() calls per description (default: 500)")
+    parser.add_argument("--show-misses", action="store_true", help="List descriptions sent to the LLM")
+    args = parser.parse_args()
+
+    prompts = list(dict.fromkeys(COMMON_PROMPTS + MUST_FALL_BACK + working_file_prompts()))
+    matcher = TemplateMatcher(BOARD_DATABASE, GPIO_PURPOSES)
+    gate = SyntaxGate()
+
+    print_header(f"Template fast path: {len(prompts)} descriptions")
+    latencies, matched, failures = [], [], []
+    for prompt in prompts:
+        result = matcher.match(prompt, "esp32dev")
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            matcher.match(prompt, "esp32dev")
+        latencies.append((time.perf_counter() - start) / args.runs * 1000)
+        if result["matched"] and prompt in MUST_FALL_BACK:
+            failures.append((prompt, f"served from '{result['template']}' but should fall back to the LLM"))
+        if result["matched"]:
+            check = gate.check(result["code"])
+            matched.append((prompt, result, check["status"]))
+            if check["status"] == "failed":
+                failures.append((prompt, check["output"]))
+        elif args.show_misses:
+            print(f"  → LLM {result['confidence']:.2f}  {prompt}  ({'; '.join(result['reasons'])})")
+
+    print(f"\n  {'template':<13} {'conf':>5} {'g++':>8}  description")
+    for prompt, result, status in matched:
+        print(f"  {result['template']:<13} {result['confidence']:>5.2f} {status:>8}  {prompt}")
+
+    print(f"\n  Served from templates : {len(matched)}/{len(prompts)} ({len(matched) / len(prompts) * 100:.0f}%)")
+    print(f"  match() p50 / max     : {statistics.median(latencies):.3f} ms / {max(latencies):.3f} ms")
+    print(f"  Syntax gate           : {gate.get_stats()}")
+    for prompt, output in failures:
+        print(f"\n  ✗ {prompt}\n{output}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
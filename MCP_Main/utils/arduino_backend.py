@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+"""
+Arduino Backend - arduino-cli operations behind one interface
+Subprocess per command (default) or a persistent `arduino-cli daemon` over gRPC
+"""
+
+import os
+import re
+import json
+import time
+import socket
+import threading
+import subprocess
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import grpc
+    # Python stubs generated from arduino-cli's rpc/ protos:
+    #   python -m grpc_tools.protoc -I rpc --python_out=. --grpc_python_out=. \
+    #       rpc/cc/arduino/cli/commands/v1/*.proto
+    from cc.arduino.cli.commands.v1 import commands_pb2, commands_pb2_grpc
+    from cc.arduino.cli.commands.v1 import compile_pb2, core_pb2, lib_pb2
+    HAS_GRPC = True
+except ImportError:
+    HAS_GRPC = False
+
+
+def parse_core_list(stdout: str) -> Dict[str, str]:
+    """
+    Parse `arduino-cli core list --format json` output.
+
+    Handles both shapes arduino-cli has used:
+      - legacy (< 0.35): [{"id": "esp32:esp32", "installed": "2.0.11", ...}]
+      - current:        {"platforms": [{"id": ..., "installed_version": ...}]}
+                        (some releases nest the id under "metadata")
+
+    Args:
+        stdout: Raw JSON text
+
+    Returns:
+        Dict of platform id -> installed version ("" if unknown)
+    """
+    data = json.loads(stdout or "null")
+    if isinstance(data, dict):
+        platforms = data.get("platforms") or []
+    elif isinstance(data, list):
+        platforms = data
+    else:
+        platforms = []
+
+    installed = {}
+    for platform in platforms:
+        if not isinstance(platform, dict):
+            continue
+        platform_id = platform.get("id") or (platform.get("metadata") or {}).get("id")
+        if not platform_id:
+            continue
+        version = platform.get("installed_version") or platform.get("installed") or ""
+        installed[platform_id] = version
+    return installed
+
+
+def parse_lib_list(stdout: str) -> Dict[str, str]:
+    """
+    Parse `arduino-cli lib list --format json` output.
+
+    Handles the legacy list ([{"library": {...}}, ...]) and the current
+    {"installed_libraries": [...]} shapes.
+
+    Args:
+        stdout: Raw JSON text
+
+    Returns:
+        Dict of library name -> installed version
+    """
+    data = json.loads(stdout or "null")
+    if isinstance(data, dict):
+        entries = data.get("installed_libraries") or []
+    elif isinstance(data, list):
+        entries = data
+    else:
+        entries = []
+
+    libraries = {}
+    for entry in entries:
+        library = entry.get("library") if isinstance(entry, dict) else None
+        if isinstance(library, dict) and library.get("name"):
+            libraries[library["name"]] = library.get("version") or ""
+    return libraries
+
+
+# Build artifacts arduino-cli leaves in the build path, by kind (<project>.ino<suffix>)
+ARTIFACT_SUFFIXES = {
+    "app": (".bin", ".hex"),
+    "elf": (".elf",),
+    "bootloader": (".bootloader.bin", ".with_bootloader.hex"),
+    "partitions": (".partitions.bin",),
+    "merged": (".merged.bin", ".with_bootloader.bin"),
+    "eeprom": (".eep",)
+}
+
+_SKETCH_SIZE_RE = re.compile(
+    r"Sketch uses (\d+) bytes(?: \((\d+)%\))? of program storage space\.(?: Maximum is (\d+) bytes)?")
+_GLOBALS_SIZE_RE = re.compile(
+    r"Global variables use (\d+) bytes(?: \((\d+)%\))? of dynamic memory.*?(?:Maximum is (\d+) bytes)?\.?$",
+    re.MULTILINE)
+_USED_LIBRARY_RE = re.compile(r"^Using library (.+?) at version \S+ in folder", re.MULTILINE)
+
+
+def _usage(used: int, maximum: Optional[int]) -> Dict[str, Any]:
+    maximum = maximum or None
+    return {
+        "used_bytes": used,
+        "max_bytes": maximum,
+        "percent": round(used / maximum * 100, 1) if maximum else None
+    }
+
+
+def parse_size_output(text: str) -> Dict[str, Any]:
+    """
+    Read program/RAM usage and used libraries from verbose text compile output.
+
+    Args:
+        text: Compiler output
+
+    Returns:
+        Dict with program_size and ram_usage (None where not reported) and used_libraries
+    """
+    info: Dict[str, Any] = {"program_size": None, "ram_usage": None,
+                            "used_libraries": list(dict.fromkeys(_USED_LIBRARY_RE.findall(text or "")))}
+    match = _SKETCH_SIZE_RE.search(text or "")
+    if match:
+        info["program_size"] = _usage(int(match.group(1)), int(match.group(3) or 0))
+    match = _GLOBALS_SIZE_RE.search(text or "")
+    if match:
+        info["ram_usage"] = _usage(int(match.group(1)), int(match.group(3) or 0))
+    return info
+
+
+def parse_builder_result(builder: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize an arduino-cli builder result (gRPC CompileResponse or `compile --format json`).
+
+    Args:
+        builder: Dict with build_path, executable_sections_size, used_libraries,
+                 build_properties
+
+    Returns:
+        Dict with build_path, project_name, program_size, ram_usage, used_libraries
+    """
+    info: Dict[str, Any] = {
+        "build_path": builder.get("build_path") or None,
+        "project_name": None,
+        "program_size": None,
+        "ram_usage": None,
+        "used_libraries": [lib.get("name") for lib in builder.get("used_libraries") or []
+                           if isinstance(lib, dict) and lib.get("name")]
+    }
+    for prop in builder.get("build_properties") or []:
+        if isinstance(prop, str) and prop.startswith("build.project_name="):
+            info["project_name"] = prop.split("=", 1)[1]
+    # "text" is flash (program storage), "data" is static RAM (data + bss)
+    for section in builder.get("executable_sections_size") or []:
+        name = section.get("name")
+        usage = _usage(int(section.get("size") or 0), int(section.get("max_size") or section.get("maxSize") or 0))
+        if name == "text":
+            info["program_size"] = usage
+        elif name == "data":
+            info["ram_usage"] = usage
+    return info
+
+
+def build_artifacts(build_path: str, project_name: str) -> Dict[str, str]:
+    """
+    Exact artifact paths for a finished build (no directory walk).
+
+    Args:
+        build_path: Build directory
+        project_name: Main sketch file name, e.g. "blink.ino"
+
+    Returns:
+        Dict of kind (app, elf, bootloader, partitions, merged, eeprom) -> existing path
+    """
+    artifacts = {}
+    for kind, suffixes in ARTIFACT_SUFFIXES.items():
+        for suffix in suffixes:
+            path = os.path.join(build_path, project_name + suffix)
+            if os.path.isfile(path):
+                artifacts[kind] = path
+                break
+    return artifacts
+
+
+def run_command_streaming(cmd: List[str], cwd: Optional[str], env: Optional[dict], timeout: int,
+                          on_line: Callable[[str], None],
+                          abort_on: Optional[Callable[[str], bool]] = None) -> subprocess.CompletedProcess:
+    """Run a command, passing each output line to on_line as it is produced.
+
+    stderr is merged into stdout so lines arrive in the order the tool wrote them.
+    If `abort_on` returns True for a line the process is killed at once; the
+    returned CompletedProcess then has `aborted` set and a negative returncode.
+    Raises subprocess.TimeoutExpired if the command runs longer than `timeout`.
+    """
+    proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, bufsize=1)
+    timed_out = threading.Event()
+
+    def _kill():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, _kill)
+    timer.start()
+    lines = []
+    aborted = False
+    try:
+        for line in proc.stdout:
+            lines.append(line)
+            on_line(line.rstrip("\n"))
+            if abort_on and abort_on(line.rstrip("\n")):
+                aborted = True
+                proc.kill()
+                break
+        proc.wait()
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    result = subprocess.CompletedProcess(cmd, proc.returncode, "".join(lines), "")
+    result.aborted = aborted
+    return result
+
+
+class SubprocessArduinoBackend:
+    """One `arduino-cli` process per operation (no extra dependencies)."""
+
+    name = "subprocess"
+
+    def __init__(self, cli_path: Callable[[], str]):
+        """
+        Initialize backend.
+
+        Args:
+            cli_path: Callable returning the arduino-cli path ("" if not installed)
+        """
+        self.cli_path = cli_path
+        self.calls = 0
+
+    def _run(self, args: List[str], timeout: int) -> subprocess.CompletedProcess:
+        self.calls += 1
+        return subprocess.run([self.cli_path()] + args, capture_output=True, text=True, timeout=timeout)
+
+    def core_list(self) -> Dict[str, str]:
+        """Installed platforms (platform id -> version). Raises RuntimeError on failure."""
+        r = self._run(["core", "list", "--format", "json"], timeout=30)
+        if r.returncode != 0:
+            raise RuntimeError((r.stderr or r.stdout).strip() or f"exit code {r.returncode}")
+        return parse_core_list(r.stdout)
+
+    def update_index(self, timeout: int = 120) -> subprocess.CompletedProcess:
+        """Refresh the platform package index."""
+        return self._run(["core", "update-index"], timeout=timeout)
+
+    def core_install(self, platform: str, timeout: int = 300) -> subprocess.CompletedProcess:
+        """Install a platform, e.g. "esp32:esp32"."""
+        return self._run(["core", "install", platform], timeout=timeout)
+
+    def lib_search(self, query: str, timeout: int = 60) -> list:
+        """Search the library index. Returns parsed results (empty on failure)."""
+        try:
+            r = self._run(["lib", "search", query, "--format", "json"], timeout=timeout)
+            if r.returncode == 0 and r.stdout:
+                data = json.loads(r.stdout)
+                if isinstance(data, list):
+                    return data
+        except Exception:
+            pass
+        return []
+
+    def lib_install(self, name: str, timeout: int = 180) -> subprocess.CompletedProcess:
+        """Install a library by name."""
+        return self._run(["lib", "install", name], timeout=timeout)
+
+    def lib_list(self) -> Dict[str, str]:
+        """Installed libraries (name -> version). Raises RuntimeError on failure."""
+        r = self._run(["lib", "list", "--format", "json"], timeout=60)
+        if r.returncode != 0:
+            raise RuntimeError((r.stderr or r.stdout).strip() or f"exit code {r.returncode}")
+        return parse_lib_list(r.stdout)
+
+    def compile(self, sketch_dir: str, fqbn: str, build_path: str, build_cache_path: Optional[str] = None,
+                env: Optional[dict] = None, timeout: int = 300,
+                on_line: Optional[Callable[[str], None]] = None,
+                abort_on: Optional[Callable[[str], bool]] = None) -> subprocess.CompletedProcess:
+        """
+        Compile a sketch.
+
+        Output is always read as a stream (never buffered until exit), so
+        `abort_on` can stop the build on the first line it rejects.
+
+        Args:
+            sketch_dir: Sketch folder (absolute)
+            fqbn: Fully qualified board name
+            build_path: Per-sketch build directory
+            build_cache_path: Shared core build cache directory
+            env: Process environment
+            timeout: Seconds before the compile is killed
+            on_line: Optional callback receiving output line by line
+            abort_on: Optional predicate; the compile is killed when it returns True for a line
+
+        Returns:
+            CompletedProcess (args is the command line used) with an `aborted`
+            flag and a `build` attribute: build_path, project_name,
+            program_size, ram_usage and used_libraries
+
+        Raises:
+            subprocess.TimeoutExpired
+        """
+        cmd = [self.cli_path(), "compile", "--fqbn", fqbn, ".", "--build-path", build_path]
+        if build_cache_path:
+            cmd += ["--build-cache-path", build_cache_path]
+        cmd.append("--verbose")
+        self.calls += 1
+        # Text mode: `--format json` holds all output back until the build
+        # ends, so sizes and libraries come from the verbose text instead
+        result = run_command_streaming(cmd, cwd=sketch_dir, env=env, timeout=timeout,
+                                       on_line=on_line or (lambda line: None), abort_on=abort_on)
+        result.build = {"build_path": build_path, "project_name": None, **parse_size_output(result.stdout)}
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return backend statistics."""
+        return {"backend": self.name, "process_spawns": self.calls}
+
+    def close(self):
+        """Nothing to release."""
+        pass
+
+
+class DaemonArduinoBackend:
+    """Long-lived `arduino-cli daemon` driven over gRPC.
+
+    The daemon (and its loaded package/library indexes) is started once and
+    shared by every request. If another worker already runs a daemon on the
+    configured port it is reused. Any call that cannot reach the daemon is
+    served by the subprocess backend instead.
+    """
+
+    name = "daemon"
+
+    def __init__(self, cli_path: Callable[[], str], port: int = 50051, startup_timeout: float = 15.0):
+        """
+        Initialize backend (the daemon itself starts lazily on first use).
+
+        Args:
+            cli_path: Callable returning the arduino-cli path
+            port: Daemon gRPC port (shared by all workers on the host)
+            startup_timeout: Seconds to wait for the daemon to accept connections
+        """
+        if not HAS_GRPC:
+            raise RuntimeError("grpcio and arduino-cli gRPC stubs (cc.arduino.cli.commands.v1) not installed")
+        self.cli_path = cli_path
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.fallback = SubprocessArduinoBackend(cli_path)
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._channel = None
+        self._stub = None
+        self._instance = None
+        self.calls = 0
+        self.fallback_calls = 0
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Connection management
+    # ------------------------------------------------------------------
+
+    def _port_open(self) -> bool:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.settimeout(0.5)
+            return s.connect_ex(("127.0.0.1", self.port)) == 0
+
+    def _connect(self):
+        """Start (or attach to) the daemon and create an initialized instance."""
+        with self._lock:
+            if self._instance is not None:
+                return
+            if not self._port_open():
+                arduino = self.cli_path()
+                if not arduino:
+                    raise RuntimeError("arduino-cli not found")
+                self._process = subprocess.Popen(
+                    [arduino, "daemon", "--port", str(self.port)],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+            self._channel = grpc.insecure_channel(f"127.0.0.1:{self.port}")
+            grpc.channel_ready_future(self._channel).result(timeout=self.startup_timeout)
+            self._stub = commands_pb2_grpc.ArduinoCoreServiceStub(self._channel)
+            self._instance = self._stub.Create(commands_pb2.CreateRequest()).instance
+            self._init_locked()
+
+    def _init_locked(self):
+        # (Re)load indexes, platforms and libraries into the instance
+        for _ in self._stub.Init(commands_pb2.InitRequest(instance=self._instance)):
+            pass
+
+    def _reinit(self):
+        """Reload after installs so new platforms/libraries become visible."""
+        with self._lock:
+            if self._instance is not None:
+                self._init_locked()
+
+    def _reset(self, error: Exception):
+        with self._lock:
+            self.last_error = str(error)
+            self._instance = None
+            self._stub = None
+            if self._channel is not None:
+                self._channel.close()
+                self._channel = None
+
+    def _call(self, operation: Callable[[], Any], fallback: Callable[[], Any]) -> Any:
+        """Run a daemon operation, falling back to a subprocess if the daemon is unreachable."""
+        try:
+            self._connect()
+        except Exception as e:
+            self._reset(e)
+            self.fallback_calls += 1
+            return fallback()
+        try:
+            self.calls += 1
+            return operation()
+        except grpc.RpcError as e:
+            if e.code() not in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.CANCELLED):
+                raise
+            # Daemon went away mid-call: reconnect on the next call
+            self._reset(e)
+            self.fallback_calls += 1
+            return fallback()
+
+    @staticmethod
+    def _result(args: List[str], returncode: int, stdout: str = "", stderr: str = "") -> subprocess.CompletedProcess:
+        return subprocess.CompletedProcess(["daemon"] + args, returncode, stdout, stderr)
+
+    @staticmethod
+    def _builder_result(resp) -> Optional[Dict[str, Any]]:
+        """Builder result carried by a CompileResponse, as a plain dict (None if absent).
+
+        arduino-cli >= 1.0 sends it as `result` on the last message; older
+        releases put the fields on the response itself.
+        """
+        try:
+            message = resp.result if resp.HasField("result") else None
+        except ValueError:
+            message = resp if getattr(resp, "executable_sections_size", None) else None
+        if message is None:
+            return None
+        return {
+            "build_path": message.build_path,
+            "build_properties": list(message.build_properties),
+            "used_libraries": [{"name": lib.name} for lib in message.used_libraries],
+            "executable_sections_size": [{"name": sec.name, "size": sec.size, "max_size": sec.max_size}
+                                         for sec in message.executable_sections_size]
+        }
+
+    def _drain(self, args: List[str], stream) -> subprocess.CompletedProcess:
+        """Consume a server stream of progress messages into a CompletedProcess."""
+        try:
+            for _ in stream:
+                pass
+            return self._result(args, 0, "ok")
+        except grpc.RpcError as e:
+            if e.code() in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.CANCELLED):
+                raise
+            return self._result(args, 1, "", e.details() or str(e.code()))
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+
+    def core_list(self) -> Dict[str, str]:
+        """Installed platforms (platform id -> version)."""
+        def op():
+            if hasattr(core_pb2, "PlatformSearchRequest") and not hasattr(core_pb2, "PlatformListRequest"):
+                # arduino-cli >= 1.0
+                resp = self._stub.PlatformSearch(core_pb2.PlatformSearchRequest(
+                    instance=self._instance, manually_installed=True))
+                return {p.metadata.id: p.installed_version for p in resp.search_output if p.installed_version}
+            resp = self._stub.PlatformList(core_pb2.PlatformListRequest(instance=self._instance))
+            return {p.id: p.installed for p in resp.installed_platforms}
+        return self._call(op, self.fallback.core_list)
+
+    def update_index(self, timeout: int = 120) -> subprocess.CompletedProcess:
+        """Refresh the platform package index."""
+        def op():
+            result = self._drain(["core", "update-index"], self._stub.UpdateIndex(
+                commands_pb2.UpdateIndexRequest(instance=self._instance), timeout=timeout))
+            self._reinit()
+            return result
+        return self._call(op, lambda: self.fallback.update_index(timeout))
+
+    def core_install(self, platform: str, timeout: int = 300) -> subprocess.CompletedProcess:
+        """Install a platform, e.g. "esp32:esp32"."""
+        package, _, architecture = platform.partition(":")
+
+        def op():
+            result = self._drain(["core", "install", platform], self._stub.PlatformInstall(
+                core_pb2.PlatformInstallRequest(instance=self._instance, platform_package=package,
+                                                architecture=architecture), timeout=timeout))
+            self._reinit()
+            return result
+        return self._call(op, lambda: self.fallback.core_install(platform, timeout))
+
+    def lib_search(self, query: str, timeout: int = 60) -> list:
+        """Search the library index (same dict shape as `lib search --format json`)."""
+        def op():
+            fields = lib_pb2.LibrarySearchRequest.DESCRIPTOR.fields_by_name
+            key = "search_args" if "search_args" in fields else "query"
+            try:
+                resp = self._stub.LibrarySearch(lib_pb2.LibrarySearchRequest(
+                    instance=self._instance, **{key: query}), timeout=timeout)
+            except grpc.RpcError as e:
+                if e.code() in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.CANCELLED):
+                    raise
+                return []
+            return [{"name": lib.name} for lib in resp.libraries]
+        return self._call(op, lambda: self.fallback.lib_search(query, timeout))
+
+    def lib_install(self, name: str, timeout: int = 180) -> subprocess.CompletedProcess:
+        """Install a library by name."""
+        def op():
+            result = self._drain(["lib", "install", name], self._stub.LibraryInstall(
+                lib_pb2.LibraryInstallRequest(instance=self._instance, name=name), timeout=timeout))
+            self._reinit()
+            return result
+        return self._call(op, lambda: self.fallback.lib_install(name, timeout))
+
+    def lib_list(self) -> Dict[str, str]:
+        """Installed libraries (name -> version)."""
+        def op():
+            resp = self._stub.LibraryList(lib_pb2.LibraryListRequest(instance=self._instance), timeout=60)
+            return {lib.library.name: lib.library.version for lib in resp.installed_libraries}
+        return self._call(op, self.fallback.lib_list)
+
+    def compile(self, sketch_dir: str, fqbn: str, build_path: str, build_cache_path: Optional[str] = None,
+                env: Optional[dict] = None, timeout: int = 300,
+                on_line: Optional[Callable[[str], None]] = None,
+                abort_on: Optional[Callable[[str], bool]] = None) -> subprocess.CompletedProcess:
+        """Compile a sketch (see SubprocessArduinoBackend.compile)."""
+        args = ["compile", "--fqbn", fqbn, sketch_dir, "--build-path", build_path]
+        if build_cache_path:
+            args += ["--build-cache-path", build_cache_path]
+
+        def op():
+            request = compile_pb2.CompileRequest(
+                instance=self._instance, fqbn=fqbn, sketch_path=os.path.abspath(sketch_dir),
+                build_path=build_path, verbose=True)
+            if build_cache_path:
+                request.build_cache_path = build_cache_path
+            output: List[str] = []
+            pending = ""
+            builder: Dict[str, Any] = {}
+            aborted = False
+            stream = self._stub.Compile(request, timeout=timeout)
+            try:
+                for resp in stream:
+                    builder = self._builder_result(resp) or builder
+                    chunk = (getattr(resp, "out_stream", b"") or b"") + (getattr(resp, "err_stream", b"") or b"")
+                    if not chunk:
+                        continue
+                    text = chunk.decode("utf-8", errors="replace")
+                    output.append(text)
+                    if on_line or abort_on:
+                        pending += text
+                        *lines, pending = pending.split("\n")
+                        for line in lines:
+                            if on_line:
+                                on_line(line)
+                            if abort_on and abort_on(line):
+                                aborted = True
+                                break
+                    if aborted:
+                        # Cancelling the RPC stops the build inside the daemon
+                        stream.cancel()
+                        break
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                    raise subprocess.TimeoutExpired(args, timeout)
+                if e.code() in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.CANCELLED):
+                    raise
+                if on_line and pending:
+                    on_line(pending)
+                result = self._result(args, 1, "".join(output), e.details() or str(e.code()))
+                result.aborted = False
+                result.build = {"build_path": build_path, "project_name": None, "program_size": None,
+                                "ram_usage": None, "used_libraries": []}
+                return result
+            if on_line and pending and not aborted:
+                on_line(pending)
+            result = self._result(args, -1 if aborted else 0, "".join(output))
+            result.aborted = aborted
+            result.build = parse_builder_result(builder)
+            if not result.build["build_path"]:
+                result.build["build_path"] = build_path
+            return result
+
+        return self._call(op, lambda: self.fallback.compile(sketch_dir, fqbn, build_path, build_cache_path,
+                                                            env=env, timeout=timeout, on_line=on_line,
+                                                            abort_on=abort_on))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return backend statistics."""
+        return {
+            "backend": self.name,
+            "port": self.port,
+            "connected": self._instance is not None,
+            "daemon_owned": self._process is not None and self._process.poll() is None,
+            "rpc_calls": self.calls,
+            "fallback_calls": self.fallback_calls,
+            "process_spawns": self.fallback.calls,
+            "last_error": self.last_error
+        }
+
+    def close(self):
+        """Close the channel and stop the daemon if this process started it."""
+        with self._lock:
+            if self._channel is not None:
+                self._channel.close()
+            self._channel = None
+            self._stub = None
+            self._instance = None
+            if self._process is not None and self._process.poll() is None:
+                self._process.terminate()
+                try:
+                    self._process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+            self._process = None
+
+
+def create_arduino_backend(kind: str, cli_path: Callable[[], str], port: int = 50051):
+    """
+    Build the configured backend, falling back to subprocesses if the daemon
+    backend's dependencies are missing.
+
+    Args:
+        kind: "subprocess" or "daemon"
+        cli_path: Callable returning the arduino-cli path
+        port: Daemon gRPC port
+
+    Returns:
+        A backend object
+    """
+    if kind == "daemon":
+        try:
+            return DaemonArduinoBackend(cli_path, port=port)
+        except RuntimeError as e:
+            print(f"⚠ arduino-cli daemon backend unavailable ({e}); using subprocess backend")
+    return SubprocessArduinoBackend(cli_path)
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import shutil
+
+    print("\n" + "="*70)
+    print("🔌 Arduino Backend - Test Mode")
+    print("="*70 + "\n")
+
+    legacy = '[{"id": "esp32:esp32", "installed": "2.0.11", "latest": "2.0.14"}]'
+    current = '{"platforms": [{"id": "arduino:avr", "installed_version": "1.8.6"}]}'
+    nested = '{"platforms": [{"metadata": {"id": "esp32:esp32"}, "installed_version": "3.0.1"}]}'
+    print(f"✓ Legacy shape:  {parse_core_list(legacy)}")
+    print(f"✓ Current shape: {parse_core_list(current)}")
+    print(f"✓ Nested id:     {parse_core_list(nested)}")
+    print(f"✓ No cores:      {parse_core_list('{}')}")
+
+    backend = create_arduino_backend(os.getenv("ARDUINO_CLI_BACKEND", "subprocess"),
+                                     lambda: shutil.which("arduino-cli") or "")
+    print(f"\nBackend: {backend.name} (gRPC stubs available: {HAS_GRPC})")
+    if backend.cli_path():
+        start = time.perf_counter()
+        print(f"Installed cores: {backend.core_list()} ({(time.perf_counter() - start) * 1000:.0f}ms)")
+    print(json.dumps(backend.get_stats(), indent=2))
+    backend.close()
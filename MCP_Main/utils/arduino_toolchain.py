@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Arduino Toolchain - Installed core registry, cached toolchain status, shared build cache
+Reads `arduino-cli core list --format json` once and only installs missing platforms
+"""
+
+import os
+import re
+import glob
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows
+    HAS_FCNTL = False
+
+
+class CoreRegistry:
+    """Cached view of installed arduino-cli platforms and libraries (thread-safe)."""
+
+    def __init__(self, backend: Any, ttl_minutes: int = 60):
+        """
+        Initialize registry.
+
+        Args:
+            backend: arduino-cli backend (utils.arduino_backend) used for
+                     core list / update-index / core install
+            ttl_minutes: How long a `core list` result is trusted before re-reading
+        """
+        self.backend = backend
+        self.cli_path = backend.cli_path
+        self.ttl_seconds = ttl_minutes * 60
+        self._installed: Optional[Dict[str, str]] = None
+        self._loaded_at: Optional[float] = None   # None = stale
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._install_locks: Dict[str, threading.Lock] = {}
+        self.refreshes = 0
+        self.generation = 0   # bumped whenever the installed view may have changed
+        self.installs = 0
+        self.skipped_installs = 0
+        self.last_error: Optional[str] = None
+        self._libraries: Optional[Dict[str, str]] = None
+        self._libraries_loaded_at: Optional[float] = None
+        self._libraries_lock = threading.Lock()
+        self.library_refreshes = 0
+
+    def refresh(self) -> Dict[str, str]:
+        """Re-read installed platforms from arduino-cli (one backend call)."""
+        arduino = self.cli_path()
+        if not arduino:
+            with self._lock:
+                self._installed = {}
+                self._loaded_at = time.monotonic()
+            return {}
+        try:
+            installed = self.backend.core_list()
+            error = None
+        except Exception as e:
+            installed = None
+            error = f"core list failed: {e}"
+
+        with self._lock:
+            self.refreshes += 1
+            self.generation += 1
+            self.last_error = error
+            # Keep serving the previous view if the refresh itself failed
+            if installed is not None:
+                self._installed = installed
+            self._loaded_at = time.monotonic()
+            return dict(self._installed or {})
+
+    def invalidate(self):
+        """Force the next lookup to re-read `core list`."""
+        with self._lock:
+            self._loaded_at = None
+            self.generation += 1
+
+    def installed(self, force_refresh: bool = False) -> Dict[str, str]:
+        """
+        Installed platforms, refreshed only when stale.
+
+        Args:
+            force_refresh: Ignore the TTL
+
+        Returns:
+            Dict of platform id -> installed version
+        """
+        cached = None if force_refresh else self._fresh_view()
+        if cached is not None:
+            return cached
+        with self._refresh_lock:
+            # Concurrent callers wait for one `core list` instead of each running it
+            cached = None if force_refresh else self._fresh_view()
+            if cached is not None:
+                return cached
+            return self.refresh()
+
+    def _fresh_view(self) -> Optional[Dict[str, str]]:
+        with self._lock:
+            if (self._installed is not None and self._loaded_at is not None
+                    and time.monotonic() - self._loaded_at < self.ttl_seconds):
+                return dict(self._installed)
+        return None
+
+    def is_installed(self, platform: str) -> bool:
+        """True if the platform (e.g. "esp32:esp32") is installed."""
+        return platform in self.installed()
+
+    def ensure(self, platform: str) -> Dict[str, Any]:
+        """
+        Install a platform only if it is missing.
+
+        Concurrent callers for the same platform wait for a single install.
+
+        Args:
+            platform: Platform id, e.g. "esp32:esp32"
+
+        Returns:
+            Dict with success, output and whether an install actually ran
+        """
+        version = self.installed().get(platform)
+        if version is not None:
+            self.skipped_installs += 1
+            return {"success": True, "output": f"Core {platform} {version} already installed",
+                    "returncode": 0, "installed_now": False}
+
+        with self._lock:
+            install_lock = self._install_locks.setdefault(platform, threading.Lock())
+        with install_lock:
+            # Another thread may have installed it while we waited (its install
+            # invalidated the view, so this re-reads `core list` once)
+            version = self.installed().get(platform)
+            if version is not None:
+                self.skipped_installs += 1
+                return {"success": True, "output": f"Core {platform} {version} already installed",
+                        "returncode": 0, "installed_now": False}
+
+            if not self.cli_path():
+                return {"success": False, "output": "arduino-cli not found", "installed_now": False}
+            try:
+                idx = self.backend.update_index(timeout=120)
+                inst = self.backend.core_install(platform, timeout=300)
+            except Exception as e:
+                return {"success": False, "output": str(e), "installed_now": False}
+            finally:
+                self.invalidate()
+
+            self.installs += 1
+            return {"success": inst.returncode == 0,
+                    "output": idx.stdout + idx.stderr + inst.stdout + inst.stderr,
+                    "returncode": inst.returncode,
+                    "installed_now": True}
+
+    def libraries(self, force_refresh: bool = False) -> Dict[str, str]:
+        """
+        Installed libraries from `lib list --format json`, refreshed only when
+        stale or invalidated.
+
+        Args:
+            force_refresh: Ignore the TTL
+
+        Returns:
+            Dict of library name -> installed version (empty if the list failed)
+        """
+        with self._libraries_lock:
+            if (not force_refresh and self._libraries is not None and self._libraries_loaded_at is not None
+                    and time.monotonic() - self._libraries_loaded_at < self.ttl_seconds):
+                return dict(self._libraries)
+            libraries = {}
+            if self.cli_path():
+                try:
+                    libraries = self.backend.lib_list()
+                except Exception as e:
+                    self.last_error = f"lib list failed: {e}"
+                    if self._libraries is not None:
+                        libraries = self._libraries
+            self._libraries = libraries
+            self._libraries_loaded_at = time.monotonic()
+            self.library_refreshes += 1
+            return dict(libraries)
+
+    def invalidate_libraries(self):
+        """Force the next libraries() call to re-read `lib list` (after a library install)."""
+        with self._libraries_lock:
+            self._libraries_loaded_at = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return registry statistics."""
+        with self._lock:
+            age = time.monotonic() - self._loaded_at if self._loaded_at is not None else None
+            return {
+                "platforms": dict(self._installed) if self._installed is not None else None,
+                "age_seconds": round(age, 1) if age is not None else None,
+                "ttl_minutes": self.ttl_seconds / 60,
+                "refreshes": self.refreshes,
+                "installs": self.installs,
+                "skipped_installs": self.skipped_installs,
+                "libraries": len(self._libraries) if self._libraries is not None else None,
+                "library_refreshes": self.library_refreshes,
+                "last_error": self.last_error
+            }
+
+
+class ToolchainStatus:
+    """Cached snapshot of the compile toolchain shared by /health and preflight.
+
+    The arduino-cli path and PlatformIO check are re-evaluated after the TTL;
+    core state comes from the CoreRegistry and is rebuilt as soon as the
+    registry refreshes or installs something.
+    """
+
+    def __init__(self, registry: CoreRegistry, required_platforms: Dict[str, str],
+                 pio_check: Optional[Callable[[], bool]] = None, ttl_minutes: int = 5):
+        """
+        Initialize status.
+
+        Args:
+            registry: Installed core registry (also supplies the arduino-cli path)
+            required_platforms: Platform id -> display name, e.g. {"esp32:esp32": "ESP32"}
+            pio_check: Optional callable returning True if PlatformIO is available
+            ttl_minutes: How long tool availability checks are trusted
+        """
+        self.registry = registry
+        self.required_platforms = required_platforms
+        self.pio_check = pio_check
+        self.ttl_seconds = ttl_minutes * 60
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._checked_at: Optional[float] = None
+        self._generation = -1
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Force the next get() to re-check tools and cores."""
+        with self._lock:
+            self._checked_at = None
+
+    def get(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Return the toolchain snapshot, re-checking only what is stale.
+
+        Args:
+            force_refresh: Re-check tools and re-read `core list`
+
+        Returns:
+            Dict with arduino_cli_found, arduino_cli_path, platformio_installed,
+            cores_installed (platform -> bool), core_versions and missing_platforms
+        """
+        with self._lock:
+            tools_stale = (force_refresh or self._checked_at is None
+                           or time.monotonic() - self._checked_at >= self.ttl_seconds)
+            if self._snapshot is not None and not tools_stale and self._generation == self.registry.generation:
+                return dict(self._snapshot)
+
+            if tools_stale or self._snapshot is None:
+                arduino = self.registry.cli_path()
+                pio = bool(self.pio_check()) if self.pio_check else None
+                self._checked_at = time.monotonic()
+            else:
+                arduino = self._snapshot["arduino_cli_path"]
+                pio = self._snapshot["platformio_installed"]
+
+            versions = self.registry.installed(force_refresh=force_refresh) if arduino else {}
+            self._generation = self.registry.generation
+            cores = {platform: platform in versions for platform in self.required_platforms}
+            self._snapshot = {
+                "arduino_cli_found": bool(arduino),
+                "arduino_cli_path": arduino,
+                "platformio_installed": pio,
+                "cores_installed": cores,
+                "core_versions": {p: versions[p] for p in self.required_platforms if p in versions},
+                "missing_platforms": [p for p, ok in cores.items() if not ok]
+            }
+            return dict(self._snapshot)
+
+
+class BuildCache:
+    """Shared, FQBN-keyed arduino-cli core build cache (`--build-cache-path`).
+
+    The first compile for an FQBN builds the core archive into the cache while
+    holding an exclusive lock; once the archive exists (the sketch itself may
+    still fail) or a compile has succeeded, the directory is marked warm and
+    later compiles only take a shared lock, so they run in
+    parallel and reuse the prebuilt core. Locks are advisory file locks, so
+    they also serialize separate uvicorn workers. Without fcntl (Windows) a
+    per-FQBN thread lock guards cold builds inside this process only.
+    """
+
+    WARM_MARKER = ".warm"
+
+    def __init__(self, root: str):
+        """
+        Initialize cache.
+
+        Args:
+            root: Directory holding one cache subdirectory per FQBN
+        """
+        self.root = root
+        self._thread_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.warm_builds = 0
+        self.cold_builds = 0
+
+    def path_for(self, fqbn: str) -> str:
+        """Cache directory for an FQBN (created if missing)."""
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", fqbn)
+        path = os.path.abspath(os.path.join(self.root, safe))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def is_warm(self, fqbn: str) -> bool:
+        """True once a compile has populated the cache for this FQBN."""
+        return os.path.exists(os.path.join(self.path_for(fqbn), self.WARM_MARKER))
+
+    def has_core_archive(self, fqbn: str) -> bool:
+        """True if arduino-cli has written a prebuilt core (core*.a) into the cache."""
+        return bool(glob.glob(os.path.join(self.path_for(fqbn), "**", "core*.a"), recursive=True))
+
+    def _warm_if_core_built(self, fqbn: str):
+        # The core is built before the sketch, so a sketch that fails to
+        # compile still leaves a reusable archive behind
+        if not self.is_warm(fqbn) and self.has_core_archive(fqbn):
+            self.mark_warm(fqbn)
+
+    def mark_warm(self, fqbn: str):
+        """Record that the cache for this FQBN holds a complete core build."""
+        marker = os.path.join(self.path_for(fqbn), self.WARM_MARKER)
+        with open(marker, "w", encoding="utf-8") as f:
+            f.write(str(time.time()))
+
+    @contextmanager
+    def use(self, fqbn: str):
+        """
+        Hold the cache for one compile.
+
+        Yields:
+            (cache_path, warm) - warm is False when this compile populates the cache
+        """
+        path = self.path_for(fqbn)
+        if HAS_FCNTL:
+            with open(os.path.join(path, ".lock"), "a+") as lock_file:
+                warm = self.is_warm(fqbn)
+                if not warm:
+                    # Cold compiles queue on a separate lock so that, once the
+                    # first one has warmed the cache, the rest pass straight
+                    # through to the shared lock and run in parallel.
+                    with open(os.path.join(path, ".populate"), "a+") as populate_file:
+                        fcntl.flock(populate_file, fcntl.LOCK_EX)
+                        try:
+                            warm = self.is_warm(fqbn)
+                            if not warm:
+                                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                                self._count(False)
+                                try:
+                                    yield path, False
+                                finally:
+                                    self._warm_if_core_built(fqbn)
+                                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                                return
+                        finally:
+                            fcntl.flock(populate_file, fcntl.LOCK_UN)
+                fcntl.flock(lock_file, fcntl.LOCK_SH)
+                self._count(True)
+                try:
+                    yield path, True
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        else:
+            if self.is_warm(fqbn):
+                self._count(True)
+                yield path, True
+                return
+            with self._lock:
+                thread_lock = self._thread_locks.setdefault(fqbn, threading.Lock())
+            with thread_lock:
+                warm = self.is_warm(fqbn)
+                self._count(warm)
+                try:
+                    yield path, warm
+                finally:
+                    if not warm:
+                        self._warm_if_core_built(fqbn)
+
+    def _count(self, warm: bool):
+        with self._lock:
+            if warm:
+                self.warm_builds += 1
+            else:
+                self.cold_builds += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache statistics."""
+        warm_fqbns = []
+        if os.path.isdir(self.root):
+            warm_fqbns = sorted(d for d in os.listdir(self.root)
+                                if os.path.exists(os.path.join(self.root, d, self.WARM_MARKER)))
+        return {
+            "root": os.path.abspath(self.root),
+            "warm_fqbns": warm_fqbns,
+            "warm_builds": self.warm_builds,
+            "cold_builds": self.cold_builds,
+            "file_locking": HAS_FCNTL
+        }
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import json
+    import shutil
+    import tempfile
+    from arduino_backend import SubprocessArduinoBackend
+
+    print("\n" + "="*70)
+    print("🔧 Arduino Toolchain - Test Mode")
+    print("="*70 + "\n")
+
+    registry = CoreRegistry(SubprocessArduinoBackend(lambda: shutil.which("arduino-cli") or ""))
+    print(f"Installed on this machine: {registry.installed()}")
+    print(json.dumps(registry.get_stats(), indent=2))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = BuildCache(tmp)
+        with cache.use("esp32:esp32:esp32") as (path, warm):
+            print(f"\n✓ First compile populates cache: warm={warm}")
+            cache.mark_warm("esp32:esp32:esp32")
+        with cache.use("esp32:esp32:esp32") as (path, warm):
+            print(f"✓ Next compile reuses it: warm={warm}")
+        with cache.use("arduino:avr:uno") as (path, warm):
+            # Sketch failed, but the core archive was built
+            os.makedirs(os.path.join(path, "cores", "0f1e"))
+            open(os.path.join(path, "cores", "0f1e", "core.a"), "wb").close()
+        with cache.use("arduino:avr:uno") as (path, warm):
+            print(f"✓ After a failed sketch with the core built: warm={warm}")
+        print(json.dumps(cache.get_stats(), indent=2))
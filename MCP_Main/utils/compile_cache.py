@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Compile Cache - Content-addressed store of arduino-cli compile results
+Identical sketch + board + toolchain skip the compiler; binaries are stored once by hash
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+SOURCE_EXTENSIONS = (".ino", ".pde", ".c", ".cpp", ".h", ".hpp", ".S")
+
+
+def normalize_source(text: str) -> str:
+    """Normalize line endings and trailing whitespace (neither changes the binary)."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def read_sketch_sources(sketch_dir: str) -> Dict[str, str]:
+    """
+    Read the source files of a sketch folder (build output is skipped).
+
+    The main .ino is keyed by content only, since its file name is derived
+    from the request description and does not affect the binary.
+
+    Args:
+        sketch_dir: Sketch folder
+
+    Returns:
+        Dict of relative path -> normalized source
+    """
+    sources = {}
+    for root, dirs, files in os.walk(sketch_dir):
+        dirs[:] = sorted(d for d in dirs if d != "build" and not d.startswith("."))
+        for name in sorted(files):
+            if not name.endswith(SOURCE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, sketch_dir).replace(os.sep, "/")
+            if root == sketch_dir and name.endswith((".ino", ".pde")):
+                rel = "*" + os.path.splitext(name)[1]
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                sources[rel] = normalize_source(f.read())
+    return sources
+
+
+class CompileCache:
+    """Compile results keyed by a hash of everything that determines the build.
+
+    The key covers the normalized sources, the FQBN, the installed core
+    version and every installed library with its version, so installing or
+    upgrading anything yields new keys instead of stale hits. Entries live in
+    an index (any object with get/set/delete, e.g. utils.disk_cache.DiskCache);
+    binaries are copied once into blobs/<sha256><ext> and shared by every
+    entry that produced the same bytes.
+    """
+
+    def __init__(self, directory: str, index: Any, max_blob_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize cache.
+
+        Args:
+            directory: Root directory for blobs (created if missing)
+            index: Key/value store for entries (get/set/delete)
+            max_blob_bytes: Quota on stored binaries; least recently used go first
+        """
+        self.blob_dir = os.path.join(directory, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.index = index
+        self.max_blob_bytes = max_blob_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.deduplicated = 0
+        self.blob_evictions = 0
+
+    @staticmethod
+    def make_key(sources: Dict[str, str], fqbn: str, core_version: str,
+                 libraries: Dict[str, str]) -> str:
+        """
+        Build the content address of a compile.
+
+        Args:
+            sources: Output of read_sketch_sources()
+            fqbn: Fully qualified board name
+            core_version: Installed version of the board's platform
+            libraries: Installed library name -> version
+
+        Returns:
+            Hex sha256 key
+        """
+        material = json.dumps({
+            "sources": sources,
+            "fqbn": fqbn,
+            "core": core_version,
+            "libraries": sorted(libraries.items())
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a compile result.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Stored result dict (binary_path and artifacts pointing into the
+            blob store) or None on a miss or if a binary has been evicted
+        """
+        entry = self.index.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        blobs = set((entry.get("artifacts") or {}).values())
+        if entry.get("binary_path"):
+            blobs.add(entry["binary_path"])
+        if not all(os.path.exists(blob) for blob in blobs):
+            self.index.delete(key)
+            self.misses += 1
+            return None
+        for blob in blobs:
+            try:
+                os.utime(blob)  # recency for blob eviction
+            except OSError:
+                pass
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a compile result; its binaries are deduplicated into the blob store.
+
+        Args:
+            key: Key from make_key()
+            result: Dict with success, returncode, output, binary_path and
+                    artifacts (kind -> path); every file is stored as a blob
+
+        Returns:
+            True if stored
+        """
+        entry = dict(result)
+        blobs: Dict[str, str] = {}
+        try:
+            for path in list((entry.get("artifacts") or {}).values()) + [entry.get("binary_path")]:
+                if path and path not in blobs:
+                    blobs[path] = self._store_blob(path)
+        except OSError:
+            return False
+        if entry.get("artifacts"):
+            entry["artifacts"] = {kind: blobs[path] for kind, path in entry["artifacts"].items()}
+        if entry.get("binary_path"):
+            entry["binary_path"] = blobs[entry["binary_path"]]
+        stored = self.index.set(key, entry)
+        if stored:
+            self.stores += 1
+        return bool(stored)
+
+    def _store_blob(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        blob = os.path.join(self.blob_dir, digest.hexdigest() + os.path.splitext(path)[1])
+        if os.path.exists(blob):
+            self.deduplicated += 1
+            os.utime(blob)
+            return blob
+
+        # Copy (not link): the build directory may be rewritten in place later
+        fd, tmp = tempfile.mkstemp(dir=self.blob_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out, open(path, "rb") as src:
+                shutil.copyfileobj(src, out)
+            os.replace(tmp, blob)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._enforce_blob_quota(keep=blob)
+        return blob
+
+    def _blobs(self) -> list:
+        blobs = []
+        for name in os.listdir(self.blob_dir):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.blob_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            blobs.append((st.st_mtime, st.st_size, path))
+        return blobs
+
+    def _enforce_blob_quota(self, keep: str):
+        """Drop least recently used binaries over quota (their entries become misses)."""
+        with self._lock:
+            blobs = self._blobs()
+            total = sum(size for _, size, _ in blobs)
+            for _, size, path in sorted(blobs):
+                if total <= self.max_blob_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                    self.blob_evictions += 1
+                except OSError:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return compile cache statistics (counters are per process)."""
+        blobs = self._blobs()
+        total = self.hits + self.misses
+        index_stats = self.index.get_stats() if hasattr(self.index, "get_stats") else {}
+        return {
+            "entries": index_stats.get("size"),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+            "stores": self.stores,
+            "blobs": len(blobs),
+            "blob_bytes": sum(size for _, size, _ in blobs),
+            "max_blob_bytes": self.max_blob_bytes,
+            "deduplicated": self.deduplicated,
+            "blob_evictions": self.blob_evictions
+        }
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    print("\n" + "="*70)
+    print("📦 Compile Cache - Test Mode")
+    print("="*70 + "\n")
+
+    class _DictIndex(dict):
+        def set(self, key, value):
+            self[key] = json.loads(json.dumps(value))
+            return True
+
+        def delete(self, key):
+            self.pop(key, None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CompileCache(os.path.join(tmp, "cache"), _DictIndex())
+
+        for i, code in enumerate(["void setup() {}\r\nvoid loop() {}  \n", "void setup() {}\nvoid loop() {}"]):
+            sketch = os.path.join(tmp, f"sketch{i}")
+            os.makedirs(os.path.join(sketch, "build"))
+            with open(os.path.join(sketch, f"sketch{i}.ino"), "w") as f:
+                f.write(code)
+            with open(os.path.join(sketch, "build", f"sketch{i}.ino.bin"), "wb") as f:
+                f.write(b"\x00firmware")
+
+        keys = [CompileCache.make_key(read_sketch_sources(os.path.join(tmp, f"sketch{i}")),
+                                      "esp32:esp32:esp32", "3.0.7", {"DHT sensor library": "1.4.6"})
+                for i in range(2)]
+        print(f"✓ Whitespace/line endings/sketch name ignored: {keys[0] == keys[1]}")
+        other = CompileCache.make_key(read_sketch_sources(os.path.join(tmp, "sketch0")),
+                                      "esp32:esp32:esp32", "3.0.7", {"DHT sensor library": "1.4.7"})
+        print(f"✓ Library upgrade changes key: {other != keys[0]}")
+
+        print(f"✓ Miss before store: {cache.get(keys[0]) is None}")
+        cache.put(keys[0], {"success": True, "returncode": 0, "output": "ok",
+                            "binary_path": os.path.join(tmp, "sketch0", "build", "sketch0.ino.bin")})
+        cache.put(other, {"success": True, "returncode": 0, "output": "ok",
+                          "binary_path": os.path.join(tmp, "sketch1", "build", "sketch1.ino.bin")})
+        hit = cache.get(keys[1])
+        print(f"✓ Hit: {hit['success']} → {os.path.basename(hit['binary_path'])}")
+        print(f"✓ Identical binaries stored once: {cache.get_stats()['blobs']} blob(s)")
+        print(json.dumps(cache.get_stats(), indent=2))
+
+    print("\n" + "="*70)
+    print("✅ Compile cache tests completed!")
+    print("="*70)
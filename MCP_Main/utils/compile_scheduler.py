@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Compile Scheduler - Per-FQBN compile queues with CPU and memory aware parallelism
+Caps how many gcc toolchains run at once and reports queue depth and wait times
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+class CompileQueueFullError(Exception):
+    """Raised when too many compiles are already waiting."""
+    pass
+
+
+def available_memory_mb() -> Optional[int]:
+    """MemAvailable from /proc/meminfo in MB (None where unavailable)."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class CompileScheduler:
+    """Run compile jobs from per-FQBN queues on a bounded set of worker threads.
+
+    Boards are served round-robin so a burst for one FQBN cannot starve the
+    others. The number of compiles running at once is the smaller of the CPU
+    limit and what currently available memory allows, re-evaluated before
+    every dispatch.
+    """
+
+    def __init__(self, max_parallel: Optional[int] = None, mem_per_job_mb: int = 700,
+                 max_queued: int = 32):
+        """
+        Initialize scheduler.
+
+        Args:
+            max_parallel: Hard cap on concurrent compiles (default: CPU count)
+            mem_per_job_mb: Memory one compile is expected to need (ESP32 ~500-800MB)
+            max_queued: Waiting jobs allowed before submit() raises CompileQueueFullError
+        """
+        self.max_parallel = max(1, max_parallel or os.cpu_count() or 2)
+        self.mem_per_job_mb = mem_per_job_mb
+        self.max_queued = max_queued
+        self._cond = threading.Condition()
+        self._queues: "OrderedDict[str, Deque[tuple]]" = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._threads: List[threading.Thread] = []
+        self._shutdown = False
+        self._mem_checked_at = 0.0
+        self._mem_available: Optional[int] = None
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def current_limit(self) -> int:
+        """Compiles allowed to run right now (CPU cap, reduced when memory is short)."""
+        now = time.monotonic()
+        if now - self._mem_checked_at > 2.0:
+            self._mem_available = available_memory_mb()
+            self._mem_checked_at = now
+        if self._mem_available is None or not self.mem_per_job_mb:
+            return self.max_parallel
+        # MemAvailable already excludes what running compiles use
+        by_memory = self._running + self._mem_available // self.mem_per_job_mb
+        return max(1, min(self.max_parallel, by_memory))
+
+    def saturated(self) -> bool:
+        """True if a new compile would be rejected."""
+        with self._cond:
+            return self._queued >= self.max_queued
+
+    def submit(self, fqbn: str, func: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a compile job.
+
+        Args:
+            fqbn: Board the job compiles for (its queue)
+            func: Blocking callable performing the compile
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            concurrent.futures.Future with the job's result; its `wait_seconds`
+            attribute is set once the job leaves the queue
+
+        Raises:
+            CompileQueueFullError: If max_queued jobs are already waiting
+        """
+        future: Future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Compile scheduler is shut down")
+            if self._queued >= self.max_queued:
+                self.rejected += 1
+                raise CompileQueueFullError(f"Compile queue full ({self.max_queued} waiting)")
+            self._queues.setdefault(fqbn, deque()).append((future, func, args, kwargs, time.monotonic()))
+            self._queued += 1
+            if len(self._threads) < self.max_parallel:
+                thread = threading.Thread(target=self._worker, name=f"compile-sched-{len(self._threads)}",
+                                          daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+        return future
+
+    def run(self, fqbn: str, func: Callable, *args, **kwargs) -> Any:
+        """Submit and block until the job finishes (for callers already on a worker thread)."""
+        return self.submit(fqbn, func, *args, **kwargs).result()
+
+    def _next_job(self) -> tuple:
+        # Round-robin across boards: take from the first non-empty queue, then
+        # move that board to the back.
+        for fqbn, queue in self._queues.items():
+            if queue:
+                job = queue.popleft()
+                self._queues.move_to_end(fqbn)
+                self._queued -= 1
+                return job
+        raise RuntimeError("No queued compile job")
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._shutdown and (self._queued == 0 or self._running >= self.current_limit()):
+                    # Timed wait so a memory-limited scheduler notices freed memory
+                    self._cond.wait(timeout=1.0)
+                if self._shutdown:
+                    return
+                future, func, args, kwargs, queued_at = self._next_job()
+                wait = time.monotonic() - queued_at
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self._running += 1
+
+            future.wait_seconds = wait
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(func(*args, **kwargs))
+                        self.completed += 1
+                    except BaseException as e:
+                        future.set_exception(e)
+                        self.failed += 1
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self._cond.notify_all()
+
+    def shutdown(self):
+        """Stop workers; queued jobs are cancelled."""
+        with self._cond:
+            self._shutdown = True
+            for queue in self._queues.values():
+                while queue:
+                    queue.popleft()[0].cancel()
+            self._queued = 0
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return scheduler statistics."""
+        with self._cond:
+            started = self.completed + self.failed + self._running
+            return {
+                "limit": self.current_limit(),
+                "max_parallel": self.max_parallel,
+                "mem_per_job_mb": self.mem_per_job_mb,
+                "memory_available_mb": self._mem_available,
+                "running": self._running,
+                "queued": self._queued,
+                "max_queued": self.max_queued,
+                "queued_by_fqbn": {fqbn: len(q) for fqbn, q in self._queues.items() if q},
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / started * 1000, 1) if started else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 1)
+            }
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import json
+
+    print("\n" + "="*70)
+    print("🧵 Compile Scheduler - Test Mode")
+    print("="*70 + "\n")
+
+    scheduler = CompileScheduler(max_parallel=2, mem_per_job_mb=0, max_queued=3)
+    order = []
+
+    def fake_compile(name):
+        order.append(name)
+        time.sleep(0.2)
+        return name
+
+    start = time.perf_counter()
+    futures = [scheduler.submit("esp32:esp32:esp32", fake_compile, f"esp32-{i}") for i in range(4)]
+    time.sleep(0.05)  # two running, two waiting
+    futures += [scheduler.submit("arduino:avr:uno", fake_compile, "uno-0")]
+    try:
+        scheduler.submit("esp32:esp32:esp32", fake_compile, "overflow")
+    except CompileQueueFullError as e:
+        print(f"✓ Backpressure: {e}")
+    results = [f.result() for f in futures]
+    print(f"✓ 5 jobs, 2 at a time: {time.perf_counter() - start:.2f}s")
+    print(f"✓ Dispatch order (round-robin by board): {order}")
+    print(json.dumps(scheduler.get_stats(), indent=2))
+    scheduler.shutdown()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Diagnostics - Single-pass parser for GCC / arduino-cli compiler output
+Turns `file:line:col: severity: message` lines into typed records, whole logs or one line at a time
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+# Every diagnostic line contains one of these; verbose logs are mostly long
+# command lines, so the full pattern only runs on lines where a marker is found
+_MARKER_RE = re.compile(r": (?:(?:fatal )?error|warning|note): |: undefined reference to ")
+
+# One pattern for every diagnostic line:
+#   "sketch.ino:12:5: error: ...", "C:\\path\\x.cpp:3: warning: ...", "x.ino:1:10: fatal error: ...",
+#   "collect2: error: ld returned 1 exit status",
+#   "/usr/bin/ld: x.o: in function `loop': sketch.ino:5: undefined reference to `foo'"
+_DIAGNOSTIC_RE = re.compile(
+    r"[ \t]*(?:.*: in function `[^']*':[ \t]*)?"
+    r"(?P<file>(?:[A-Za-z]:)?[^:]*):(?:(?P<line>\d+):(?:(?P<column>\d+):)?)?[ \t]*"
+    r"(?:(?P<severity>fatal error|error|warning|note):|(?=undefined reference to ))[ \t]*"
+    r"(?P<message>.*?)[ \t\r]*$")
+_MISSING_HEADER_RE = re.compile(r"^(?P<header>[^:]+?): No such file or directory")
+
+def _categorize(message: str, fatal: bool, header: Optional[str]) -> str:
+    # missing_header, ledc_api, undefined_reference, syntax, type or other (first match wins)
+    if header:
+        return "missing_header"
+    if ("ledcAttachPin" in message or "GPIO_NUM_" in message) and "not declared" in message:
+        return "ledc_api"
+    if "undefined reference" in message:
+        return "undefined_reference"
+    if "expected" in message or "undeclared" in message:
+        return "syntax"
+    if "type" in message or "cannot" in message:
+        return "type"
+    return "other"
+
+
+def _record(match: "re.Match") -> Dict[str, Any]:
+    severity = match.group("severity") or "error"  # linker "undefined reference" lines carry none
+    message = match.group("message")
+    fatal = severity == "fatal error"
+    header = None
+    if fatal:
+        missing = _MISSING_HEADER_RE.match(message)
+        if missing:
+            header = os.path.basename(missing.group("header").strip())
+    line, column = match.group("line"), match.group("column")
+    return {
+        "file": match.group("file").strip(),
+        "line": int(line) if line else None,
+        "column": int(column) if column else None,
+        "severity": "error" if fatal else severity,
+        "fatal": fatal,
+        "category": _categorize(message, fatal, header) if severity in ("error", "fatal error") else severity,
+        "message": message,
+        "header": header
+    }
+
+
+def iter_diagnostics(text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a whole compiler log in one forward pass.
+
+    Args:
+        text: Compiler output
+
+    Yields:
+        Diagnostic records (file, line, column, severity, fatal, category, message, header)
+    """
+    text = text or ""
+    marker = _MARKER_RE.search(text)
+    while marker:
+        start = text.rfind("\n", 0, marker.start()) + 1
+        end = text.find("\n", marker.end())
+        if end == -1:
+            end = len(text)
+        match = _DIAGNOSTIC_RE.match(text, start, end)
+        if match:
+            yield _record(match)
+        marker = _MARKER_RE.search(text, end)
+
+
+def parse_diagnostics(text: str) -> List[Dict[str, Any]]:
+    """List form of iter_diagnostics()."""
+    return list(iter_diagnostics(text))
+
+
+def missing_headers(records: List[Dict[str, Any]]) -> List[str]:
+    """Headers reported missing, in order of appearance, without duplicates."""
+    return list(dict.fromkeys(r["header"] for r in records if r["header"]))
+
+
+def format_diagnostic(record: Dict[str, Any]) -> str:
+    """Render a record back into compiler form, e.g. "x.ino:3:10: fatal error: DHT.h: ..."."""
+    location = record["file"]
+    if record["line"] is not None:
+        location += f":{record['line']}"
+        if record["column"] is not None:
+            location += f":{record['column']}"
+    severity = "fatal error" if record["fatal"] else record["severity"]
+    return f"{location}: {severity}: {record['message']}"
+
+
+class DiagnosticCollector:
+    """Collects compiler diagnostics one output line at a time.
+
+    Feed every line as it arrives; records are available immediately, so a
+    caller can react (e.g. abort the build) on the first fatal missing header.
+    """
+
+    def __init__(self, max_records: int = 500):
+        """
+        Initialize collector.
+
+        Args:
+            max_records: Records kept (counters keep counting past it)
+        """
+        self.max_records = max_records
+        self.records: List[Dict[str, Any]] = []
+        self.missing_headers: List[str] = []
+        self.errors = 0
+        self.warnings = 0
+        self.lines = 0
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse one output line.
+
+        Args:
+            line: Compiler output line (without newline)
+
+        Returns:
+            The diagnostic record, or None if the line is not a diagnostic
+        """
+        self.lines += 1
+        if not _MARKER_RE.search(line):
+            return None
+        match = _DIAGNOSTIC_RE.match(line)
+        if not match:
+            return None
+
+        record = _record(match)
+        if record["header"] and record["header"] not in self.missing_headers:
+            self.missing_headers.append(record["header"])
+        if record["severity"] == "error":
+            self.errors += 1
+        elif record["severity"] == "warning":
+            self.warnings += 1
+        if len(self.records) < self.max_records:
+            self.records.append(record)
+        return record
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Counts and missing headers seen so far."""
+        return {
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "missing_headers": list(self.missing_headers),
+            "lines": self.lines
+        }
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import json
+
+    print("\n" + "="*70)
+    print("🩺 Diagnostics - Test Mode")
+    print("="*70 + "\n")
+
+    sample = """Using library WiFi at version 3.0.7 in folder: /root/.arduino15/packages/esp32/libraries/WiFi
+/tmp/arduino_builds/blink/blink.ino:3:10: fatal error: DHT.h: No such file or directory
+compilation terminated.
+C:\\Users\\dev\\blink\\blink.ino:12:5: error: 'ledcAttachPin' was not declared in this scope
+blink.ino:14:3: error: expected ';' before '}' token
+blink.ino:20: warning: unused variable 'x'
+/usr/bin/ld: blink.ino.cpp.o: in function `loop': blink.ino:30: undefined reference to `blinkTwice()'
+collect2: error: ld returned 1 exit status
+"""
+    records = parse_diagnostics(sample)
+    for record in records:
+        print(f"✓ {record['category']:<20} {format_diagnostic(record)}")
+    print(f"\nMissing headers: {missing_headers(records)}")
+
+    collector = DiagnosticCollector()
+    for line in sample.splitlines():
+        collector.feed(line)
+    print(f"Streamed: {json.dumps(collector.get_summary())}")
+    print(f"Same records streamed and in one pass: {collector.records == records}")
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Disk Cache - Persistent second tier for the response cache
+SQLite store shared by every uvicorn worker and surviving restarts
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Optional, Dict, Any
+
+
+class DiskCache:
+    """SQLite-backed key/value cache with TTL and size quotas.
+
+    One database file is shared by all worker processes. WAL mode lets
+    readers proceed while another process writes, and every write is a
+    single transaction, so a crash never leaves a half-written entry.
+    Each thread gets its own connection.
+    """
+
+    def __init__(self, directory: str, ttl_minutes: int = 24 * 60,
+                 max_bytes: int = 256 * 1024 * 1024, max_entries: int = 10000,
+                 filename: str = "response_cache.sqlite3"):
+        """
+        Initialize disk tier.
+
+        Args:
+            directory: Directory holding the cache database (created if missing)
+            ttl_minutes: Time-to-live for entries in minutes
+            max_bytes: Quota on the total size of stored values
+            max_entries: Quota on the number of stored entries
+            filename: Database file name inside directory
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self.ttl_seconds = ttl_minutes * 60
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get an entry if present and not expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Decoded value or None if not found/expired/unreadable
+        """
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[1] >= self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError):
+            self.errors += 1
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> bool:
+        """
+        Store an entry atomically, then enforce quotas (least recently used first).
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+
+        Returns:
+            True if stored
+        """
+        try:
+            text = json.dumps(value, default=str)
+            size = len(text.encode("utf-8"))
+            if size > self.max_bytes:
+                return False
+            now = time.time()
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, text, size, now, now)
+                )
+                self._enforce_quota(conn, now)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return True
+        except sqlite3.Error:
+            self.errors += 1
+            return False
+
+    def _enforce_quota(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then the least recently used ones over quota."""
+        expired = conn.execute(
+            "DELETE FROM entries WHERE created_at <= ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.evictions += max(expired, 0)
+
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        for key, size in conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at ASC").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            self.evictions += 1
+
+    def delete(self, key: str):
+        """Remove one entry."""
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        except sqlite3.Error:
+            self.errors += 1
+
+    def clear(self):
+        """Remove every entry."""
+        try:
+            self._connect().execute("DELETE FROM entries")
+        except sqlite3.Error:
+            self.errors += 1
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return disk tier statistics (hit counters are per process)."""
+        try:
+            count, total = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        except sqlite3.Error:
+            count, total = None, None
+        return {
+            "path": self.path,
+            "size": count,
+            "max_entries": self.max_entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "ttl_minutes": self.ttl_seconds / 60
+        }
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("\n" + "="*70)
+    print("💾 Disk Cache - Test Mode")
+    print("="*70 + "\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DiskCache(tmp, ttl_minutes=1, max_bytes=2000, max_entries=3)
+
+        cache.set("blink", {"generated_code": "void setup() {}"})
+        print(f"✓ Round trip: {cache.get('blink')}")
+
+        reopened = DiskCache(tmp, ttl_minutes=1, max_bytes=2000, max_entries=3)
+        print(f"✓ Visible to a second instance: {reopened.get('blink') is not None}")
+
+        for i in range(5):
+            cache.set(f"k{i}", "x" * 100)
+        print(f"✓ Entry quota enforced: {cache.get_stats()['size']}/3")
+
+        cache.set("big", "x" * 1500)
+        print(f"✓ Byte quota enforced: {cache.get_stats()['bytes']}/2000")
+
+        print(json.dumps(cache.get_stats(), indent=2))
+
+    print("\n" + "="*70)
+    print("✅ Disk cache tests completed!")
+    print("="*70)
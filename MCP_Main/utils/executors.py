@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Executors - Bounded worker pools for blocking pipeline stages
+Keeps arduino-cli subprocesses and filesystem work off the asyncio event loop
+"""
+
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+# The compile pool runs whole compile stages (library installs, retries, waits
+# on the compile scheduler). The scheduler caps actual gcc toolchains per core,
+# so this pool can be larger than the core count.
+COMPILE_POOL_SIZE = int(os.getenv("COMPILE_POOL_SIZE", str(2 * (os.cpu_count() or 2))))
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor wrapper that tracks running and queued work."""
+
+    def __init__(self, name: str, max_workers: int):
+        """
+        Initialize pool.
+
+        Args:
+            name: Pool name (used as thread name prefix and in stats)
+            max_workers: Maximum number of concurrently running jobs
+        """
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"{name}-pool"
+        )
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.running = 0
+        self.completed = 0
+
+    def _track(self, func: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            self.running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in this pool and await its result.
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            Whatever func returns (exceptions are re-raised in the caller)
+        """
+        with self._lock:
+            self.submitted += 1
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._track, func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool statistics."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "queued": self.submitted - self.completed - self.running,
+                "completed": self.completed
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work and release threads."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# LLM calls are async (utils.llm_provider caps their concurrency), so only
+# the compile stage needs a thread pool.
+compile_executor = BoundedExecutor("compile", COMPILE_POOL_SIZE)
+
+
+async def run_compile(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking arduino-cli / filesystem job on the compile pool."""
+    return await compile_executor.run(func, *args, **kwargs)
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """Return statistics for all pools."""
+    return {
+        "compile": compile_executor.get_stats()
+    }
+
+
+def shutdown_executors(wait: bool = False):
+    """Shut down all pools (called on application shutdown)."""
+    compile_executor.shutdown(wait=wait)
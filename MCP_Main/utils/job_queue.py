@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Job Queue - Asynchronous firmware generation jobs
+In-process queue with a fixed worker count and stage-level progress tracking
+"""
+
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class JobQueueFullError(Exception):
+    """Raised when the pending-job queue is at capacity."""
+    pass
+
+
+class Job:
+    """A single queued generation request and its progress."""
+
+    def __init__(self, payload: Any):
+        self.job_id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = "queued"          # queued, running, done, failed
+        self.stage: Optional[str] = None
+        self.stages_completed: List[str] = []
+        self.active_stages: List[str] = []   # stages can overlap once the code exists
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.error_status_code: Optional[int] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def on_event(self, event: str, data: Dict):
+        """Pipeline event sink - tracks running and completed stages."""
+        name = data.get("stage")
+        if event == "stage":
+            if name not in self.active_stages:
+                self.active_stages.append(name)
+            self.stage = name
+        elif event == "stage_done":
+            if name in self.active_stages:
+                self.active_stages.remove(name)
+            if name not in self.stages_completed:
+                self.stages_completed.append(name)
+            if self.active_stages:
+                self.stage = self.active_stages[-1]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize job status (result included once done)."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "stage": self.stage,
+            "stages_completed": list(self.stages_completed),
+            "active_stages": list(self.active_stages),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "result": self.result if self.status == "done" else None
+        }
+
+
+class JobQueue:
+    """Bounded in-process job queue served by a fixed number of async workers."""
+
+    def __init__(self, handler: Callable[..., Awaitable[Any]], workers: int = 2,
+                 max_pending: int = 100, max_stored: int = 1000, ttl_minutes: int = 60):
+        """
+        Initialize queue.
+
+        Args:
+            handler: async callable(payload, emit=callback) producing the job result
+            workers: Number of jobs processed concurrently
+            max_pending: Maximum queued (not yet started) jobs
+            max_stored: Maximum jobs kept in memory for status lookups
+            ttl_minutes: How long finished jobs stay retrievable
+        """
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.max_stored = max_stored
+        self.ttl_seconds = ttl_minutes * 60
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self):
+        """Start worker tasks on the running event loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self):
+        """Cancel worker tasks."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, payload: Any) -> Job:
+        """
+        Queue a job and return immediately.
+
+        Raises:
+            JobQueueFullError: If max_pending jobs are already waiting
+            RuntimeError: If the queue has not been started
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue not started")
+        self._evict()
+        job = Job(payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue full ({self.max_pending} pending)")
+        self.jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return job by id (None if unknown or expired)."""
+        return self.jobs.get(job_id)
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """1-based position among queued jobs, None once started."""
+        if job.status != "queued":
+            return None
+        position = 0
+        for other in self.jobs.values():
+            if other.status == "queued":
+                position += 1
+                if other is job:
+                    return position
+        return None
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await self.handler(job.payload, emit=job.on_event)
+                job.status = "done"
+                self.completed += 1
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Job cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(getattr(e, "detail", e))
+                job.error_status_code = getattr(e, "status_code", 500)
+                self.failed += 1
+            finally:
+                if job.stage and job.stage not in job.stages_completed and job.status == "done":
+                    job.stages_completed.append(job.stage)
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def _evict(self):
+        """Drop expired finished jobs, then the oldest finished ones over max_stored."""
+        now = time.time()
+        for job_id in [j.job_id for j in self.jobs.values()
+                       if j.finished and now - j.finished_at > self.ttl_seconds]:
+            del self.jobs[job_id]
+        while len(self.jobs) >= self.max_stored:
+            oldest = next((j.job_id for j in self.jobs.values() if j.finished), None)
+            if oldest is None:
+                break
+            del self.jobs[oldest]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue statistics."""
+        statuses = [j.status for j in self.jobs.values()]
+        return {
+            "workers": self.workers,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "max_pending": self.max_pending,
+            "running": statuses.count("running"),
+            "stored": len(self.jobs),
+            "completed": self.completed,
+            "failed": self.failed
+        }
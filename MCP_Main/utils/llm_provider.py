@@ -0,0 +1,812 @@
+#!/usr/bin/env python3
+"""
+LLM Provider - Async chat / generate / stream for Ollama and OpenAI
+One pooled keep-alive HTTP client with shared timeouts and a concurrency cap for every LLM call,
+a multi-host pool with least-outstanding routing, circuit breakers and health probes,
+and a model registry with warm-up / keep_alive so models stay loaded between requests
+"""
+
+import abc
+import json
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+
+class LLMProviderError(Exception):
+    """LLM request failed (error status, timeout or malformed response)."""
+
+    def __init__(self, message: str = "", retryable: bool = False):
+        super().__init__(message)
+        # True when another host may succeed (connection failure, timeout, 5xx)
+        self.retryable = retryable
+
+
+class LLMConnectionError(LLMProviderError):
+    """The LLM host could not be reached."""
+
+    def __init__(self, message: str = "", retryable: bool = True):
+        super().__init__(message, retryable)
+
+
+class LLMProvider(abc.ABC):
+    """Base class: connection pooling, limits and statistics.
+
+    The httpx.AsyncClient (and its connection pool) belongs to the event loop
+    that first used it; a call from another loop gets a client of its own, so
+    the provider is safe to share between the app, tests and scripts.
+    """
+
+    name = "base"
+    probe_path = "/"
+
+    def __init__(self, base_url: str, model: str, headers: Optional[Dict[str, str]] = None,
+                 timeout: float = 120.0, connect_timeout: float = 10.0,
+                 max_concurrency: int = 4, max_connections: int = 16,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize provider.
+
+        Args:
+            base_url: API root, e.g. "http://localhost:11435"
+            model: Model name sent with every request
+            headers: Extra headers (e.g. Authorization)
+            timeout: Seconds to wait for a response (or between stream chunks)
+            connect_timeout: Seconds to establish a connection
+            max_concurrency: Requests allowed in flight at once; the rest wait
+            max_connections: Pool size (idle connections are kept alive for reuse)
+            transport: Custom httpx transport (tests)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_connections = max(self.max_concurrency, max_connections)
+        self.transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.clients_created = 0
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http_loop is not loop:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=120.0),
+                transport=self.transport)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._http_loop = loop
+            self.clients_created += 1
+        return self._http
+
+    def _error(self, e: Exception) -> LLMProviderError:
+        self.errors += 1
+        if isinstance(e, LLMProviderError):
+            return e
+        if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return LLMConnectionError(f"Cannot connect to {self.name} at {self.base_url}: {e}")
+        if isinstance(e, httpx.TimeoutException):
+            return LLMProviderError(f"{self.name} request timed out after {self.timeout}s", retryable=True)
+        return LLMProviderError(f"{self.name} request failed: {e}", retryable=isinstance(e, httpx.TransportError))
+
+    @staticmethod
+    def _check(response: httpx.Response, body: str = ""):
+        if response.status_code >= 400:
+            raise LLMProviderError(f"HTTP {response.status_code}: {(body or response.text)[:300]}",
+                                   retryable=response.status_code >= 500)
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        client = self._client()
+        async with self._semaphore:
+            self.requests += 1
+            self.in_flight += 1
+            try:
+                response = await client.post(path, json=payload)
+                self._check(response)
+                return response.json()
+            except (httpx.HTTPError, LLMProviderError, ValueError) as e:
+                raise self._error(e) from e
+            finally:
+                self.in_flight -= 1
+
+    async def _stream_lines(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        client = self._client()
+        async with self._semaphore:
+            self.requests += 1
+            self.in_flight += 1
+            try:
+                async with client.stream("POST", path, json=payload) as response:
+                    if response.status_code >= 400:
+                        self._check(response, (await response.aread()).decode("utf-8", errors="replace"))
+                    async for line in response.aiter_lines():
+                        if line:
+                            yield line
+            except (httpx.HTTPError, LLMProviderError) as e:
+                raise self._error(e) from e
+            finally:
+                self.in_flight -= 1
+
+    @abc.abstractmethod
+    async def chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        """
+        Chat completion.
+
+        Args:
+            messages: [{"role": "system"|"user"|"assistant", "content": ...}]
+            temperature: Sampling temperature (provider default if None)
+            max_tokens: Output token cap (provider default if None)
+            model: Model to use instead of the provider's default
+
+        Returns:
+            Assistant message text
+
+        Raises:
+            LLMConnectionError: Host unreachable
+            LLMProviderError: Any other failure
+        """
+
+    @abc.abstractmethod
+    async def generate(self, prompt: str, temperature: Optional[float] = None,
+                       max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        """Single-prompt completion (see chat())."""
+
+    @abc.abstractmethod
+    def stream_chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                    max_tokens: Optional[int] = None, model: Optional[str] = None) -> AsyncIterator[str]:
+        """Chat completion yielding text chunks as they arrive (see chat()).
+
+        A caller that stops early should aclose() the iterator so the
+        connection goes back to the pool at once.
+        """
+
+    async def warm(self, model: Optional[str] = None) -> Optional[float]:
+        """
+        Load a model on the host ahead of the first request.
+
+        Args:
+            model: Model to load (provider default if None)
+
+        Returns:
+            Seconds the host spent loading, or None if there is nothing to load
+        """
+        return None
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """
+        Probe the host without taking a concurrency slot.
+
+        Args:
+            timeout: Seconds to wait for the probe
+
+        Returns:
+            True if the host answered without a server error
+        """
+        try:
+            response = await self._client().get(self.probe_path, timeout=timeout)
+            return response.status_code < 500
+        except httpx.HTTPError:
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return provider statistics."""
+        return {
+            "provider": self.name,
+            "base_url": self.base_url,
+            "model": self.model,
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "max_connections": self.max_connections,
+            "clients_created": self.clients_created
+        }
+
+    async def aclose(self):
+        """Close pooled connections (only possible from the loop that opened them)."""
+        if self._http is not None and self._http_loop is asyncio.get_running_loop():
+            await self._http.aclose()
+        self._http = None
+        self._http_loop = None
+
+
+class OllamaProvider(LLMProvider):
+    """Ollama REST API (/api/chat, /api/generate)."""
+
+    name = "ollama"
+    probe_path = "/api/tags"
+
+    def __init__(self, base_url: str, model: str, keep_alive: Optional[str] = None, **kwargs):
+        """
+        Initialize provider.
+
+        Args:
+            base_url: Ollama server, e.g. "http://localhost:11435"
+            model: Default model
+            keep_alive: How long the server keeps a model loaded after a request
+                        ("30m", "-1" for forever; server default if None)
+            **kwargs: Pool and timeout settings (see LLMProvider)
+        """
+        super().__init__(base_url, model, **kwargs)
+        self.keep_alive = keep_alive
+        self.warmed: Dict[str, float] = {}
+
+    def _body(self, temperature: Optional[float], max_tokens: Optional[int], stream: bool,
+              model: Optional[str] = None) -> Dict[str, Any]:
+        options = {}
+        if temperature is not None:
+            options["temperature"] = temperature
+        if max_tokens is not None:
+            options["num_predict"] = max_tokens
+        body: Dict[str, Any] = {"model": model or self.model, "stream": stream}
+        if options:
+            body["options"] = options
+        if self.keep_alive is not None:
+            body["keep_alive"] = self.keep_alive
+        return body
+
+    async def warm(self, model: Optional[str] = None) -> Optional[float]:
+        # A generate request without a prompt only loads the model (and resets its keep_alive);
+        # it bypasses the concurrency cap so a slow load never holds a request slot
+        model = model or self.model
+        try:
+            response = await self._client().post("/api/generate", json=self._body(None, None, False, model))
+            self._check(response)
+            data = response.json()
+        except (httpx.HTTPError, LLMProviderError, ValueError) as e:
+            raise self._error(e) from e
+        seconds = (data.get("load_duration") or 0) / 1e9
+        self.warmed[model] = time.time()
+        return seconds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return provider statistics."""
+        return {**super().get_stats(), "keep_alive": self.keep_alive, "warmed_models": sorted(self.warmed)}
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        data = await self._post("/api/chat", {**self._body(temperature, max_tokens, False, model), "messages": messages})
+        try:
+            return data["message"]["content"]
+        except (KeyError, TypeError):
+            raise self._error(LLMProviderError(f"Unexpected Ollama response: {str(data)[:200]}"))
+
+    async def generate(self, prompt: str, temperature: Optional[float] = None,
+                       max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        data = await self._post("/api/generate", {**self._body(temperature, max_tokens, False, model), "prompt": prompt})
+        try:
+            return data["response"]
+        except (KeyError, TypeError):
+            raise self._error(LLMProviderError(f"Unexpected Ollama response: {str(data)[:200]}"))
+
+    async def stream_chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                          max_tokens: Optional[int] = None, model: Optional[str] = None) -> AsyncIterator[str]:
+        payload = {**self._body(temperature, max_tokens, True, model), "messages": messages}
+        lines = self._stream_lines("/api/chat", payload)
+        try:
+            async for line in lines:
+                try:
+                    chunk = json.loads(line)
+                except ValueError:
+                    continue
+                if chunk.get("error"):
+                    raise self._error(LLMProviderError(f"Ollama error: {chunk['error']}"))
+                piece = (chunk.get("message") or {}).get("content")
+                if piece:
+                    yield piece
+                if chunk.get("done"):
+                    break
+        finally:
+            # Release the connection and concurrency slot even if the caller stops early
+            await lines.aclose()
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI-compatible Chat Completions API (/chat/completions)."""
+
+    name = "openai"
+    probe_path = "/models"
+
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini",
+                 base_url: str = "https://api.openai.com/v1", **kwargs):
+        """
+        Initialize provider.
+
+        Args:
+            api_key: Bearer token
+            model: Model name
+            base_url: API root (any OpenAI-compatible server)
+            **kwargs: Pool and timeout settings (see LLMProvider)
+        """
+        super().__init__(base_url, model, headers={"Authorization": f"Bearer {api_key}"}, **kwargs)
+
+    def _body(self, messages: List[Dict[str, str]], temperature: Optional[float],
+              max_tokens: Optional[int], stream: bool, model: Optional[str] = None) -> Dict[str, Any]:
+        body: Dict[str, Any] = {"model": model or self.model, "messages": messages}
+        if temperature is not None:
+            body["temperature"] = temperature
+        if max_tokens is not None:
+            body["max_tokens"] = max_tokens
+        if stream:
+            body["stream"] = True
+        return body
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        data = await self._post("/chat/completions", self._body(messages, temperature, max_tokens, False, model))
+        try:
+            return data["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise self._error(LLMProviderError(f"Unexpected OpenAI response: {str(data)[:200]}"))
+
+    async def generate(self, prompt: str, temperature: Optional[float] = None,
+                       max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        return await self.chat([{"role": "user", "content": prompt}], temperature, max_tokens, model)
+
+    async def stream_chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                          max_tokens: Optional[int] = None, model: Optional[str] = None) -> AsyncIterator[str]:
+        payload = self._body(messages, temperature, max_tokens, True, model)
+        lines = self._stream_lines("/chat/completions", payload)
+        try:
+            async for line in lines:
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    continue
+                choices = chunk.get("choices") or []
+                piece = (choices[0].get("delta") or {}).get("content") if choices else None
+                if piece:
+                    yield piece
+        finally:
+            await lines.aclose()
+
+
+class ModelRegistry:
+    """Which model each component (code, docs, sampling, ...) uses.
+
+    Components share the default model, so the host keeps a single model
+    loaded, unless a different one is explicitly configured for them.
+    """
+
+    def __init__(self, default: str, overrides: Optional[Dict[str, Optional[str]]] = None):
+        """
+        Initialize registry.
+
+        Args:
+            default: Model used by every component without an override
+            overrides: {component: model}; empty values are ignored
+        """
+        self.default = default
+        self.overrides = {name: model for name, model in (overrides or {}).items() if model}
+
+    def model_for(self, component: str) -> str:
+        """Model configured for a component."""
+        return self.overrides.get(component, self.default)
+
+    def models(self) -> List[str]:
+        """Distinct models in use, default first."""
+        return list(dict.fromkeys([self.default, *self.overrides.values()]))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return registry contents."""
+        return {"default": self.default, "overrides": dict(self.overrides), "models": self.models()}
+
+
+class CircuitBreaker:
+    """Per-host breaker: closed -> open after consecutive failures -> half-open after a cooldown.
+
+    While open the host gets no traffic; once the cooldown has passed a single
+    trial request is let through, and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30.0):
+        """
+        Initialize breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_seconds: Seconds an open breaker waits before a trial request
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def available(self) -> bool:
+        """True if a request may be sent to the host now."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.trial_running)
+
+    def begin(self):
+        """Mark a request as sent (the trial request when half-open)."""
+        if self.opened_at is not None:
+            self.trial_running = True
+
+    def release(self):
+        """Free the trial slot without a verdict (the request was cancelled or failed outside the LLM)."""
+        self.trial_running = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        """Open the breaker now (e.g. after a failed health probe)."""
+        if self.opened_at is None:
+            self.times_opened += 1
+        self.opened_at = time.monotonic()
+        self.trial_running = False
+
+
+class LLMPool:
+    """Several hosts serving the same model behind one provider interface.
+
+    Each request goes to the available host with the fewest outstanding
+    requests (ties rotate). A connection failure, timeout or 5xx counts
+    against that host's circuit breaker and the request moves on to the next
+    host; a stream fails over only if it has not produced text yet. Health
+    probes run in the background and open or close breakers between requests.
+    """
+
+    def __init__(self, providers: List[LLMProvider], failure_threshold: int = 3,
+                 reset_seconds: float = 30.0, probe_interval: float = 15.0, probe_timeout: float = 5.0):
+        """
+        Initialize pool.
+
+        Args:
+            providers: One provider per host (same model on each)
+            failure_threshold: Consecutive failures that take a host out of rotation
+            reset_seconds: Seconds before a failed host gets a trial request
+            probe_interval: Seconds between health probes (0 disables them)
+            probe_timeout: Seconds each probe may take
+        """
+        if not providers:
+            raise ValueError("LLMPool needs at least one provider")
+        self.providers = providers
+        self.breakers = [CircuitBreaker(failure_threshold, reset_seconds) for _ in providers]
+        self.outstanding = [0] * len(providers)
+        self.probe_ok: List[Optional[bool]] = [None] * len(providers)
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.name = providers[0].name
+        self.model = providers[0].model
+        self.base_url = ", ".join(p.base_url for p in providers)
+        self._next = 0
+        self._probe_task: Optional[asyncio.Task] = None
+        self._warm_task: Optional[asyncio.Task] = None
+        self.keep_warm_interval = 0.0
+        self.warm_results: Dict[str, Dict[str, Any]] = {p.base_url: {} for p in providers}
+        self.failovers = 0
+        self.rejected = 0
+
+    def _pick(self, tried: set) -> Optional[int]:
+        count = len(self.providers)
+        candidates = [i for i in range(count) if i not in tried and self.breakers[i].available()]
+        if not candidates:
+            return None
+        index = min(candidates, key=lambda i: (self.outstanding[i], (i - self._next) % count))
+        self._next = (index + 1) % count
+        self.breakers[index].begin()
+        return index
+
+    def _unavailable(self, last_error: Optional[Exception]) -> LLMConnectionError:
+        self.rejected += 1
+        detail = f": {last_error}" if last_error else " (all circuit breakers open)"
+        return LLMConnectionError(f"No healthy {self.name} host among {len(self.providers)}{detail}")
+
+    def _failed(self, index: int, e: LLMProviderError, tried: set):
+        tried.add(index)
+        if e.retryable:
+            self.breakers[index].record_failure()
+        else:
+            # The host answered; the request itself was bad
+            self.breakers[index].record_success()
+
+    async def _call(self, method: str, *args, **kwargs):
+        tried, last_error = set(), None
+        while True:
+            index = self._pick(tried)
+            if index is None:
+                raise self._unavailable(last_error)
+            if tried:
+                self.failovers += 1
+            self.outstanding[index] += 1
+            try:
+                result = await getattr(self.providers[index], method)(*args, **kwargs)
+            except LLMProviderError as e:
+                self._failed(index, e, tried)
+                if not e.retryable:
+                    raise
+                last_error = e
+                continue
+            finally:
+                self.outstanding[index] -= 1
+                # Cancelled or unexpected error: let the next request be the trial
+                self.breakers[index].release()
+            self.breakers[index].record_success()
+            return result
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        """Chat completion on the least-loaded healthy host (see LLMProvider.chat())."""
+        return await self._call("chat", messages, temperature, max_tokens, model)
+
+    async def generate(self, prompt: str, temperature: Optional[float] = None,
+                       max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        """Single-prompt completion on the least-loaded healthy host."""
+        return await self._call("generate", prompt, temperature, max_tokens, model)
+
+    async def stream_chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                          max_tokens: Optional[int] = None, model: Optional[str] = None) -> AsyncIterator[str]:
+        """Streamed chat on the least-loaded healthy host; fails over until the first chunk."""
+        tried, last_error = set(), None
+        while True:
+            index = self._pick(tried)
+            if index is None:
+                raise self._unavailable(last_error)
+            if tried:
+                self.failovers += 1
+            self.outstanding[index] += 1
+            stream = self.providers[index].stream_chat(messages, temperature, max_tokens, model)
+            started = False
+            try:
+                async for piece in stream:
+                    if not started:
+                        # The host is serving; count it healthy even if the caller stops early
+                        started = True
+                        self.breakers[index].record_success()
+                    yield piece
+            except LLMProviderError as e:
+                self._failed(index, e, tried)
+                if started or not e.retryable:
+                    raise
+                last_error = e
+                continue
+            finally:
+                self.outstanding[index] -= 1
+                self.breakers[index].release()
+                await stream.aclose()
+            if not started:
+                self.breakers[index].record_success()
+            return
+
+    async def probe(self) -> List[bool]:
+        """
+        Probe every host once and update its breaker.
+
+        Returns:
+            Probe result per host
+        """
+        results = await asyncio.gather(*(p.ping(self.probe_timeout) for p in self.providers))
+        for index, ok in enumerate(results):
+            self.probe_ok[index] = ok
+            if ok:
+                if self.breakers[index].state != "closed":
+                    self.breakers[index].record_success()
+            else:
+                self.breakers[index].trip()
+        return list(results)
+
+    async def _probe_loop(self):
+        while True:
+            try:
+                await self.probe()
+            except Exception:
+                pass
+            await asyncio.sleep(self.probe_interval)
+
+    async def start_probes(self):
+        """Start background health probes on the running event loop."""
+        if self._probe_task is None and self.probe_interval > 0:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop_probes(self):
+        """Cancel background health probes."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+
+    async def _warm_host(self, index: int, models: List[str]):
+        provider = self.providers[index]
+        for model in models:
+            # One model at a time per host: parallel loads compete for the same GPU/RAM
+            try:
+                seconds = await provider.warm(model)
+                result = {"ok": True, "load_seconds": round(seconds or 0.0, 2)}
+            except LLMProviderError as e:
+                result = {"ok": False, "error": str(e)[:200]}
+            self.warm_results[provider.base_url][model] = {**result, "at": time.strftime("%H:%M:%S")}
+
+    async def warm(self, models: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Load models on every host that is not known to be down.
+
+        Args:
+            models: Models to load (the pool's default model if None)
+
+        Returns:
+            {base_url: {model: {"ok", "load_seconds" | "error", "at"}}}
+        """
+        models = models or [self.model]
+        indexes = [i for i, breaker in enumerate(self.breakers) if breaker.state != "open"]
+        await asyncio.gather(*(self._warm_host(i, models) for i in indexes))
+        return self.warm_results
+
+    async def _warm_loop(self, models: List[str]):
+        while True:
+            try:
+                await self.warm(models)
+            except Exception:
+                pass
+            if self.keep_warm_interval <= 0:
+                return
+            await asyncio.sleep(self.keep_warm_interval)
+
+    async def start_warmup(self, models: Optional[List[str]] = None, keep_warm_interval: float = 0.0):
+        """
+        Warm models in the background, then optionally keep them warm.
+
+        Args:
+            models: Models to load (the pool's default model if None)
+            keep_warm_interval: Seconds between keep-warm requests (0 = warm once)
+        """
+        if self._warm_task is None:
+            self.keep_warm_interval = keep_warm_interval
+            self._warm_task = asyncio.create_task(self._warm_loop(models or [self.model]))
+
+    async def stop_warmup(self):
+        """Cancel background warm-up / keep-warm requests."""
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            await asyncio.gather(self._warm_task, return_exceptions=True)
+            self._warm_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool statistics with one entry per host."""
+        hosts = []
+        for index, provider in enumerate(self.providers):
+            breaker = self.breakers[index]
+            hosts.append({
+                "base_url": provider.base_url,
+                "state": breaker.state,
+                "outstanding": self.outstanding[index],
+                "requests": provider.requests,
+                "errors": provider.errors,
+                "consecutive_failures": breaker.failures,
+                "times_opened": breaker.times_opened,
+                "last_probe_ok": self.probe_ok[index],
+                "warm": self.warm_results[provider.base_url]
+            })
+        return {
+            "provider": self.name,
+            "model": self.model,
+            "hosts": hosts,
+            "healthy_hosts": sum(1 for b in self.breakers if b.state == "closed"),
+            "failovers": self.failovers,
+            "rejected": self.rejected,
+            "probe_interval": self.probe_interval,
+            "keep_warm_interval": self.keep_warm_interval
+        }
+
+    async def aclose(self):
+        """Stop probes and warm-up, and close every host's connections."""
+        await self.stop_probes()
+        await self.stop_warmup()
+        for provider in self.providers:
+            await provider.aclose()
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    print("\n" + "="*70)
+    print("🤖 LLM Provider - Test Mode")
+    print("="*70 + "\n")
+
+    # A mock Ollama server: every request is answered after 0.2s
+    async def ollama_mock(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2)
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": [{"name": "llama3.2"}]})
+        body = json.loads(request.content)
+        if request.url.path == "/api/generate" and "prompt" not in body:
+            return httpx.Response(200, json={"response": "", "done": True, "load_duration": 1_500_000_000})
+        if request.url.path == "/api/generate":
+            return httpx.Response(200, json={"response": f"echo: {body['prompt']}"})
+        if body.get("stream"):
+            lines = [json.dumps({"message": {"content": word}, "done": False}) for word in ["void ", "setup() {}"]]
+            lines.append(json.dumps({"message": {"content": ""}, "done": True}))
+            return httpx.Response(200, content="\n".join(lines).encode())
+        return httpx.Response(200, json={"message": {"content": "void setup() {}"}})
+
+    async def main_test():
+        provider = OllamaProvider(os.getenv("OLLAMA_HOST", "http://localhost:11435"), "llama3.2",
+                                  max_concurrency=4, transport=httpx.MockTransport(ollama_mock))
+
+        print(f"✓ chat: {await provider.chat([{'role': 'user', 'content': 'blink'}])}")
+        print(f"✓ generate: {await provider.generate('hello')}")
+        print(f"✓ stream: {[piece async for piece in provider.stream_chat([{'role': 'user', 'content': 'x'}])]}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(provider.generate(str(i)) for i in range(8)))
+        print(f"✓ 8 requests, 4 at a time: {time.perf_counter() - start:.2f}s (~0.4s expected)")
+        print(json.dumps(provider.get_stats(), indent=2))
+        await provider.aclose()
+
+        # Pool: one host down, one up - requests fail over and the breaker opens
+        def down(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("connection refused", request=request)
+
+        pool = LLMPool([OllamaProvider("http://down:11435", "llama3.2", transport=httpx.MockTransport(down)),
+                        OllamaProvider("http://up:11435", "llama3.2", transport=httpx.MockTransport(ollama_mock))],
+                       failure_threshold=2, reset_seconds=60)
+        results = await asyncio.gather(*(pool.generate(str(i)) for i in range(6)))
+        print(f"\n✓ pool: {len(results)} answered, failovers: {pool.failovers}")
+        print(f"✓ stream via pool: {''.join([piece async for piece in pool.stream_chat([{'role': 'user', 'content': 'x'}])])}")
+        print(f"✓ probe: {await pool.probe()}")
+
+        # A half-open trial that gets cancelled must not leave the host blocked
+        half_open = LLMPool([OllamaProvider("http://slow:11435", "llama3.2", transport=httpx.MockTransport(ollama_mock))],
+                            reset_seconds=0.05, probe_interval=0)
+        half_open.breakers[0].trip()
+        await asyncio.sleep(0.1)
+        trial = asyncio.create_task(half_open.generate("cancel me"))
+        await asyncio.sleep(0.05)
+        blocked = not half_open.breakers[0].available()
+        trial.cancel()
+        try:
+            await trial
+        except asyncio.CancelledError:
+            pass
+        print(f"✓ cancelled trial: blocked while running={blocked}, "
+              f"available after cancel={half_open.breakers[0].available()}, "
+              f"next request={await half_open.generate('retry')} ({half_open.breakers[0].state})")
+        await half_open.aclose()
+
+        registry = ModelRegistry("llama3.2", {"code": None, "docs": "codellama"})
+        print(f"✓ registry: code={registry.model_for('code')} docs={registry.model_for('docs')} "
+              f"models={registry.models()}")
+        print(f"✓ warm: {json.dumps(await pool.warm(registry.models()))}")
+        print(json.dumps(pool.get_stats(), indent=2))
+        await pool.aclose()
+
+    asyncio.run(main_test())
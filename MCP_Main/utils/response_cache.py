@@ -1,31 +1,47 @@
 #!/usr/bin/env python3
 """
 Response Cache - Phase 8 Performance Optimization
-Cache LLM responses to avoid redundant expensive calls
+Cache full generation responses to avoid redundant LLM and compile runs
 """
 
+import time
+import asyncio
 import hashlib
 import json
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from datetime import timedelta
 from typing import Optional, Dict, Any
 
 
 class ResponseCache:
-    """Cache LLM responses with TTL to avoid redundant calls."""
+    """LRU cache with TTL and optional byte budget (O(1) get/set/evict)."""
     
-    def __init__(self, ttl_minutes: int = 60, max_size: int = 100):
+    def __init__(self, ttl_minutes: int = 60, max_size: int = 100, max_bytes: Optional[int] = None,
+                 disk: Optional[Any] = None):
         """
         Initialize cache.
         
         Args:
             ttl_minutes: Time-to-live for cached entries in minutes
             max_size: Maximum number of cache entries (LRU eviction)
+            max_bytes: Optional bound on the total serialized size of entries
+            disk: Optional second tier (utils.disk_cache.DiskCache) consulted on
+                  memory misses and written through on set
         """
-        self.cache: Dict[str, tuple] = {}
+        # key -> (value, stored_at monotonic seconds, size in bytes);
+        # order is recency, least recently used first
+        self.cache: "OrderedDict[str, tuple]" = OrderedDict()
         self.ttl = timedelta(minutes=ttl_minutes)
+        self.ttl_seconds = self.ttl.total_seconds()
         self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.disk = disk
         self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
         self.misses = 0
+        self.evictions = 0
     
     def get_cache_key(self, description: str, context: Optional[str] = None, 
                      board: str = "esp32dev", **kwargs) -> str:
@@ -53,9 +69,18 @@ class ResponseCache:
         text = json.dumps(data, sort_keys=True)
         return hashlib.md5(text.encode()).hexdigest()
     
-    def get(self, key: str) -> Optional[str]:
+    @staticmethod
+    def estimate_size(value: Any) -> int:
+        """Approximate memory footprint of a value as its serialized length."""
+        if isinstance(value, bytes):
+            return len(value)
+        if isinstance(value, str):
+            return len(value.encode("utf-8"))
+        return len(json.dumps(value, default=str).encode("utf-8"))
+    
+    def get(self, key: str) -> Optional[Any]:
         """
-        Get cached response if exists and not expired.
+        Get cached response if exists and not expired (marks it recently used).
         
         Args:
             key: Cache key
@@ -63,44 +88,116 @@ class ResponseCache:
         Returns:
             Cached value or None if not found/expired
         """
-        if key in self.cache:
-            value, timestamp = self.cache[key]
-            
-            # Check if expired
-            if datetime.now() - timestamp < self.ttl:
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        return self._disk_result(key, self.disk.get(key) if self.disk is not None else None)
+    
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        Same as get(), but the disk tier lookup runs in a worker thread so the
+        event loop is not blocked on SQLite. Memory hits return without a hop.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value or None if not found/expired
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        disk_value = await asyncio.to_thread(self.disk.get, key) if self.disk is not None else None
+        return self._disk_result(key, disk_value)
+    
+    def _get_memory(self, key: str) -> Optional[Any]:
+        entry = self.cache.get(key)
+        if entry is not None:
+            value, stored_at, _ = entry
+            if time.monotonic() - stored_at < self.ttl_seconds:
+                self.cache.move_to_end(key)
                 self.hits += 1
+                self.memory_hits += 1
                 return value
-            else:
-                # Remove expired entry
-                del self.cache[key]
-                self.misses += 1
-                return None
+            # Remove expired entry
+            self._remove(key)
+        return None
+    
+    def _disk_result(self, key: str, value: Optional[Any]) -> Optional[Any]:
+        if value is not None:
+            # Promote to memory (restart warm-up / entry written by another worker)
+            self._store(key, value)
+            self.hits += 1
+            self.disk_hits += 1
+            return value
         
         self.misses += 1
         return None
     
-    def set(self, key: str, value: str):
+    def set(self, key: str, value: Any) -> bool:
         """
-        Cache response with current timestamp.
+        Cache response with current timestamp, evicting least recently used entries.
+        The value is also written through to the disk tier, if any.
+        
+        Args:
+            key: Cache key
+            value: Value to cache (a serialized response dict in main.py)
+        
+        Returns:
+            False if the value alone exceeds max_bytes and was not cached in memory
+        """
+        if self.disk is not None:
+            self.disk.set(key, value)
+        return self._store(key, value)
+    
+    async def aset(self, key: str, value: Any) -> bool:
+        """
+        Same as set(), but the disk tier write runs in a worker thread so the
+        event loop is not blocked on SQLite.
         
         Args:
             key: Cache key
             value: Value to cache
+        
+        Returns:
+            False if the value alone exceeds max_bytes and was not cached in memory
         """
-        # Implement LRU eviction if cache full
-        if len(self.cache) >= self.max_size:
-            # Remove oldest entry
-            oldest_key = min(self.cache.keys(), 
-                           key=lambda k: self.cache[k][1])
-            del self.cache[oldest_key]
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+        return self._store(key, value)
+    
+    def _store(self, key: str, value: Any) -> bool:
+        size = self.estimate_size(value)
+        if key in self.cache:
+            self._remove(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+        
+        self.cache[key] = (value, time.monotonic(), size)
+        self.current_bytes += size
         
-        self.cache[key] = (value, datetime.now())
+        while len(self.cache) > self.max_size or (
+                self.max_bytes is not None and self.current_bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self.cache.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+        return True
+    
+    def _remove(self, key: str):
+        _, _, size = self.cache.pop(key)
+        self.current_bytes -= size
     
     def clear(self):
-        """Clear all cached entries."""
+        """Clear all cached entries (both tiers)."""
         self.cache.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        self.current_bytes = 0
         self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
         self.misses = 0
+        self.evictions = 0
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -115,23 +212,30 @@ class ResponseCache:
         return {
             "size": len(self.cache),
             "max_size": self.max_size,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
             "hits": self.hits,
             "misses": self.misses,
+            "evictions": self.evictions,
             "total_requests": total_requests,
             "hit_rate_percent": round(hit_rate, 2),
-            "ttl_minutes": self.ttl.total_seconds() / 60
+            "ttl_minutes": self.ttl.total_seconds() / 60,
+            "tiers": {
+                "memory": {"hits": self.memory_hits},
+                "disk": self.disk.get_stats() if self.disk is not None else None
+            }
         }
     
     def cleanup_expired(self):
         """Remove all expired entries."""
-        now = datetime.now()
+        now = time.monotonic()
         expired_keys = [
-            key for key, (_, timestamp) in self.cache.items()
-            if now - timestamp >= self.ttl
+            key for key, (_, stored_at, _) in self.cache.items()
+            if now - stored_at >= self.ttl_seconds
         ]
         
         for key in expired_keys:
-            del self.cache[key]
+            self._remove(key)
         
         return len(expired_keys)
 
@@ -179,14 +283,32 @@ if __name__ == "__main__":
     cache.set(key_new, "new code")
     print(f"✓ Cache size after exceeding max: {len(cache.cache)}")
     
-    # Test 5: Statistics
-    print("\nTest 5: Statistics")
+    # Test 5: Recency - a read keeps an entry alive
+    print("\nTest 5: LRU Recency")
+    print("-" * 70)
+    lru = ResponseCache(ttl_minutes=1, max_size=2)
+    lru.set("a", "1")
+    lru.set("b", "2")
+    lru.get("a")
+    lru.set("c", "3")
+    print(f"✓ Kept recently read entry: {'a' in lru.cache}, evicted oldest: {'b' not in lru.cache}")
+    
+    # Test 6: Byte budget
+    print("\nTest 6: Byte Budget")
+    print("-" * 70)
+    sized = ResponseCache(ttl_minutes=1, max_size=100, max_bytes=1000)
+    for i in range(5):
+        sized.set(f"k{i}", "x" * 300)
+    print(f"✓ Entries: {len(sized.cache)}, bytes: {sized.current_bytes}/{sized.max_bytes}")
+    
+    # Test 7: Statistics
+    print("\nTest 7: Statistics")
     print("-" * 70)
     stats = cache.get_stats()
     print(json.dumps(stats, indent=2))
     
-    # Test 6: Expiration
-    print("\nTest 6: TTL Expiration (waiting 65 seconds...)")
+    # Test 8: Expiration
+    print("\nTest 8: TTL Expiration (waiting 65 seconds...)")
     print("-" * 70)
     print("⏳ Simulating expiration by clearing cache...")
     cache.clear()
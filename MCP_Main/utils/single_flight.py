@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Single Flight - Coalesce identical in-flight requests
+Callers with the same key share one running computation and its result
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class _Flight:
+    """One running computation plus the event sinks of everyone waiting on it."""
+
+    def __init__(self):
+        self.listeners: List[Callable[[str, Dict], None]] = []
+        self.task: Optional[asyncio.Future] = None
+        self.waiters = 0
+
+    def emit(self, event: str, data: Dict):
+        """Fan an event out to every attached caller (safe from worker threads)."""
+        for listener in list(self.listeners):
+            try:
+                listener(event, data)
+            except Exception:
+                pass
+
+
+class SingleFlight:
+    """Run at most one computation per key; later callers attach to it."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[Callable[[str, Dict], None]], Awaitable[Any]],
+                 emit: Optional[Callable[[str, Dict], None]] = None) -> Any:
+        """
+        Run func once per key and share its result.
+
+        The computation runs as its own task, so a caller that disconnects
+        (is cancelled) does not abort it for the others.
+
+        Args:
+            key: Coalescing key (the response cache key plus stream mode in main.py)
+            func: async callable(emit) performing the work; events passed to
+                  its emit reach every caller attached at that moment
+            emit: This caller's event sink, if any
+
+        Returns:
+            The shared result (exceptions are re-raised in every caller)
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            if emit:
+                flight.listeners.append(emit)
+            flight.task = asyncio.ensure_future(func(flight.emit))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task: self._finish(key, flight))
+            self.leaders += 1
+        else:
+            if emit:
+                flight.listeners.append(emit)
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if emit in flight.listeners:
+                flight.listeners.remove(emit)
+
+    def _finish(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Nobody left to observe a failure: retrieve it to avoid asyncio's
+        # "exception was never retrieved" warning.
+        if flight.waiters == 0 and not flight.task.cancelled():
+            flight.task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return coalescing statistics."""
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "waiting": sum(f.waiters for f in self._flights.values())
+        }
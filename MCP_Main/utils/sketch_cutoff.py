@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Sketch Cutoff - Stop LLM streams once a complete sketch has been emitted
+Detects a closed ```cpp block with setup() and loop(), and estimates the tokens the cutoff saves
+"""
+
+import re
+import threading
+from typing import Any, Dict, Optional
+
+# A closed fenced block; the language tag (cpp, arduino, ...) is optional
+_FENCED_BLOCK_RE = re.compile(r"```[\w+#-]*[^\n]*\n([\s\S]*?)```")
+_SETUP_RE = re.compile(r"\bvoid\s+setup\s*\(")
+_LOOP_RE = re.compile(r"\bvoid\s+loop\s*\(")
+
+
+def sketch_end(text: str) -> Optional[int]:
+    """
+    Find the end of the first closed code block that holds a whole sketch.
+
+    Args:
+        text: LLM output so far
+
+    Returns:
+        Index just past the closing ``` fence, or None if no such block has closed yet
+    """
+    for match in _FENCED_BLOCK_RE.finditer(text):
+        body = match.group(1)
+        if _SETUP_RE.search(body) and _LOOP_RE.search(body):
+            return match.end()
+    return None
+
+
+class SketchCutoff:
+    """Decides per stream whether to stop at the sketch, and keeps the numbers.
+
+    Every `measure_every`-th stream is left to run to the end. The tokens it
+    produces after the sketch closes are what a cutoff would have saved; their
+    average is the per-request estimate reported for streams that were cut.
+    """
+
+    def __init__(self, enabled: bool = True, measure_every: int = 20):
+        """
+        Initialize cutoff policy.
+
+        Args:
+            enabled: Stop streams at the end of the sketch
+            measure_every: Let one stream in N run to the end to measure trailing tokens (0 = never)
+        """
+        self.enabled = enabled
+        self.measure_every = measure_every
+        self._lock = threading.Lock()
+        self.streams = 0
+        self.stopped_early = 0
+        self.tokens_received = 0
+        self.tokens_saved_estimate = 0
+        self.measured_streams = 0
+        self.measured_trailing_tokens = 0
+
+    def should_stop(self) -> bool:
+        """Register a new stream; True if it should stop once the sketch is complete."""
+        with self._lock:
+            self.streams += 1
+            if not self.enabled:
+                return False
+            return not (self.measure_every > 0 and self.streams % self.measure_every == 1)
+
+    def average_trailing_tokens(self) -> Optional[float]:
+        """Mean tokens sent after the sketch in streams that ran to the end."""
+        with self._lock:
+            if not self.measured_streams:
+                return None
+            return self.measured_trailing_tokens / self.measured_streams
+
+    def record(self, tokens: int, sketch_tokens: Optional[int], stopped_early: bool) -> Dict[str, Any]:
+        """
+        Record a finished stream.
+
+        Args:
+            tokens: Stream chunks received (about one token each)
+            sketch_tokens: Chunks received when the sketch block closed (None if it never did)
+            stopped_early: The stream was cut at the end of the sketch
+
+        Returns:
+            Per-request report: tokens, stopped_early, trailing_tokens, tokens_saved
+        """
+        trailing = None
+        if sketch_tokens is not None and not stopped_early:
+            trailing = tokens - sketch_tokens
+        saved = None
+        if stopped_early:
+            average = self.average_trailing_tokens()
+            saved = round(average) if average is not None else None
+
+        with self._lock:
+            self.tokens_received += tokens
+            if stopped_early:
+                self.stopped_early += 1
+                self.tokens_saved_estimate += saved or 0
+            if trailing is not None:
+                self.measured_streams += 1
+                self.measured_trailing_tokens += trailing
+
+        return {
+            "tokens": tokens,
+            "stopped_early": stopped_early,
+            "trailing_tokens": trailing,
+            "tokens_saved": saved
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cutoff statistics."""
+        average = self.average_trailing_tokens()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "streams": self.streams,
+                "stopped_early": self.stopped_early,
+                "tokens_received": self.tokens_received,
+                "tokens_saved_estimate": self.tokens_saved_estimate,
+                "measured_streams": self.measured_streams,
+                "avg_trailing_tokens": round(average, 1) if average is not None else None
+            }
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import json
+
+    print("\n" + "="*70)
+    print("✂️  Sketch Cutoff - Test Mode")
+    print("="*70 + "\n")
+
+    reply = ("Here is the sketch:\n```cpp\nvoid setup() {\n  pinMode(2, OUTPUT);\n}\n\n"
+             "void loop() {\n  digitalWrite(2, !digitalRead(2));\n  delay(500);\n}\n```\n"
+             "This sketch toggles the LED on GPIO 2 every half second. You can change the pin...")
+    chunks = [reply[i:i + 4] for i in range(0, len(reply), 4)]
+
+    cutoff = SketchCutoff(measure_every=2)
+    for run in range(4):
+        stop = cutoff.should_stop()
+        text, sketch_tokens, received = "", None, 0
+        for chunk in chunks:
+            text += chunk
+            received += 1
+            if sketch_tokens is None and "`" in chunk and sketch_end(text) is not None:
+                sketch_tokens = received
+                if stop:
+                    break
+        report = cutoff.record(received, sketch_tokens, stop and sketch_tokens is not None)
+        print(f"✓ run {run + 1}: {json.dumps(report)}")
+
+    print(f"\nOnly setup(): {sketch_end('```cpp' + chr(10) + 'void setup() {}' + chr(10) + '```')}")
+    print(json.dumps(cutoff.get_stats(), indent=2))
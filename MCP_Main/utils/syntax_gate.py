@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Syntax Gate - Host g++ -fsyntax-only check against stub Arduino headers
+Finds syntax and API errors in well under a second, before any toolchain time is spent
+"""
+
+import os
+import re
+import time
+import shutil
+import tempfile
+import subprocess
+from typing import Any, Dict, List, Optional
+
+DEFAULT_STUB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "arduino_stubs")
+# Architectures the stub headers model; other cores define macros (ISR,
+# PROGMEM, ...) the stubs lack, and every use would read as a syntax error
+STUB_ARCHES = ("esp32",)
+
+# Top-level function definitions (no indentation), e.g. "void blink(int pin) {"
+_FUNCTION_DEF_RE = re.compile(
+    r"^(?!(?:if|else|for|while|switch|return|do)\b)"
+    r"((?:(?:static|inline|const|unsigned|signed|long|short|struct)\s+)*[A-Za-z_][\w:<>]*[\s\*&]+)"
+    r"([A-Za-z_]\w*)\s*\(([^;{}()]*)\)\s*(?:const\s*)?\{",
+    re.MULTILINE)
+_MISSING_HEADER_RE = re.compile(r"fatal error: ([^:\s]+): No such file or directory")
+
+
+def sketch_to_cpp(code: str, sketch_name: str = "sketch.ino") -> str:
+    """
+    Turn an .ino sketch into a C++ translation unit the way arduino-cli does:
+    forward declarations for every top-level function, inserted before the
+    first definition, with #line directives so diagnostics keep sketch line numbers.
+
+    Args:
+        code: Sketch source
+        sketch_name: File name reported in diagnostics
+
+    Returns:
+        C++ source
+    """
+    matches = [m for m in _FUNCTION_DEF_RE.finditer(code) if "=" not in m.group(3)]
+    if not matches:
+        return f'#line 1 "{sketch_name}"\n{code}'
+
+    prototypes = []
+    for m in matches:
+        prototype = f"{m.group(1).strip()} {m.group(2)}({m.group(3).strip()});"
+        if prototype not in prototypes:
+            prototypes.append(prototype)
+
+    insert_at = code.rfind("\n", 0, matches[0].start()) + 1
+    first_line = code.count("\n", 0, insert_at) + 1
+    return (f'#line 1 "{sketch_name}"\n{code[:insert_at]}'
+            + "\n".join(prototypes)
+            + f'\n#line {first_line} "{sketch_name}"\n{code[insert_at:]}')
+
+
+class SyntaxGate:
+    """Runs the host C++ compiler in syntax-only mode on a sketch.
+
+    Only headers present in the stub directory (plus the host's C/C++
+    standard headers) are available. A sketch including anything else, e.g.
+    a third-party sensor library, cannot be checked and is reported as
+    skipped rather than failed.
+    """
+
+    def __init__(self, stub_dir: str = DEFAULT_STUB_DIR, compiler: Optional[str] = None, timeout: int = 10):
+        """
+        Initialize gate.
+
+        Args:
+            stub_dir: Directory with the stub Arduino headers
+            compiler: C++ compiler (default: g++ or clang++ from PATH)
+            timeout: Seconds before the check is abandoned
+        """
+        self.stub_dir = stub_dir
+        self.compiler = compiler or shutil.which("g++") or shutil.which("clang++") or ""
+        self.timeout = timeout
+        self.checks = 0
+        self.passed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.total_ms = 0.0
+
+    def available(self) -> bool:
+        """True if a compiler and the stub headers are present."""
+        return bool(self.compiler) and os.path.isfile(os.path.join(self.stub_dir, "Arduino.h"))
+
+    @staticmethod
+    def covers(fqbn: str) -> bool:
+        """True if the stub headers model the board's architecture."""
+        return (fqbn.split(":") + ["", ""])[1] in STUB_ARCHES
+
+    def _defines(self, fqbn: str) -> List[str]:
+        arch = (fqbn.split(":") + ["", ""])[1]
+        defines = ["-DARDUINO=10819"]
+        if arch == "esp32":
+            defines += ["-DARDUINO_ARCH_ESP32", "-DESP32"]
+        elif arch:
+            defines.append(f"-DARDUINO_ARCH_{arch.upper()}")
+        return defines
+
+    def check(self, code: str, fqbn: str = "esp32:esp32:esp32") -> Dict[str, Any]:
+        """
+        Syntax-check a sketch.
+
+        Args:
+            code: Sketch source
+            fqbn: Target board (selects ARDUINO_ARCH_* for the stubs)
+
+        Returns:
+            Dict with status ("passed", "failed" or "skipped"), output (compiler
+            diagnostics, file name "sketch.ino"), reason, missing_header and duration_ms
+        """
+        if not self.available():
+            self.skipped += 1
+            return {"status": "skipped", "output": "", "reason": "no host C++ compiler or stub headers",
+                    "missing_header": None, "duration_ms": 0.0}
+        if not self.covers(fqbn):
+            self.skipped += 1
+            return {"status": "skipped", "output": "", "reason": f"stub headers do not cover {fqbn}",
+                    "missing_header": None, "duration_ms": 0.0}
+
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="syntax_gate_") as tmp:
+            source = os.path.join(tmp, "sketch.ino.cpp")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(sketch_to_cpp(code))
+            cmd = [self.compiler, "-fsyntax-only", "-std=gnu++17", "-x", "c++", "-w",
+                   "-fdiagnostics-color=never", "-fmax-errors=20", "-I", self.stub_dir,
+                   *self._defines(fqbn), "-include", "Arduino.h", source]
+            try:
+                # C locale: plain ASCII quotes, as the diagnostic parsers expect
+                r = subprocess.run(cmd, cwd=tmp, capture_output=True, text=True, timeout=self.timeout,
+                                   env={**os.environ, "LC_ALL": "C"})
+                output, returncode = (r.stdout + r.stderr).strip(), r.returncode
+            except (OSError, subprocess.TimeoutExpired) as e:
+                output, returncode = str(e), None
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.checks += 1
+        self.total_ms += duration_ms
+
+        missing = _MISSING_HEADER_RE.search(output)
+        if returncode is None or missing:
+            self.skipped += 1
+            reason = f"no stub for {missing.group(1)}" if missing else f"compiler did not run: {output}"
+            return {"status": "skipped", "output": output, "reason": reason,
+                    "missing_header": missing.group(1) if missing else None, "duration_ms": duration_ms}
+        if returncode == 0:
+            self.passed += 1
+            return {"status": "passed", "output": output, "reason": None, "missing_header": None,
+                    "duration_ms": duration_ms}
+        self.failed += 1
+        return {"status": "failed", "output": output, "reason": None, "missing_header": None,
+                "duration_ms": duration_ms}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return gate statistics."""
+        return {
+            "available": self.available(),
+            "compiler": self.compiler or None,
+            "checks": self.checks,
+            "passed": self.passed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "avg_ms": round(self.total_ms / self.checks, 1) if self.checks else 0.0
+        }
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    print("\n" + "="*70)
+    print("🔎 Syntax Gate - Test Mode")
+    print("="*70 + "\n")
+
+    gate = SyntaxGate()
+    samples = {
+        "valid": """#include <WiFi.h>
+const int LED = 2;
+void setup() {
+  Serial.begin(115200);
+  pinMode(LED, OUTPUT);
+  ledcAttach(LED, 5000, 8);
+  blink(3);
+}
+void loop() {
+  Serial.println(WiFi.localIP());
+  delay(1000);
+}
+void blink(int times) {
+  for (int i = 0; i < times; i++) { digitalWrite(LED, HIGH); delay(100); }
+}
+""",
+        "missing semicolon": "void setup() {\n  pinMode(2, OUTPUT)\n  digitalWrite(2, HIGH);\n}\nvoid loop() {}\n",
+        "old LEDC API": "void setup() {\n  ledcSetup(0, 5000, 8);\n  ledcAttachPin(2, 0);\n}\nvoid loop() {}\n",
+        "third-party header": "#include <DHT.h>\nDHT dht(4, DHT22);\nvoid setup() {}\nvoid loop() {}\n",
+        "core macro the stubs lack": "void ICACHE_RAM_ATTR isr() {}\nvoid setup() {}\nvoid loop() {}\n",
+        "AVR board (uno)": "ISR(TIMER1_COMPA_vect) {}\nvoid setup() {}\nvoid loop() {}\n",
+    }
+    for name, code in samples.items():
+        result = gate.check(code, "arduino:avr:uno" if "AVR" in name else "esp32:esp32:esp32")
+        print(f"✓ {name}: {result['status']} in {result['duration_ms']} ms"
+              + (f" ({result['reason']})" if result["reason"] else ""))
+        for line in result["output"].splitlines():
+            if "error:" in line:
+                print(f"    {line}")
+    print(f"\n{gate.get_stats()}")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Task Graph - Minimal async DAG executor
+Runs independent pipeline stages concurrently and joins their results
+"""
+
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+
+class TaskGraphError(Exception):
+    """Invalid graph definition (unknown dependency or cycle)."""
+    pass
+
+
+class TaskGraph:
+    """Run async callables as soon as their dependencies have finished.
+
+    Each node's callable receives its dependencies' results as keyword
+    arguments named after the dependency nodes.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, tuple] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, func: Callable[..., Awaitable[Any]], deps: Sequence[str] = ()):
+        """
+        Register a node.
+
+        Args:
+            name: Unique node name (also the key of its result)
+            func: Async callable taking one keyword argument per dependency
+            deps: Names of nodes that must finish first
+        """
+        if name in self.nodes:
+            raise TaskGraphError(f"Duplicate node: {name}")
+        self.nodes[name] = (func, tuple(deps))
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise TaskGraphError(f"Cycle detected: {' -> '.join(path + [name])}")
+            if name not in self.nodes:
+                raise TaskGraphError(f"Unknown dependency: {name} (required by {path[-1]})")
+            state[name] = "visiting"
+            for dep in self.nodes[name][1]:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name, [])
+        return order
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Execute the graph.
+
+        Returns:
+            Dict of node name -> result
+
+        Raises:
+            The first exception raised by any node (remaining nodes are cancelled)
+        """
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_node(name: str) -> Any:
+            func, deps = self.nodes[name]
+            kwargs = {dep: await tasks[dep] for dep in deps}
+            start = time.perf_counter()
+            try:
+                return await func(**kwargs)
+            finally:
+                self.timings[name] = round(time.perf_counter() - start, 3)
+
+        for name in self._topological_order():
+            tasks[name] = asyncio.create_task(run_node(name))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+Template Matcher - Serve common sketches without an LLM call
+Extracts intent, pins, intervals and peripherals from a description and renders a known-good template
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# ============================================================================
+# PATTERNS (compiled once)
+# ============================================================================
+
+# "gpio 2", "GPIO2", "pin 4", "io 34", "D2", "gpio_num_5"
+_PIN_RE = re.compile(r"\b(?:gpio(?:_num)?|pin|io|d)\s*[_#-]?\s*(\d{1,2})\b", re.IGNORECASE)
+_SDA_RE = re.compile(r"\bsda\s*(?:=|:|on|pin|gpio|to)?\s*(?:gpio|pin)?\s*(\d{1,2})\b", re.IGNORECASE)
+_SCL_RE = re.compile(r"\bscl\s*(?:=|:|on|pin|gpio|to)?\s*(?:gpio|pin)?\s*(\d{1,2})\b", re.IGNORECASE)
+_INTERVAL_RE = re.compile(
+    r"\b(\d+(?:\.\d+)?)\s*-?\s*(ms|msec|millis(?:econds?)?|milliseconds?|s|secs?|seconds?|mins?|minutes?)\b",
+    re.IGNORECASE)
+_EVERY_UNIT_RE = re.compile(r"\b(?:every|each|once a|per)\s+(second|minute)\b", re.IGNORECASE)
+# Timing a template cannot express: these lower confidence instead of being
+# replaced by a default interval
+_RATE_RE = re.compile(r"\b(?:twice|thrice|\d+\s*times?|\w+\s+times)\s+(?:per|a|an|each|every)\b", re.IGNORECASE)
+_DURATION_PREFIX_RE = re.compile(r"\b(?:for|after|within|during|lasting|over)\s*$", re.IGNORECASE)
+_OTHER_UNIT_RE = re.compile(
+    r"\b\d+(?:\.\d+)?\s*-?\s*(?:us|usec|µs|μs|micro\w*|ns|nano\w*|h|hrs?|hours?|days?|m|mils?)(?![\w])",
+    re.IGNORECASE)
+_SPEED_WORD_RE = re.compile(r"\b(fast(?:er)?|slow(?:er|ly)?|quick(?:ly)?|rapid(?:ly)?|gentl[ey]|smooth(?:ly)?)\b",
+                            re.IGNORECASE)
+_NEGATION_RE = re.compile(r"\b(?:not|never|don'?t|doesn'?t|dont|no longer|without)\b", re.IGNORECASE)
+_FREQUENCY_RE = re.compile(r"\b(\d+(?:\.\d+)?)\s*(k?hz)\b", re.IGNORECASE)
+_DUTY_RE = re.compile(r"\b(\d{1,3})\s*%", re.IGNORECASE)
+_BAUD_RE = re.compile(r"\b(9600|19200|38400|57600|74880|115200|230400|460800|921600)\s*(?:baud|bps)?\b",
+                      re.IGNORECASE)
+_QUOTED_RE = re.compile(r"[\"'“‘]([^\"'”’]{1,80})[\"'”’]")
+
+# Roles a pin number can belong to, by the nearest keyword in front of it
+_ROLE_RE = re.compile(
+    r"\b(?P<led>leds?|light|lamp)\b|\b(?P<button>buttons?|switch(?:es)?|push ?buttons?)\b"
+    r"|\b(?P<analog>analog|adc|potentiometer|pot)\b",
+    re.IGNORECASE)
+
+_INTENT_RES = {
+    "blink": re.compile(r"\b(blink(?:s|ing)?|flash(?:es|ing)?|toggl(?:e|es|ing))\b", re.IGNORECASE),
+    "button": re.compile(r"\b(button|push ?button|switch)\b", re.IGNORECASE),
+    "analog": re.compile(r"\b(analog(?:read)?|adc|potentiometer)\b", re.IGNORECASE),
+    "i2c_scan": re.compile(r"\bi2c\b.*\bscan|\bscan\w*\b.*\bi2c\b", re.IGNORECASE),
+    "pwm": re.compile(r"\b(pwm|brightness|fad(?:e|es|ing)|dim(?:s|ming)?|breath(?:e|ing))\b", re.IGNORECASE),
+    "serial_print": re.compile(r"\b(print|send|output|write|say)s?\b.*\b(serial|monitor|console|uart)\b"
+                               r"|\bhello,? ?(world|esp32)\b", re.IGNORECASE),
+}
+
+# Anything here needs libraries, networking or logic a template does not cover
+_UNSUPPORTED_RE = re.compile(
+    r"\b(wi-?fi|bluetooth|ble|mqtt|https?|web ?server|webpage|server|ota|json|dht\d*|bme\d*|bmp\d*|mpu\d*|"
+    r"ssd\d+|oled|lcd|display|tft|servo|motor|stepper|relay|neopixel|ws2812\w*|rgb|sd card|spiffs|littlefs|"
+    r"eeprom|preferences|deep ?sleep|sleep|interrupts?|isr|timers?|rtos|freertos|tasks?|camera|sensors?|"
+    r"temperature|humidity|ultrasonic|hc-sr04|infrared|ir (?:sensor|receiver|remote)|rfid|gps|lora|can ?bus|"
+    r"rs485|modbus|keypad|encoder|buzzer|tone|speaker|microphone|i2s|dac|touch|hall|logging|average|filter|"
+    r"threshold|calibrat\w*|counter|count|long press|double|morse|sos|pattern|sequence|random|"
+    r"\d+ times|then|until|stop|alternat\w*)\b",
+    re.IGNORECASE)
+_OTHER_BOARD_RE = re.compile(
+    r"\b(uno|nano|mega|leonardo|atmega\w*|avr|esp8266|nodemcu|stm32|rp2040|pico|teensy|attiny\w*|"
+    r"esp32-?s2|esp32-?s3|esp32-?c3|esp32-?c6)\b", re.IGNORECASE)
+
+# request.board values served by the esp32:esp32:esp32 FQBN
+_BOARD_ALIASES = {"esp32": "esp32dev", "esp32dev": "esp32dev", "esp32devkit": "esp32dev", "default": "esp32dev"}
+
+_UNIT_MS = {"ms": 1, "msec": 1, "milli": 1, "s": 1000, "sec": 1000, "min": 60000}
+
+# ============================================================================
+# TEMPLATES
+# ============================================================================
+
+TEMPLATES = {
+    "blink": """#include <Arduino.h>
+
+// Blink an LED on GPIO {led_pin}: {interval_ms} ms on, {interval_ms} ms off
+const int LED_PIN = {led_pin};
+const unsigned long INTERVAL_MS = {interval_ms};
+
+void setup() {{
+  Serial.begin({baud});
+  pinMode(LED_PIN, OUTPUT);
+}}
+
+void loop() {{
+  digitalWrite(LED_PIN, HIGH);
+  delay(INTERVAL_MS);
+  digitalWrite(LED_PIN, LOW);
+  delay(INTERVAL_MS);
+}}
+""",
+    "button": """#include <Arduino.h>
+
+// Button on GPIO {button_pin} (to GND, internal pull-up){led_comment}
+const int BUTTON_PIN = {button_pin};
+{led_decl}const unsigned long DEBOUNCE_MS = 50;
+
+int lastReading = HIGH;
+int buttonState = HIGH;
+unsigned long lastChangeMs = 0;
+
+void setup() {{
+  Serial.begin({baud});
+  pinMode(BUTTON_PIN, INPUT_PULLUP);
+{led_setup}}}
+
+void loop() {{
+  int reading = digitalRead(BUTTON_PIN);
+  if (reading != lastReading) {{
+    lastChangeMs = millis();
+    lastReading = reading;
+  }}
+  if (millis() - lastChangeMs >= DEBOUNCE_MS && reading != buttonState) {{
+    buttonState = reading;
+    if (buttonState == LOW) {{
+      Serial.println("Button pressed");
+{led_pressed}    }} else {{
+      Serial.println("Button released");
+{led_released}    }}
+  }}
+}}
+""",
+    "analog": """#include <Arduino.h>
+
+// Read the analog value on GPIO {adc_pin} every {interval_ms} ms
+const int ADC_PIN = {adc_pin};
+const unsigned long INTERVAL_MS = {interval_ms};
+
+void setup() {{
+  Serial.begin({baud});
+  analogReadResolution(12);
+}}
+
+void loop() {{
+  int raw = analogRead(ADC_PIN);
+  float volts = raw * 3.3f / 4095.0f;
+  Serial.print("ADC: ");
+  Serial.print(raw);
+  Serial.print("  Voltage: ");
+  Serial.print(volts, 3);
+  Serial.println(" V");
+  delay(INTERVAL_MS);
+}}
+""",
+    "i2c_scan": """#include <Arduino.h>
+#include <Wire.h>
+
+// Scan the I2C bus (SDA GPIO {sda_pin}, SCL GPIO {scl_pin}) every {interval_ms} ms
+const int SDA_PIN = {sda_pin};
+const int SCL_PIN = {scl_pin};
+const unsigned long INTERVAL_MS = {interval_ms};
+
+void setup() {{
+  Serial.begin({baud});
+  Wire.begin(SDA_PIN, SCL_PIN);
+}}
+
+void loop() {{
+  int found = 0;
+  Serial.println("Scanning I2C bus...");
+  for (uint8_t address = 1; address < 127; address++) {{
+    Wire.beginTransmission(address);
+    if (Wire.endTransmission() == 0) {{
+      Serial.print("Device found at 0x");
+      if (address < 16) {{
+        Serial.print("0");
+      }}
+      Serial.println(address, HEX);
+      found++;
+    }}
+  }}
+  Serial.print(found);
+  Serial.println(" device(s) found");
+  delay(INTERVAL_MS);
+}}
+""",
+    "pwm": """#include <Arduino.h>
+
+// LED on GPIO {led_pin} driven by LEDC PWM at {frequency} Hz, 8-bit resolution
+const int LED_PIN = {led_pin};
+const uint32_t PWM_FREQUENCY = {frequency};
+const uint8_t PWM_RESOLUTION = 8;
+{pwm_decl}
+void setup() {{
+  Serial.begin({baud});
+  ledcAttach(LED_PIN, PWM_FREQUENCY, PWM_RESOLUTION);
+{pwm_setup}}}
+
+void loop() {{
+{pwm_loop}}}
+""",
+    "serial_print": """#include <Arduino.h>
+
+// Print a message to the serial monitor every {interval_ms} ms
+const unsigned long INTERVAL_MS = {interval_ms};
+
+void setup() {{
+  Serial.begin({baud});
+}}
+
+void loop() {{
+  Serial.println("{message}");
+  delay(INTERVAL_MS);
+}}
+""",
+}
+
+_PWM_FADE = {
+    "decl": "const unsigned long STEP_MS = {step_ms};\n",
+    "setup": "",
+    "loop": """  for (int duty = 0; duty <= 255; duty++) {
+    ledcWrite(LED_PIN, duty);
+    delay(STEP_MS);
+  }
+  for (int duty = 255; duty >= 0; duty--) {
+    ledcWrite(LED_PIN, duty);
+    delay(STEP_MS);
+  }
+"""
+}
+_PWM_FIXED = {
+    "decl": "const uint32_t DUTY = {duty};  // {duty_percent}% of 255\n",
+    "setup": "  ledcWrite(LED_PIN, DUTY);\n",
+    "loop": "  delay(1000);\n"
+}
+
+
+class TemplateMatcher:
+    """Matches descriptions to parameterized sketch templates.
+
+    Pins are validated against the hardware database (board GPIO lists and
+    GPIO purpose map). A match is only served when its confidence reaches
+    min_confidence; anything unusual lowers it and the LLM takes over.
+    """
+
+    def __init__(self, board_database: Dict[str, Dict], gpio_purposes: Dict[str, List[int]],
+                 min_confidence: float = 0.8):
+        """
+        Initialize matcher.
+
+        Args:
+            board_database: hardware_database_server.BOARD_DATABASE
+            gpio_purposes: hardware_database_server.GPIO_PURPOSES
+            min_confidence: Lowest confidence served without the LLM (0-1)
+        """
+        self.board_database = board_database
+        self.gpio_purposes = gpio_purposes
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.matched = 0
+        self.low_confidence = 0
+        self.by_template: Dict[str, int] = {}
+        self.total_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _pins_by_role(text: str) -> Dict[str, List[int]]:
+        roles = [(m.start(), m.lastgroup) for m in _ROLE_RE.finditer(text)]
+        pins: Dict[str, List[int]] = {}
+        for m in _PIN_RE.finditer(text):
+            before = [(pos, role) for pos, role in roles if pos < m.start() and m.start() - pos <= 40]
+            after = [(pos, role) for pos, role in roles if pos > m.end() and pos - m.end() <= 20]
+            if before:
+                role = before[-1][1]
+            elif after:
+                role = after[0][1]
+            else:
+                role = "unassigned"
+            pins.setdefault(role, []).append(int(m.group(1)))
+        return pins
+
+    @staticmethod
+    def _interval_ms(text: str) -> Optional[int]:
+        m = _INTERVAL_RE.search(text)
+        if m:
+            unit = m.group(2).lower()
+            key = "ms" if unit in ("ms", "msec") else "milli" if unit.startswith("milli") else unit[:3]
+            key = key if key in _UNIT_MS else "s"
+            return int(float(m.group(1)) * _UNIT_MS[key])
+        m = _EVERY_UNIT_RE.search(text)
+        if m:
+            return 1000 if m.group(1).lower() == "second" else 60000
+        return None
+
+    @staticmethod
+    def _timing_penalty(intent: str, text: str, interval: Optional[int], reasons: List[str]) -> float:
+        """Penalty for timing or wording the template would not honour."""
+        penalty = 0.0
+        if _NEGATION_RE.search(text):
+            reasons.append("negated request")
+            penalty += 1.0
+        if intent != "pwm" and _FREQUENCY_RE.search(text):
+            reasons.append("frequency (Hz) only supported for PWM")
+            penalty += 0.5
+        if _RATE_RE.search(text):
+            reasons.append("repetition rate (N times per ...) not parsed")
+            penalty += 0.5
+        intervals = list(_INTERVAL_RE.finditer(text))
+        if len(intervals) > 1:
+            reasons.append(f"{len(intervals)} intervals given, template takes one")
+            penalty += 0.5
+        if any(_DURATION_PREFIX_RE.search(text, 0, m.start()) for m in intervals):
+            reasons.append("duration (for/after ...) instead of a period")
+            penalty += 0.5
+        if _OTHER_UNIT_RE.search(text):
+            reasons.append("unrecognised time unit")
+            penalty += 0.5
+        if _SPEED_WORD_RE.search(text):
+            reasons.append("speed given as a word, not a number")
+            penalty += 0.5
+        if intent == "button" and interval is not None:
+            reasons.append("button template has no timing")
+            penalty += 0.5
+        return penalty
+
+    @staticmethod
+    def _frequency(text: str) -> Optional[int]:
+        m = _FREQUENCY_RE.search(text)
+        if not m:
+            return None
+        scale = 1000 if m.group(2).lower() == "khz" else 1
+        return int(float(m.group(1)) * scale)
+
+    # ------------------------------------------------------------------
+    # GPIO validation
+    # ------------------------------------------------------------------
+
+    def _purpose_pins(self, board: Dict, *purposes: str) -> set:
+        available = set(board["gpio"]["available_pins"])
+        pins = set()
+        for purpose in purposes:
+            pins.update(self.gpio_purposes.get(purpose, []))
+        return pins & available
+
+    def _check_pin(self, board: Dict, pin: int, allowed: set, role: str, reasons: List[str]) -> float:
+        """Confidence penalty for a pin: 1.0 rejects, 0 is a known-good pin."""
+        if pin not in board["gpio"]["available_pins"]:
+            reasons.append(f"GPIO {pin} does not exist on {board['name']}")
+            return 1.0
+        if pin not in allowed:
+            reasons.append(f"GPIO {pin} is not a listed {role} pin on {board['name']}")
+            return 0.3
+        return 0.0
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def _intent(self, text: str) -> Tuple[Optional[str], float, List[str]]:
+        hits = [name for name, pattern in _INTENT_RES.items() if pattern.search(text)]
+        if not hits:
+            return None, 0.0, ["no known intent"]
+        # Combinations one template covers
+        if "button" in hits:
+            hits = [h for h in hits if h not in ("blink",)]
+        if "pwm" in hits:
+            hits = [h for h in hits if h not in ("blink",)]
+        if "i2c_scan" in hits or "analog" in hits:
+            hits = [h for h in hits if h != "serial_print"]
+        if len(hits) > 1:
+            return hits[0], 0.4, [f"several intents: {', '.join(hits)}"]
+        return hits[0], 1.0, []
+
+    def _render(self, intent: str, text: str, board: Dict,
+                reasons: List[str]) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Fill in template parameters. Returns (params, confidence penalty)."""
+        pins = self._pins_by_role(text)
+        interval = self._interval_ms(text)
+        baud_match = _BAUD_RE.search(text)
+        params: Dict[str, Any] = {"baud": int(baud_match.group(1)) if baud_match else 115200}
+        penalty = self._timing_penalty(intent, text, interval, reasons)
+        output_pins = self._purpose_pins(board, "led", "button", "touch")
+
+        def pin_for(role: str, default: Optional[int]) -> Tuple[Optional[int], float]:
+            found = pins.get(role) or (pins.get("unassigned") if len(pins) == 1 else None)
+            if found:
+                return found[0], 0.0
+            if default is None:
+                reasons.append(f"no {role} pin given")
+                return None, 1.0
+            reasons.append(f"{role} pin defaulted to GPIO {default}")
+            return default, 0.1
+
+        if intent in ("blink", "pwm"):
+            led_pin, p = pin_for("led", 2)
+            penalty += p
+            if led_pin is not None:
+                penalty += self._check_pin(board, led_pin, output_pins, "output", reasons)
+            params["led_pin"] = led_pin
+            if intent == "blink":
+                params["interval_ms"] = interval or 1000
+            else:
+                params["frequency"] = self._frequency(text) or 5000
+                duty = _DUTY_RE.search(text)
+                if duty and not re.search(r"\bfad|\bbreath", text, re.IGNORECASE):
+                    percent = min(100, int(duty.group(1)))
+                    params.update({"mode": "fixed", "duty": round(percent * 255 / 100), "duty_percent": percent})
+                else:
+                    params.update({"mode": "fade", "step_ms": max(1, (interval or 2000) // 512)})
+
+        elif intent == "button":
+            button_pin, p = pin_for("button", None)
+            penalty += p
+            if button_pin is not None:
+                input_pins = output_pins | set(board["gpio"].get("adc_pins", []))
+                penalty += self._check_pin(board, button_pin, input_pins, "input", reasons)
+                if button_pin in board["gpio"].get("adc_pins", []) and button_pin not in output_pins:
+                    reasons.append(f"GPIO {button_pin} may be input-only without an internal pull-up")
+                    penalty += 0.3
+            led_pin = (pins.get("led") or [None])[0]
+            if led_pin is not None:
+                penalty += self._check_pin(board, led_pin, output_pins, "output", reasons)
+            params.update({"button_pin": button_pin, "led_pin": led_pin})
+
+        elif intent == "analog":
+            adc_pin, p = pin_for("analog", None)
+            penalty += p
+            if adc_pin is not None:
+                penalty += self._check_pin(board, adc_pin, set(board["gpio"].get("adc_pins", [])), "ADC", reasons)
+            params.update({"adc_pin": adc_pin, "interval_ms": interval or 1000})
+
+        elif intent == "i2c_scan":
+            default = (board.get("peripherals", {}).get("i2c") or {}).get("default") or {}
+            sda, scl = _SDA_RE.search(text), _SCL_RE.search(text)
+            sda_pin = int(sda.group(1)) if sda else default.get("sda")
+            scl_pin = int(scl.group(1)) if scl else default.get("scl")
+            if sda_pin is None or scl_pin is None:
+                reasons.append("no I2C pins known for this board")
+                return None, 1.0
+            available = set(board["gpio"]["available_pins"])
+            for pin in (sda_pin, scl_pin):
+                penalty += self._check_pin(board, pin, available, "I2C", reasons)
+            params.update({"sda_pin": sda_pin, "scl_pin": scl_pin, "interval_ms": interval or 5000})
+
+        elif intent == "serial_print":
+            quoted = _QUOTED_RE.search(text)
+            if quoted:
+                message = quoted.group(1).strip()
+            elif re.search(r"\bhello,? ?world\b", text, re.IGNORECASE):
+                message = "Hello, World!"
+            elif re.search(r"\bhello,? ?esp32\b", text, re.IGNORECASE):
+                message = "Hello, ESP32!"
+            else:
+                reasons.append("no message to print")
+                return None, 1.0
+            if pins:
+                reasons.append("serial print with GPIO pins mentioned")
+                penalty += 0.5
+            params.update({"message": message.replace("\\", "\\\\").replace('"', '\\"'),
+                           "interval_ms": interval or 1000})
+
+        mentioned = sum(len(found) for found in pins.values())
+        used = sum(1 for key in ("led_pin", "button_pin", "adc_pin") if params.get(key) is not None)
+        if intent != "i2c_scan" and mentioned > used:
+            reasons.append(f"{mentioned} pins mentioned, template uses {used}")
+            penalty += 0.5
+        if interval is not None and not 1 <= interval <= 3600000:
+            reasons.append(f"interval {interval} ms out of range")
+            penalty += 1.0
+        return params, penalty
+
+    @staticmethod
+    def _fill(intent: str, params: Dict[str, Any]) -> str:
+        template = TEMPLATES[intent]
+        values = dict(params)
+        if intent == "button":
+            led = params.get("led_pin")
+            values.update({
+                "led_comment": f", LED on GPIO {led} lit while pressed" if led is not None else "",
+                "led_decl": f"const int LED_PIN = {led};\n" if led is not None else "",
+                "led_setup": "  pinMode(LED_PIN, OUTPUT);\n" if led is not None else "",
+                "led_pressed": "      digitalWrite(LED_PIN, HIGH);\n" if led is not None else "",
+                "led_released": "      digitalWrite(LED_PIN, LOW);\n" if led is not None else "",
+            })
+        elif intent == "pwm":
+            parts = _PWM_FADE if params["mode"] == "fade" else _PWM_FIXED
+            values.update({"pwm_decl": parts["decl"].format(**params), "pwm_setup": parts["setup"],
+                           "pwm_loop": parts["loop"]})
+        return template.format(**values)
+
+    def match(self, description: str, board: Optional[str] = "esp32dev") -> Dict[str, Any]:
+        """
+        Try to serve a description from a template.
+
+        Args:
+            description: User request
+            board: Request board id (uno, nano, esp32dev, ...)
+
+        Returns:
+            {"matched", "template", "confidence", "params", "reasons", "code", "duration_ms"};
+            code is set only when matched
+        """
+        start = time.perf_counter()
+        text = " ".join((description or "").split())
+        reasons: List[str] = []
+        result: Dict[str, Any] = {"matched": False, "template": None, "confidence": 0.0,
+                                  "params": None, "reasons": reasons, "code": None}
+
+        board_id = _BOARD_ALIASES.get((board or "esp32dev").lower())
+        board_spec = self.board_database.get(board_id) if board_id else None
+        intent, confidence, intent_reasons = self._intent(text)
+        reasons.extend(intent_reasons)
+
+        if board_spec is None:
+            reasons.append(f"no GPIO data for board '{board}'")
+            confidence = 0.0
+        elif intent:
+            unsupported = sorted({m.group(0).lower() for m in _UNSUPPORTED_RE.finditer(text)})
+            if unsupported:
+                reasons.append(f"needs more than a template: {', '.join(unsupported)}")
+                confidence -= 0.6
+            other_board = _OTHER_BOARD_RE.search(text)
+            if other_board:
+                reasons.append(f"description names another board: {other_board.group(0)}")
+                confidence -= 0.6
+            if len(text.split()) > 30:
+                reasons.append("long description")
+                confidence -= 0.3
+            if intent == "button" and _INTENT_RES["blink"].search(text):
+                reasons.append("button with toggle/blink behaviour")
+                confidence -= 0.5
+            params, penalty = self._render(intent, text, board_spec, reasons)
+            confidence -= penalty
+            result.update({"template": intent, "params": params})
+            if params is not None and confidence >= self.min_confidence:
+                result["code"] = self._fill(intent, params)
+                result["matched"] = True
+
+        result["confidence"] = round(max(0.0, confidence), 2)
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        with self._lock:
+            self.requests += 1
+            self.total_ms += result["duration_ms"]
+            if result["matched"]:
+                self.matched += 1
+                self.by_template[intent] = self.by_template.get(intent, 0) + 1
+            elif intent:
+                self.low_confidence += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return matcher statistics."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "matched": self.matched,
+                "low_confidence": self.low_confidence,
+                "hit_rate_percent": round(self.matched / self.requests * 100, 2) if self.requests else 0.0,
+                "by_template": dict(self.by_template),
+                "avg_ms": round(self.total_ms / self.requests, 3) if self.requests else 0.0,
+                "min_confidence": self.min_confidence
+            }
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mcp_servers"))
+    from hardware_database_server import BOARD_DATABASE, GPIO_PURPOSES
+
+    print("\n" + "="*70)
+    print("🧩 Template Matcher - Test Mode")
+    print("="*70 + "\n")
+
+    matcher = TemplateMatcher(BOARD_DATABASE, GPIO_PURPOSES)
+    for description, board in [
+        ("blink LED on GPIO 2", "esp32dev"),
+        ("Blink an LED on pin 4 every 250ms", "esp32dev"),
+        ("when button on gpio 4 is pressed turn on LED on gpio 2", "esp32dev"),
+        ("read analog value on GPIO 34 and print it every 2 seconds", "esp32dev"),
+        ("scan I2C bus on ESP32 using SDA 21 and SCL 22", "esp32dev"),
+        ("fade an LED on GPIO 5 with PWM at 1 kHz", "esp32dev"),
+        ("set LED brightness on GPIO 13 to 25%", "esp32dev"),
+        ("print 'Hello ESP32' to serial every 2 seconds", "esp32dev"),
+        ("read analog value on GPIO 2", "esp32dev"),
+        ("blink LED on GPIO 45", "esp32dev"),
+        ("WiFi temperature sensor with DHT22 on GPIO 4", "esp32dev"),
+        ("blink LED on pin 13", "uno"),
+        ("blink LED on GPIO 2 three times then stop", "esp32dev"),
+        ("blink LEDs on GPIO 2 and GPIO 4", "esp32dev"),
+        ("toggle LED on GPIO 2 when button on GPIO 4 is pressed", "esp32dev"),
+        ("blink LED on GPIO 2 at 2 Hz", "esp32dev"),
+        ("blink LED on GPIO 2 twice per second", "esp32dev"),
+        ("blink LED on GPIO 2 with 200ms on and 800ms off", "esp32dev"),
+        ("blink LED on GPIO 2 for 10 seconds", "esp32dev"),
+        ("blink LED on gpio 2 every 100us", "esp32dev"),
+        ("blink the LED on GPIO 2 fast", "esp32dev"),
+        ("do not blink LED on GPIO 2", "esp32dev"),
+    ]:
+        r = matcher.match(description, board)
+        mark = "✓" if r["matched"] else "→ LLM"
+        print(f"{mark:6} {r['confidence']:.2f} {str(r['template']):13} {description}")
+        if r["reasons"]:
+            print(f"         {'; '.join(r['reasons'])}")
+
+    print("\n" + matcher.match("when button on gpio 4 is pressed turn on LED on gpio 2")["code"])
+    print(matcher.get_stats())